@@ -51,9 +51,13 @@ SRC_PATH = PROJECT_PATH / 'src'
 plugin_list_raw = "{{ cookiecutter.plugin_names }}"
 plugins = [p.strip() for p in plugin_list_raw.split(',') if p.strip()]
 
-for plugin in plugins:
+# a project can start without any plugin, they are added later with package.py --add-plugin
+if plugins:
     main_cmake_file = PROJECT_PATH / 'CMakeLists.txt'
-    inject_utils.add_plugin(plugin, main_cmake_file, BLUEPRINT_PATH, SRC_PATH)
+    try:
+        inject_utils.add_plugins(plugins, main_cmake_file, BLUEPRINT_PATH, SRC_PATH)
+    except ValueError as e:
+        sys.exit(f"ERROR: {e}")
 
 # Ge the list of maya versions from cookiecutter
 maya_versions_raw = "{{ cookiecutter.maya_versions }}"
@@ -64,10 +68,21 @@ initial_definitions = {}
 initial_definitions["project_slug"] = DEFINITIONS_TEMPLATE["project_slug"]
 initial_definitions["project_name"] = DEFINITIONS_TEMPLATE["project_name"]
 initial_definitions["local_devkits_relative_path"] = DEFINITIONS_TEMPLATE["local_devkits_relative_path"]
+# only extract the include, lib and cmake files of downloaded devkits
+initial_definitions["slim_devkits"] = False
+# hardlink identical devkit files into the machine-wide devkit store
+initial_definitions["use_devkit_store"] = False
+# precompile the Maya devkit headers and use unity builds by default (see --pch and --unity-build)
+initial_definitions["precompiled_headers"] = False
+initial_definitions["unity_build"] = False
 initial_definitions["target_maya_versions"] = []
 initial_definitions["windows_devkits"] = {}
 initial_definitions["linux_devkits"] = {}
 initial_definitions["darwin_devkits"] = {}
+# SHA-256 of each devkit archive, recorded by package.py after the first verified download
+initial_definitions["windows_devkit_checksums"] = {}
+initial_definitions["linux_devkit_checksums"] = {}
+initial_definitions["darwin_devkit_checksums"] = {}
 for version in maya_versions:
     if version in DEFINITIONS_TEMPLATE["target_maya_versions"]:
         initial_definitions["target_maya_versions"].append(version)
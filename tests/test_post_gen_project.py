@@ -0,0 +1,38 @@
+"""Generate projects from the template and check what the post generation hook made of them.
+
+Needs cookiecutter (pip install cookiecutter), skipped without it.
+"""
+from pathlib import Path
+import json
+
+import pytest
+
+cookiecutter = pytest.importorskip("cookiecutter.main").cookiecutter
+
+TEMPLATE_PATH = Path(__file__).resolve().parent.parent
+
+
+def _generate(tmp_path, **context):
+    context.setdefault("project_name", "Demo Project")
+    return Path(cookiecutter(str(TEMPLATE_PATH), no_input=True, output_dir=str(tmp_path), extra_context=context))
+
+
+def test_generate_project_without_plugins(tmp_path):
+    project_path = _generate(tmp_path, plugin_names="")
+    assert "add_subdirectory(src/plugins/cpp/" not in (project_path / "CMakeLists.txt").read_text()
+    assert not (project_path / "src" / "plugins" / "cpp").exists()
+    definitions = json.loads((project_path / "package" / "definitions.json").read_text())
+    assert definitions["project_slug"] == "demo-project"
+
+
+def test_generate_project_with_plugins(tmp_path):
+    project_path = _generate(tmp_path, plugin_names="pluginB, pluginA")
+    cmakelists = (project_path / "CMakeLists.txt").read_text()
+    assert cmakelists.index("src/plugins/cpp/pluginA") < cmakelists.index("src/plugins/cpp/pluginB")
+    assert (project_path / "src" / "plugins" / "cpp" / "pluginA" / "CMakeLists.txt").is_file()
+
+
+def test_generate_project_with_invalid_plugin_name_fails(tmp_path):
+    from cookiecutter.exceptions import FailedHookException
+    with pytest.raises(FailedHookException):
+        _generate(tmp_path, plugin_names="my plugin")
@@ -0,0 +1,68 @@
+"""Benchmark the cold startup time of the package script.
+
+Every sample starts a fresh Python process, so the numbers include the
+interpreter startup and every import, like a real command line call.
+
+    python benchmarks/bench_cli_startup.py --runs 20
+"""
+from pathlib import Path
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _commands(mod_dir):
+    """Return the (name, command) pairs to benchmark."""
+    return [
+        ("python", [sys.executable, "-c", "pass"]),
+        ("import package.package", [sys.executable, "-c", "import package.package"]),
+        ("package.py --help", [sys.executable, "package/package.py", "--help"]),
+        ("package.py --generate-release-mod", [sys.executable, "package/package.py", "--generate-release-mod", mod_dir]),
+    ]
+
+
+def _time_command(command, runs):
+    """Return the wall times in milliseconds of `runs` cold runs of the command, or None if it fails."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        if subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode:
+            return None
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cold startup time of the package script.")
+    parser.add_argument("--runs", type=int, default=10, help="Optional: number of runs per command (default: 10).")
+    parser.add_argument("--json", type=str, metavar="FILE", default=None,
+                        help="Optional: also save the results into a JSON file.")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as mod_dir:
+        for name, command in _commands(mod_dir):
+            # warm the file system cache and the bytecode cache first
+            times = _time_command(command, 1) and _time_command(command, args.runs)
+            if not times:
+                results[name] = None
+                sys.stdout.write(f"{name:<36} failed\n")
+                continue
+            results[name] = {"min_ms": min(times), "median_ms": statistics.median(times), "max_ms": max(times)}
+            sys.stdout.write(f"{name:<36} min {min(times):7.1f} ms  median {statistics.median(times):7.1f} ms  "
+                             f"max {max(times):7.1f} ms\n")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump({"runs": args.runs, "python": sys.version.split()[0], "results": results}, json_file, indent=4)
+        sys.stdout.write(f"Saved results to {Path(args.json).resolve()}.\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmarks of the Injector on large CMakeLists.txt and release.yml files."""
+import pytest
+
+from package import inject_utils
+
+import synthetic
+
+LINE_COUNTS = [1000, 10000]
+
+
+@pytest.fixture(params=LINE_COUNTS, ids=lambda count: f"{count}_lines")
+def cmakelists(request, tmp_path):
+    """A root CMakeLists.txt with 100 registered plugins, padded to the line count."""
+    path = tmp_path / "CMakeLists.txt"
+    synthetic.write_cmakelists(path, request.param, synthetic.plugin_names(100, prefix="existing"))
+    return path
+
+
+@pytest.fixture(params=LINE_COUNTS, ids=lambda count: f"{count}_lines")
+def release_yml(request, tmp_path):
+    """The release workflow padded to the line count."""
+    path = tmp_path / "release.yml"
+    synthetic.write_release_yml(path, request.param)
+    return path
+
+
+def _restorer(path):
+    """Return a benchmark setup function writing the current content of the file back."""
+    original = path.read_text()
+
+    def _restore():
+        path.write_text(original)
+    return _restore
+
+
+def test_read(benchmark, cmakelists):
+    benchmark(inject_utils.Injector, cmakelists)
+
+
+def test_inject_after(benchmark, cmakelists):
+    def _inject():
+        injector = inject_utils.Injector(cmakelists)
+        injector.match_mode = "contains"
+        injector.inject_after("add_subdirectory(src/plugins/cpp/new_plugin)\n", inject_utils.PLUGIN_SUBDIRECTORIES_MARKER)
+
+    benchmark.pedantic(_inject, setup=_restorer(cmakelists), rounds=20)
+
+
+def test_inject_after_batch(benchmark, cmakelists):
+    """500 edits written once, the marker index keeps every lookup cheap."""
+
+    def _inject():
+        injector = inject_utils.Injector(cmakelists)
+        injector.match_mode = "contains"
+        with injector.batch():
+            for index in range(500):
+                injector.inject_after(f"set(BATCH_{index} ON)\n", "add_subdirectory(src/plugins/cpp/existing")
+
+    benchmark.pedantic(_inject, setup=_restorer(cmakelists), rounds=10)
+
+
+def test_merge_block_after(benchmark, cmakelists):
+    new_lines = [synthetic.PLUGIN_SUBDIRECTORY.format(name) for name in synthetic.plugin_names(100)]
+
+    def _merge():
+        injector = inject_utils.Injector(cmakelists)
+        injector.match_mode = "contains"
+        injector.merge_block_after(new_lines, inject_utils.PLUGIN_SUBDIRECTORIES_MARKER, "add_subdirectory(src/plugins/cpp/")
+
+    benchmark.pedantic(_merge, setup=_restorer(cmakelists), rounds=20)
+
+
+def test_replace_string(benchmark, cmakelists):
+    def _replace():
+        inject_utils.Injector(cmakelists).replace_string("renamed", "existing")
+
+    benchmark.pedantic(_replace, setup=_restorer(cmakelists), rounds=20)
+
+
+@pytest.mark.parametrize("version_count", [10, 100])
+def test_inject_release_ci(benchmark, release_yml, version_count):
+    definitions = synthetic.devkit_definitions(synthetic.maya_versions(version_count))
+    benchmark.pedantic(inject_utils.inject_release_ci, args=(release_yml, definitions),
+                       setup=_restorer(release_yml), rounds=20)
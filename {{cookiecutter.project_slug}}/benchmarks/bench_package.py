@@ -0,0 +1,63 @@
+"""Benchmarks of the package script: .mod generation, plugin scaffolding, deploy and release."""
+import shutil
+
+import pytest
+
+from package import package as package_script
+
+import synthetic
+
+
+@pytest.mark.parametrize("version_count", [10, 100, 1000])
+@pytest.mark.parametrize("generator", ["_generate_release_mod", "_generate_dev_mod"])
+def test_generate_mod(benchmark, make_project, generator, version_count):
+    make_project(cpp_plugin_count=1, versions=synthetic.maya_versions(version_count))
+    benchmark(lambda: list(getattr(package_script, generator)()))
+
+
+@pytest.mark.parametrize("plugin_count", [1, 50])
+def test_add_plugin(benchmark, make_project, plugin_count):
+    project = make_project(cpp_plugin_count=100)
+    original = project.root_cmakelists.read_text()
+    names = synthetic.plugin_names(plugin_count, prefix="added")
+
+    def _reset():
+        project.root_cmakelists.write_text(original)
+        for name in names:
+            shutil.rmtree(project.cpp_plugins_dir / name, ignore_errors=True)
+
+    benchmark.pedantic(package_script.add_plugin_to_cmakelists, args=(",".join(names),), setup=_reset, rounds=10)
+
+
+@pytest.mark.parametrize("plugin_count", [10, 200])
+def test_collect_plugin_artifacts(benchmark, make_project, plugin_count):
+    project = make_project(cpp_plugin_count=plugin_count, versions=["2025"])
+    build_dir = project.root / "build" / "2025"
+    artifacts = benchmark(package_script.collect_plugin_artifacts, build_dir)
+    assert len(artifacts) == plugin_count
+
+
+@pytest.mark.parametrize("plugin_count", [10, 200])
+def test_dev_deploy_cold(benchmark, make_project, plugin_count):
+    """Deploy into an empty _dev_deploy folder, every binary is hashed and copied."""
+    project = make_project(cpp_plugin_count=plugin_count)
+    deploy_path = project.root / "_dev_deploy"
+    benchmark.pedantic(package_script.dev_deploy, setup=lambda: shutil.rmtree(deploy_path, ignore_errors=True),
+                       rounds=5)
+
+
+@pytest.mark.parametrize("plugin_count", [10, 200])
+def test_dev_deploy_unchanged(benchmark, make_project, plugin_count):
+    """Deploy again without changes, the deploy manifest skips every binary."""
+    make_project(cpp_plugin_count=plugin_count)
+    package_script.dev_deploy()
+    benchmark(package_script.dev_deploy)
+
+
+@pytest.mark.parametrize("plugin_count", [10, 200])
+def test_release_copy(benchmark, make_project, plugin_count):
+    """Release without archives, i.e. collect and copy every plugin, tool and python plugin."""
+    project = make_project(cpp_plugin_count=plugin_count)
+    release_path = project.root / "release"
+    benchmark.pedantic(package_script.release, kwargs={"archive_formats": []},
+                       setup=lambda: shutil.rmtree(release_path, ignore_errors=True), rounds=5)
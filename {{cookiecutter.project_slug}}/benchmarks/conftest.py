@@ -0,0 +1,38 @@
+"""Pytest configuration for the package script benchmarks.
+
+The benchmarks run without Maya. Every benchmark works on a synthetic
+project in a temporary folder, see synthetic.py.
+"""
+from pathlib import Path
+import sys
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from package import package as package_script  # noqa: E402
+from package.project import Project  # noqa: E402
+
+import synthetic  # noqa: E402
+
+
+@pytest.fixture
+def make_project(tmp_path, monkeypatch):
+    """Return a function creating a synthetic project and pointing the package script at it.
+
+    Devkit validation is skipped and build_versions returns synthetic build
+    trees instead of building, so deploys and releases only collect and copy.
+    """
+    def _make_project(cpp_plugin_count=10, versions=("2024", "2025"), **kwargs):
+        root = synthetic.create_project(tmp_path / "project", cpp_plugin_count, versions, **kwargs)
+        project = Project(root)
+        extension = package_script.PLUGIN_EXTENSIONS[package_script.OS]
+        build_dirs = {
+            version: synthetic.create_build_tree(root / "build" / version, project.cpp_plugin_names, extension)
+            for version in versions
+        }
+        synthetic.use_project(package_script, project, build_dirs, tmp_path / "home", monkeypatch)
+        return project
+    return _make_project
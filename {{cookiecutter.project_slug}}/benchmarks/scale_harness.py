@@ -0,0 +1,285 @@
+"""Measure how the packaging pipeline scales with the number of plugins and Maya versions.
+
+For every combination of plugin and version counts, a copy of the project is
+generated in a temporary folder with N blueprint plugins and M fake devkits
+(headers and placeholder libraries). CMake runs for real, but with a stub
+toolchain: the compiler and linker only write placeholder object files and
+plugin binaries. What is measured is the orchestration itself, i.e. the
+package script, CMake and the build tool, not the compiles.
+
+Every stage runs in its own process, which reports:
+
+* the wall time,
+* the file operations of the Python side (opens, copies, renames, removes,
+  folder scans... counted with an audit hook),
+* the peak resident memory of the Python process and of the toolchain
+  processes it started.
+
+    python benchmarks/scale_harness.py --plugins 10,50,100 --versions 1,3 --json scale.json
+
+Needs a POSIX shell for the stub toolchain, so it does not run on Windows.
+"""
+from collections import Counter
+from pathlib import Path
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import synthetic
+
+STAGES = ("scaffold", "build", "dev", "dev-noop", "release")
+
+# audit events (see https://docs.python.org/3/library/audit_events.html) counted as file operations
+FILE_EVENTS = {
+    "open": "open",
+    "os.mkdir": "mkdir",
+    "os.remove": "remove",
+    "os.rmdir": "remove",
+    "os.rename": "rename",
+    "shutil.copyfile": "copy",
+    "shutil.copymode": "copy",
+    "shutil.copystat": "copy",
+    "shutil.copytree": "copy",
+    "shutil.rmtree": "remove",
+    "os.scandir": "scan",
+    "os.listdir": "scan",
+    "os.chmod": "chmod",
+    "os.utime": "utime",
+}
+
+# folders of the project which are not copied into the generated projects
+_IGNORED = ("build", "_dev_deploy", "release", "dist", ".benchmarks", ".git", "__pycache__", "*.prof")
+
+_MAYA_HEADERS = ("MFnPlugin.h", "MObject.h", "MPxNode.h", "MPxCommand.h", "MGlobal.h", "MString.h")
+_MAYA_LIBRARIES = ("OpenMaya", "OpenMayaRender", "OpenMayaUI", "Foundation", "OpenMayaAnim", "OpenMayaFX")
+
+# Writes placeholder outputs instead of compiling and linking. Linked plugin
+# binaries are padded to SCALE_HARNESS_ARTIFACT_KB so deploys copy real bytes.
+_STUB_COMPILER = """#!/bin/sh
+out=""
+depfile=""
+while [ $# -gt 0 ]; do
+  case "$1" in
+    -o) out="$2"; shift ;;
+    -MF) depfile="$2"; shift ;;
+  esac
+  shift
+done
+[ -n "$depfile" ] && printf '%s:\\n' "$out" > "$depfile"
+case "$out" in
+  *.so|*.mll|*.bundle) head -c $(( ${SCALE_HARNESS_ARTIFACT_KB:-64} * 1024 )) /dev/zero > "$out" ;;
+  ?*) printf 'stub\\n' > "$out" ;;
+esac
+exit 0
+"""
+
+_STUB_TOOLCHAIN = """set(CMAKE_C_COMPILER "{compiler}")
+set(CMAKE_CXX_COMPILER "{compiler}")
+# skip the compiler checks, the stub can not build test programs
+set(CMAKE_C_COMPILER_FORCED TRUE)
+set(CMAKE_CXX_COMPILER_FORCED TRUE)
+set(CMAKE_C_COMPILER_ID GNU)
+set(CMAKE_CXX_COMPILER_ID GNU)
+set(CMAKE_C_COMPILER_VERSION 11.0)
+set(CMAKE_CXX_COMPILER_VERSION 11.0)
+set(OpenGL_GL_PREFERENCE LEGACY)
+set(OPENGL_INCLUDE_DIR "{stub_dir}/include" CACHE PATH "")
+set(OPENGL_gl_LIBRARY "{stub_dir}/lib/libGL.so" CACHE FILEPATH "")
+set(OPENGL_glu_LIBRARY "{stub_dir}/lib/libGLU.so" CACHE FILEPATH "")
+"""
+
+
+def is_supported():
+    """Return True if the stub toolchain can run on this platform."""
+    return os.name == "posix" and shutil.which("cmake") is not None
+
+
+def create_toolchain(toolchain_dir):
+    """Write the stub compiler and its CMake toolchain file. Returns the toolchain file path."""
+    toolchain_dir = Path(toolchain_dir)
+    for stub_path in ("include/GL/gl.h", "include/GL/glu.h", "lib/libGL.so", "lib/libGLU.so"):
+        (toolchain_dir / stub_path).parent.mkdir(parents=True, exist_ok=True)
+        (toolchain_dir / stub_path).write_text("")
+    compiler = toolchain_dir / "stub-cc"
+    compiler.write_text(_STUB_COMPILER)
+    compiler.chmod(0o755)
+    toolchain_file = toolchain_dir / "toolchain.cmake"
+    toolchain_file.write_text(_STUB_TOOLCHAIN.format(compiler=compiler.as_posix(), stub_dir=toolchain_dir.as_posix()))
+    return toolchain_file
+
+
+def create_devkit(devkit_path):
+    """Create a fake devkitBase with the Maya headers and placeholder libraries."""
+    devkit_path = Path(devkit_path)
+    (devkit_path / "include" / "maya").mkdir(parents=True)
+    (devkit_path / "lib").mkdir()
+    (devkit_path / "cmake").mkdir()
+    for header in _MAYA_HEADERS:
+        (devkit_path / "include" / "maya" / header).write_text("#pragma once\n")
+    for library in _MAYA_LIBRARIES:
+        (devkit_path / "lib" / f"lib{library}.so").write_text("")
+
+
+def create_project(project_root, versions):
+    """Copy the project without its plugins and build outputs, and add fake devkits for the versions."""
+    project_root = Path(project_root)
+    shutil.copytree(synthetic.REPO_ROOT, project_root, ignore=shutil.ignore_patterns(*_IGNORED))
+    shutil.rmtree(project_root / "src" / "plugins" / "cpp", ignore_errors=True)
+    synthetic.write_cmakelists(project_root / "CMakeLists.txt", 0)
+    definitions_file = project_root / "package" / "definitions.json"
+    with open(definitions_file, "r", encoding="utf-8") as definitions_data:
+        definitions = json.load(definitions_data)
+    definitions["target_maya_versions"] = list(versions)
+    definitions["use_devkit_store"] = False
+    with open(definitions_file, "w", encoding="utf-8") as definitions_data:
+        json.dump(definitions, definitions_data, indent=4)
+    for version in versions:
+        create_devkit(project_root / definitions["local_devkits_relative_path"] / version / "devkitBase")
+    return project_root
+
+
+def write_plugin_sources(project_root):
+    """Give every scaffolded plugin a source file, the blueprint has none."""
+    for plugin_dir in (Path(project_root) / "src" / "plugins" / "cpp").iterdir():
+        (plugin_dir / f"{plugin_dir.name}.cpp").write_text(
+            "#include <maya/MFnPlugin.h>\n" + f"extern \"C\" int {plugin_dir.name}_entry()" + " { return 1; }\n"
+        )
+
+
+def _max_rss_mb(children=False):
+    """Return the peak resident memory in MB of this process, or of its finished children."""
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_stage(stage, project_root, plugin_count, result_path):
+    """Run one stage on the generated project and write its measurements to result_path."""
+    sys.path.insert(0, str(project_root))
+    from package import inject_utils
+    from package import package as package_script
+
+    counts = Counter()
+    counting = []
+
+    def _audit(event, args):
+        if counting and event in FILE_EVENTS:
+            counts[FILE_EVENTS[event]] += 1
+    sys.addaudithook(_audit)
+
+    versions = package_script.PROJECT.definitions["target_maya_versions"]
+    stages = {
+        "scaffold": lambda: inject_utils.add_plugins(synthetic.plugin_names(plugin_count), package_script.ROOT_CMAKELISTS,
+                                                     package_script.BLUEPRINT_PATH, project_root / "src"),
+        "build": lambda: [package_script.build_plugins(version) for version in versions],
+        "dev": package_script.dev_deploy,
+        "dev-noop": package_script.dev_deploy,
+        "release": package_script.release,
+    }
+    # keep the output of the pipeline out of the report
+    sys.stdout = open(os.devnull, "w")
+    counting.append(True)
+    start = time.perf_counter()
+    stages[stage]()
+    wall_time = time.perf_counter() - start
+    counting.clear()
+    result = {
+        "wall_s": wall_time,
+        "file_ops": sum(counts.values()),
+        "file_ops_by_kind": dict(counts),
+        "peak_rss_mb": _max_rss_mb(),
+        "toolchain_peak_rss_mb": _max_rss_mb(children=True),
+    }
+    with open(result_path, "w", encoding="utf-8") as result_file:
+        json.dump(result, result_file)
+
+
+def measure(plugin_count, version_count, stages=STAGES, artifact_kb=64, keep=False):
+    """Generate a project and run the stages on it. Returns {stage: measurements}."""
+    work_dir = Path(tempfile.mkdtemp(prefix="scale_harness_"))
+    try:
+        project_root = create_project(work_dir / "project", synthetic.maya_versions(version_count))
+        home_dir = work_dir / "home"
+        (home_dir / "maya").mkdir(parents=True)
+        env = dict(os.environ, HOME=str(home_dir), SCALE_HARNESS_ARTIFACT_KB=str(artifact_kb),
+                   CMAKE_TOOLCHAIN_FILE=str(create_toolchain(work_dir / "toolchain")))
+        results = {}
+        for stage in [stage for stage in STAGES if stage == "scaffold" or stage in stages]:
+            result_path = work_dir / f"{stage}.json"
+            command = [sys.executable, str(Path(__file__).resolve()), "--run-stage", stage,
+                       "--project", str(project_root), "--plugins", str(plugin_count), "--result", str(result_path)]
+            completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            if completed.returncode:
+                raise RuntimeError(f"Stage {stage} failed for {plugin_count} plugins and {version_count} versions:\n"
+                                   f"{completed.stdout}")
+            with open(result_path, "r", encoding="utf-8") as result_file:
+                results[stage] = json.load(result_file)
+            if stage == "scaffold":
+                write_plugin_sources(project_root)
+        return results
+    finally:
+        if keep:
+            sys.stdout.write(f"Kept the generated project in {work_dir}.\n")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _counts(value):
+    return [int(count) for count in value.split(",") if count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how the packaging pipeline scales with plugins and Maya versions.")
+    parser.add_argument("--plugins", type=str, default="10,50,100",
+                        help="Optional: comma separated plugin counts (default: 10,50,100).")
+    parser.add_argument("--versions", type=str, default="1,3",
+                        help="Optional: comma separated Maya version counts (default: 1,3).")
+    parser.add_argument("--stages", type=str, default=",".join(STAGES),
+                        help=f"Optional: comma separated stages to run (default: {','.join(STAGES)}). The plugins are always scaffolded.")
+    parser.add_argument("--artifact-kb", type=int, default=64,
+                        help="Optional: size of every stub plugin binary in KB (default: 64).")
+    parser.add_argument("--json", type=str, metavar="FILE", default=None,
+                        help="Optional: also save the results into a JSON file.")
+    parser.add_argument("--keep", action="store_true", help="Optional: keep the generated projects.")
+    parser.add_argument("--run-stage", type=str, choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--project", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--result", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage(args.run_stage, Path(args.project), int(args.plugins), args.result)
+        return
+    if not is_supported():
+        raise SystemExit("The scale harness needs a POSIX shell and cmake on PATH.")
+
+    stages = args.stages.split(",")
+    unknown_stages = set(stages) - set(STAGES)
+    if unknown_stages:
+        raise SystemExit(f"Unknown stages: {', '.join(sorted(unknown_stages))}. Stages are {', '.join(STAGES)}.")
+
+    rows = []
+    sys.stdout.write(f"{'plugins':>8} {'versions':>8}  {'stage':<9} {'wall s':>8} {'file ops':>9} "
+                     f"{'peak MB':>8} {'toolchain MB':>12}\n")
+    for plugin_count in _counts(args.plugins):
+        for version_count in _counts(args.versions):
+            results = measure(plugin_count, version_count, stages, args.artifact_kb, args.keep)
+            for stage, result in results.items():
+                rows.append({"plugins": plugin_count, "versions": version_count, "stage": stage, **result})
+                sys.stdout.write(f"{plugin_count:>8} {version_count:>8}  {stage:<9} {result['wall_s']:>8.2f} "
+                                 f"{result['file_ops']:>9} {result['peak_rss_mb']:>8.1f} "
+                                 f"{result['toolchain_peak_rss_mb']:>12.1f}\n")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(rows, json_file, indent=4)
+        sys.stdout.write(f"Saved results to {Path(args.json).resolve()}.\n")
+
+
+if __name__ == "__main__":
+    main()
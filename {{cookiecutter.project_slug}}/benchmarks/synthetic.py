@@ -0,0 +1,146 @@
+"""Generate synthetic projects, files and build trees for the benchmarks.
+
+Nothing here needs Maya, a devkit or a compiler. Build trees are made of
+placeholder binaries and a CMake File API codemodel reply describing them, which
+is all the artifact collection of the package script reads.
+"""
+from pathlib import Path
+import json
+import os
+import shutil
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+PLUGIN_SUBDIRECTORY_PREFIX = "add_subdirectory(src/plugins/cpp/"
+PLUGIN_SUBDIRECTORY = PLUGIN_SUBDIRECTORY_PREFIX + "{})\n"
+
+
+def plugin_names(count, prefix="plugin"):
+    """Return `count` plugin names which sort in creation order."""
+    return [f"{prefix}{index:05d}" for index in range(count)]
+
+
+def maya_versions(count, first=2022):
+    """Return `count` Maya version strings."""
+    return [str(first + index) for index in range(count)]
+
+
+def write_cmakelists(path, line_count, names=()):
+    """Write a root CMakeLists.txt of about line_count lines.
+
+    The project's own CMakeLists.txt is padded with settings before the
+    plugin subdirectories marker, so the marker and the add_subdirectory lines
+    of the `names` plugins sit at the end like in a grown project.
+    """
+    lines = (REPO_ROOT / "CMakeLists.txt").read_text(encoding="utf-8").splitlines(keepends=True)
+    # drop the plugins of the project itself
+    lines = [line for line in lines if not line.startswith(PLUGIN_SUBDIRECTORY_PREFIX)]
+    marker_index = next(index for index, line in enumerate(lines) if line.startswith("# Plugin Subdirectories"))
+    subdirectories = [PLUGIN_SUBDIRECTORY.format(name) for name in names]
+    padding_count = max(0, line_count - len(lines) - len(subdirectories))
+    padding = [f"set(BENCHMARK_SETTING_{index} \"value {index}\")\n" for index in range(padding_count)]
+    content = lines[:marker_index] + padding + lines[marker_index:marker_index + 1] + subdirectories \
+        + lines[marker_index + 1:]
+    Path(path).write_text("".join(content), encoding="utf-8")
+
+
+def write_release_yml(path, line_count):
+    """Write a release workflow of about line_count lines with the devkit markers of the project's own."""
+    lines = (REPO_ROOT / ".github" / "workflows" / "release.yml").read_text(encoding="utf-8").splitlines(keepends=True)
+    step = [
+        "      - name: Benchmark step {}\n",
+        "        shell: bash\n",
+        "        run: |\n",
+        "          echo \"step {}\"\n",
+    ]
+    padding = []
+    index = 0
+    while len(lines) + len(padding) < line_count:
+        padding.extend(line.format(index) for line in step)
+        index += 1
+    Path(path).write_text("".join(lines + padding), encoding="utf-8")
+
+
+def devkit_definitions(versions):
+    """Return definitions with a devkit link per Maya version and platform."""
+    return {
+        "windows_devkits": {version: f"https://example.com/devkits/{version}/windows.zip" for version in versions},
+        "linux_devkits": {version: f"https://example.com/devkits/{version}/linux.tgz" for version in versions},
+    }
+
+
+def create_project(root, cpp_plugin_count=10, versions=("2024", "2025"), python_plugin_count=10, tool_count=10):
+    """Create a project folder with the given plugins, tools and target Maya versions."""
+    root = Path(root)
+    (root / "package").mkdir(parents=True)
+    definitions = {
+        "project_name": "Benchmark Project",
+        "project_slug": "benchmark-project",
+        "target_maya_versions": list(versions),
+        "local_devkits_relative_path": "devkits",
+        **devkit_definitions(versions),
+    }
+    (root / "package" / "definitions.json").write_text(json.dumps(definitions, indent=4), encoding="utf-8")
+    (root / "VERSION").write_text("1.0.0\n", encoding="utf-8")
+    shutil.copytree(REPO_ROOT / "_blueprint", root / "_blueprint")
+    names = plugin_names(cpp_plugin_count)
+    write_cmakelists(root / "CMakeLists.txt", 0, names)
+    for name in names:
+        shutil.copytree(REPO_ROOT / "_blueprint" / "plugin_template", root / "src" / "plugins" / "cpp" / name)
+    python_plugins_dir = root / "src" / "plugins" / "python"
+    python_plugins_dir.mkdir(parents=True)
+    for index in range(python_plugin_count):
+        (python_plugins_dir / f"python_plugin_{index}.py").write_text(f"# python plugin {index}\n" * 50)
+    tools_dir = root / "src" / "tools" / "benchmark_tools"
+    tools_dir.mkdir(parents=True)
+    for index in range(tool_count):
+        (tools_dir / f"tool_{index}.py").write_text(f"# tool {index}\n" * 50)
+    return root
+
+
+def create_build_tree(build_dir, names, extension, build_type="Release", artifact_size=256 * 1024):
+    """Create placeholder plugin binaries and the codemodel reply CMake writes for them."""
+    build_dir = Path(build_dir)
+    reply_dir = build_dir / ".cmake" / "api" / "v1" / "reply"
+    reply_dir.mkdir(parents=True)
+    targets = []
+    for name in names:
+        artifact = Path("src") / "plugins" / "cpp" / name / f"{name}{extension}"
+        (build_dir / artifact).parent.mkdir(parents=True)
+        (build_dir / artifact).write_bytes(os.urandom(artifact_size))
+        target_file = f"target-{name}-{build_type}.json"
+        (reply_dir / target_file).write_text(json.dumps(
+            {"name": name, "type": "MODULE_LIBRARY", "artifacts": [{"path": artifact.as_posix()}]}
+        ))
+        targets.append({"name": name, "jsonFile": target_file})
+    (reply_dir / "codemodel-v2.json").write_text(json.dumps(
+        {"configurations": [{"name": build_type, "targets": targets}]}
+    ))
+    (reply_dir / "index-0000-00-00T00-00-00-0000.json").write_text(json.dumps(
+        {"reply": {"codemodel-v2": {"jsonFile": "codemodel-v2.json"}}}
+    ))
+    return build_dir
+
+
+def use_project(package_script, project, build_dirs, home_dir, monkeypatch):
+    """Point the module globals of the package script at a synthetic project for the duration of a test.
+
+    Devkit validation is skipped, and build_versions returns the build trees
+    of `build_dirs` by Maya version instead of building, so later changes to
+    the dictionary are seen too. The Maya user folders are looked up in `home_dir`.
+    """
+    monkeypatch.setattr(package_script, "PROJECT", project)
+    monkeypatch.setattr(package_script, "REPO_ROOT", project.root)
+    monkeypatch.setattr(package_script, "ROOT_CMAKELISTS", project.root_cmakelists)
+    monkeypatch.setattr(package_script, "BLUEPRINT_PATH", project.blueprint_path)
+    monkeypatch.setattr(package_script, "DEFINITIONS_FILE", project.definitions_file)
+    monkeypatch.setattr(package_script, "VERSION_FILE", project.version_file)
+    monkeypatch.setattr(package_script, "PLUGIN_LOAD_BASELINE_FILE",
+                        project.package_root / package_script.PLUGIN_LOAD_BASELINE_FILE.name)
+    monkeypatch.setattr(package_script, "validate_local_devkits", lambda *args, **kwargs: None)
+    monkeypatch.setattr(package_script, "build_versions",
+                        lambda maya_versions, **kwargs: {version: build_dirs[version] for version in maya_versions})
+    home_dir = Path(home_dir)
+    (home_dir / "maya").mkdir(parents=True, exist_ok=True)
+    (home_dir / "Documents" / "maya").mkdir(parents=True, exist_ok=True)
+    monkeypatch.setattr(package_script, "_get_home_dir", lambda: str(home_dir))
@@ -1,12 +1,16 @@
 @echo off
 setlocal enabledelayedexpansion
 
-rem --- Parse args: extract plugin=NAME and a positional version (first non-plugin token) ---
+rem --- Parse args: extract plugin=NAME, the clean, changed, pch and unity flags and a positional version (first non-plugin token) ---
 rem Skips the first token (the command name itself) so the dispatch on %1 stays the source of truth.
 rem cmd splits "plugin=NAME" on '=' into two tokens ("plugin" and "NAME"), so the state machine
 rem uses the literal token "plugin" to switch into "expect the value next" mode.
 set "PLUGIN_NAME="
 set "VERSION_ARG="
+set "CLEAN_ARG="
+set "CHANGED_ARG="
+set "PCH_ARG="
+set "UNITY_ARG="
 set "_FIRST=1"
 set "_EXPECT_PLUGIN_VALUE="
 for %%P in (%*) do (
@@ -18,6 +22,14 @@ for %%P in (%*) do (
         set "PLUGIN_NAME=!tok!"
     ) else if /i "!tok!"=="plugin" (
         set "_EXPECT_PLUGIN_VALUE=1"
+    ) else if /i "!tok!"=="clean" (
+        set "CLEAN_ARG=--clean"
+    ) else if /i "!tok!"=="changed" (
+        set "CHANGED_ARG=--changed"
+    ) else if /i "!tok!"=="pch" (
+        set "PCH_ARG=--pch"
+    ) else if /i "!tok!"=="unity" (
+        set "UNITY_ARG=--unity-build"
     ) else (
         if not defined VERSION_ARG set "VERSION_ARG=!tok!"
     )
@@ -32,14 +44,21 @@ if "%1"=="show-doc" goto showdoc
 if "%1"=="tests" goto tests
 if "%1"=="tests-unit" goto tests_unit
 if "%1"=="tests-integration" goto tests_integration
+if "%1"=="tests-affected" goto tests_affected
+if "%1"=="tests-parallel" goto tests_parallel
+if "%1"=="tests-package" goto tests_package
 
 if "%1"=="tests-cov" goto tests_cov
 if "%1"=="tests-cov-unit" goto tests_cov_unit
 if "%1"=="tests-cov-integration" goto tests_cov_integration
 
+if "%1"=="benchmark" goto benchmark
+if "%1"=="profile-plugins" goto profile_plugins
+
 if "%1"=="build" goto build
 if "%1"=="release" goto release
 if "%1"=="dev" goto dev
+if "%1"=="watch" goto watch
 if "%1"=="add-plugin" goto add_plugin
 
 echo Unknown command: %1
@@ -58,9 +77,14 @@ echo Available commands:
 echo   dev                        Dev build (builds all Maya versions)
 echo   dev <VERSION>               Dev build for specific Maya version
 echo   dev [VERSION] [plugin=NAME] Dev build (and deploy) - optionally filtered to one plugin
+echo   watch [VERSION]             Dev build, then rebuild and redeploy the changed plugins on save
 echo   build <VERSION>            Build debug for specific Maya version
 echo   build VERSION [plugin=NAME] Build debug (no deploy) - optionally filtered to one plugin
 echo   plugin=NAME is optional. When set, only the named C++ plugin is built.
+echo   clean is optional. When set, the build directory is wiped before building.
+echo   changed is optional. When set, only the C++ plugins changed since their last build are built.
+echo   pch is optional. When set, the Maya devkit headers are precompiled once and shared between the plugins.
+echo   unity is optional. When set, the sources of each plugin are compiled in unity batches.
 echo   release                     Release build
 echo   add-plugin <NAME>           Add a new C++ plugin to the project
 echo   docs                        Build documentation
@@ -69,9 +93,14 @@ echo   show-doc                    Open documentation in browser
 echo   tests                       Run all tests
 echo   tests-unit                  Run unit tests
 echo   tests-integration           Run integration tests
+echo   tests-affected              Run only the tests affected by the changes since the last run
+echo   tests-parallel              Run all tests sharded across warm mayapy workers
+echo   tests-package               Run the tests of the package script (no Maya needed)
 echo   tests-cov                   Run all tests with coverage
 echo   tests-cov-unit              Run unit tests with coverage
 echo   tests-cov-integration       Run integration tests with coverage
+echo   benchmark                   Run the package script benchmarks and compare with the last saved run
+echo   profile-plugins             Load each deployed plugin in a fresh mayapy and compare with the baseline
 exit /b 0
 
 :docs
@@ -98,6 +127,21 @@ set PYTHONPATH=%CD%\src;%PYTHONPATH%
 mayapy tests\integration\invoke.py
 exit /b 0
 
+:tests_affected
+set PYTHONPATH=%CD%\src;%PYTHONPATH%
+mayapy tests\unit\invoke.py --impact-affected --impact-record
+mayapy tests\integration\invoke.py --impact-affected --impact-record
+exit /b 0
+
+:tests_parallel
+rem extra arguments are passed on, e.g. make.bat tests-parallel --workers 4 --coverage --watch
+python tests\shard_runner.py %2 %3 %4 %5 %6 %7 %8 %9
+exit /b %errorlevel%
+
+:tests_package
+python tests\package_script\invoke.py %2 %3 %4 %5 %6 %7 %8 %9
+exit /b %errorlevel%
+
 :tests_cov
 mayapy -m coverage erase
 call make.bat tests-cov-unit
@@ -115,26 +159,39 @@ set PYTHONPATH=%CD%\src;%PYTHONPATH%
 mayapy -m coverage run tests\integration\invoke.py
 exit /b 0
 
+:benchmark
+python -m pytest benchmarks --benchmark-compare
+exit /b 0
+
+:profile_plugins
+rem extra arguments are passed on, e.g. make.bat profile-plugins --save-plugin-baseline
+python package\package.py --profile-plugins %2 %3 %4 %5 %6
+exit /b %errorlevel%
+
 :build
 if "!VERSION_ARG!"=="" goto missing_version
 if "!PLUGIN_NAME!"=="" (
-    python package\package.py --build !VERSION_ARG!
+    python package\package.py --build !VERSION_ARG! !CLEAN_ARG! !CHANGED_ARG! !PCH_ARG! !UNITY_ARG!
 ) else (
-    python package\package.py --build !VERSION_ARG! --plugin !PLUGIN_NAME!
+    python package\package.py --build !VERSION_ARG! --plugin !PLUGIN_NAME! !CLEAN_ARG! !PCH_ARG! !UNITY_ARG!
 )
 exit /b 0
 
 :dev
 if "!PLUGIN_NAME!"=="" (
-    python package\package.py --dev !VERSION_ARG!
+    python package\package.py --dev !VERSION_ARG! !CLEAN_ARG! !CHANGED_ARG! !PCH_ARG! !UNITY_ARG!
 ) else (
-    python package\package.py --dev !VERSION_ARG! --plugin !PLUGIN_NAME!
+    python package\package.py --dev !VERSION_ARG! --plugin !PLUGIN_NAME! !CLEAN_ARG! !PCH_ARG! !UNITY_ARG!
 )
 exit /b 0
 
+:watch
+python package\package.py --dev !VERSION_ARG! --watch !CLEAN_ARG! !PCH_ARG! !UNITY_ARG!
+exit /b 0
+
 :release
 
-python package/package.py --release
+python package/package.py --release !CLEAN_ARG! !PCH_ARG! !UNITY_ARG!
 exit /b 0
 
 :missing_version
@@ -159,6 +216,7 @@ echo.
 echo ERROR: Plugin name is required.
 echo Usage:
 echo   make.bat add-plugin myPlugin
+echo   make.bat add-plugin "pluginA,pluginB"
 exit /b 1
 
 :doctor
@@ -0,0 +1,126 @@
+"""Utility module to extract devkit archives in a single streaming pass."""
+from pathlib import Path, PurePosixPath
+import shutil
+import sys
+import tarfile
+import time
+import zipfile
+
+CHUNK_SIZE = 1 << 20
+
+# Errors raised for corrupt or truncated archives
+ARCHIVE_ERRORS = (tarfile.TarError, zipfile.BadZipFile, EOFError)
+
+# Top level folders of devkitBase which are needed to build plugins
+DEVKIT_BUILD_FOLDERS = ("include", "lib", "cmake")
+
+
+def is_devkit_build_member(name):
+    """Return True if the archive member is needed to build plugins.
+
+    Keeps devkitBase/include, devkitBase/lib and every cmake file or folder,
+    and skips the examples, docs and other devkit content.
+    """
+    parts = PurePosixPath(name.replace("\\", "/")).parts
+    parts = [part for part in parts if part not in (".", "")]
+    if "devkitBase" in parts:
+        parts = parts[parts.index("devkitBase") + 1:]
+    if not parts:
+        return True
+    if parts[0] in DEVKIT_BUILD_FOLDERS or "cmake" in parts:
+        return True
+    return parts[-1].endswith(".cmake") or parts[-1] == "CMakeLists.txt"
+
+
+def _is_safe_member(name):
+    """Return True if the archive member stays inside the extraction folder."""
+    path = PurePosixPath(name.replace("\\", "/"))
+    if not path.parts or path.is_absolute():
+        return False
+    return ".." not in path.parts and ":" not in path.parts[0]
+
+
+class ExtractionStats:
+    """Count the bytes and files of an extraction and report its throughput."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.files = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.compressed_bytes = 0
+
+    def report(self, label):
+        """Print the extraction throughput."""
+        elapsed = max(time.perf_counter() - self.start, 1e-6)
+        megabytes = self.bytes / (1 << 20)
+        compressed_megabytes = self.compressed_bytes / (1 << 20)
+        skipped = f", skipped {self.skipped} files" if self.skipped else ""
+        sys.stdout.write(
+            f"Extracted {self.files} files ({megabytes:.1f} MB) of {label} in {elapsed:.1f}s{skipped}. "
+            f"{megabytes / elapsed:.1f} MB/s extracted, {compressed_megabytes / elapsed:.1f} MB/s compressed.\n"
+        )
+
+
+class CountingReader:
+    """File-like wrapper which counts the bytes read through it."""
+
+    def __init__(self, file_object, stats):
+        self._file_object = file_object
+        self._stats = stats
+
+    def read(self, size=-1):
+        """Read from the wrapped file object."""
+        data = self._file_object.read(size)
+        self._stats.compressed_bytes += len(data)
+        return data
+
+
+def extract_tar_stream(file_object, destination, member_filter=None, stats=None):
+    """Extract a gzip compressed tar archive while it is read from `file_object`.
+
+    The archive is read front to back exactly once, so `file_object` can be a
+    network stream. Members rejected by `member_filter` are skipped.
+    """
+    destination = Path(destination)
+    stats = stats or ExtractionStats()
+    # use the safe "data" extraction filter where this Python has it
+    extract_kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    with tarfile.open(fileobj=CountingReader(file_object, stats), mode="r|gz") as archive:
+        for member in archive:
+            if not _is_safe_member(member.name) or (member_filter and not member_filter(member.name)):
+                stats.skipped += 1
+                continue
+            if not (member.isfile() or member.isdir() or member.issym() or member.islnk()):
+                stats.skipped += 1
+                continue
+            if (member.issym() or member.islnk()) and not _is_safe_member(member.linkname):
+                stats.skipped += 1
+                continue
+            archive.extract(member, destination, **extract_kwargs)
+            if member.isfile():
+                stats.files += 1
+                stats.bytes += member.size
+    return stats
+
+
+def extract_zip(archive_path, destination, member_filter=None, stats=None):
+    """Extract a zip archive in one pass, skipping the members rejected by `member_filter`."""
+    destination = Path(destination)
+    stats = stats or ExtractionStats()
+    with zipfile.ZipFile(archive_path) as archive:
+        for member in archive.infolist():
+            if not _is_safe_member(member.filename) or (member_filter and not member_filter(member.filename)):
+                stats.skipped += 1
+                continue
+            target_path = destination / member.filename
+            if member.is_dir():
+                target_path.mkdir(parents=True, exist_ok=True)
+                continue
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            with archive.open(member) as source, open(target_path, "wb") as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+            stats.files += 1
+            stats.bytes += member.file_size
+            stats.compressed_bytes += member.compress_size
+    return stats
@@ -0,0 +1,63 @@
+"""Utility module to read build information from the CMake File API.
+
+See https://cmake.org/cmake/help/latest/manual/cmake-file-api.7.html
+"""
+from pathlib import Path
+import json
+
+CODEMODEL_QUERY = Path(".cmake") / "api" / "v1" / "query" / "codemodel-v2"
+REPLY_DIR = Path(".cmake") / "api" / "v1" / "reply"
+
+LIBRARY_TARGET_TYPES = ("SHARED_LIBRARY", "MODULE_LIBRARY")
+
+
+def request_codemodel(build_dir):
+    """Ask CMake to write the codemodel reply on the next configure."""
+    query_path = Path(build_dir) / CODEMODEL_QUERY
+    query_path.parent.mkdir(parents=True, exist_ok=True)
+    query_path.touch()
+
+
+def has_codemodel_reply(build_dir):
+    """Return True if CMake wrote a reply index into the build directory."""
+    reply_dir = Path(build_dir) / REPLY_DIR
+    return reply_dir.is_dir() and any(reply_dir.glob("index-*.json"))
+
+
+def _load_reply(reply_dir, file_name):
+    """Load a JSON file of the reply directory."""
+    with open(reply_dir / file_name, "r", encoding="utf-8") as reply_file:
+        return json.load(reply_file)
+
+
+def get_library_artifacts(build_dir, build_type, extension):
+    """Return {target name: artifact path} of every library target built by CMake.
+
+    The paths come from the codemodel reply of the last configure, so no
+    build tree walk is needed. Only artifacts with the given extension
+    (e.g. ".so") are returned, whether they were built yet or not. Returns
+    an empty dictionary if CMake did not write a reply (yet).
+    """
+    build_dir = Path(build_dir)
+    reply_dir = build_dir / REPLY_DIR
+    if not has_codemodel_reply(build_dir):
+        return {}
+    # the latest index file sorts last
+    index = _load_reply(reply_dir, sorted(reply_dir.glob("index-*.json"))[-1].name)
+    codemodel_file = index["reply"]["codemodel-v2"]["jsonFile"]
+    codemodel = _load_reply(reply_dir, codemodel_file)
+    configurations = codemodel["configurations"]
+    configuration = next((config for config in configurations if config["name"] == build_type), configurations[0])
+
+    artifacts = {}
+    for target in configuration["targets"]:
+        target_data = _load_reply(reply_dir, target["jsonFile"])
+        if target_data["type"] not in LIBRARY_TARGET_TYPES:
+            continue
+        for artifact in target_data.get("artifacts", []):
+            artifact_path = Path(artifact["path"])
+            if not artifact_path.is_absolute():
+                artifact_path = build_dir / artifact_path
+            if artifact_path.suffix == extension:
+                artifacts[target_data["name"]] = artifact_path
+    return artifacts
@@ -0,0 +1,238 @@
+"""Utility module for the optional local build daemon.
+
+The daemon is a long-running process which listens on a Unix socket of the
+project. Clients send it one JSON request per connection, with their working
+directory and environment. Requests are queued and run one after the other
+in the daemon process, so the Python side (interpreter startup, imports,
+definitions, devkit validation) is paid once. Everything a request writes to
+stdout and stderr, including the output of CMake and the compilers, is
+streamed back to its client.
+
+Messages are JSON lines: {"output": text} while the request runs, and a
+final {"exit": code}. When its own sources changed, the daemon answers
+{"restart": true} instead, and restarts once the queued requests are done.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import os
+import queue
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import traceback
+
+
+def is_supported():
+    """Return True if the platform supports Unix sockets."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def get_socket_path(repo_root):
+    """Return the socket path of the daemon of the project.
+
+    The path is kept short (Unix socket paths are limited to ~100 bytes),
+    so it lives in the temp folder and is named after a hash of the project path.
+    """
+    repo_hash = hashlib.sha256(str(Path(repo_root).resolve()).encode("utf-8")).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / f"maya-package-{repo_hash}.sock"
+
+
+def _send_message(connection, message):
+    connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def _forward_output(read_fd, send):
+    """Send everything written to the pipe until all of its write ends are closed."""
+    for data in iter(lambda: os.read(read_fd, 65536), b""):
+        try:
+            send({"output": data.decode("utf-8", errors="replace")})
+        except OSError:
+            # the client went away, keep draining so the request can finish
+            pass
+
+
+def _run_captured(function, send):
+    """Run function with the stdout and stderr file descriptors redirected to send().
+
+    Redirecting the file descriptors (not just sys.stdout) also captures the
+    output of subprocesses and worker processes.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    read_fd, write_fd = os.pipe()
+    saved_fds = os.dup(1), os.dup(2)
+    os.dup2(write_fd, 1)
+    os.dup2(write_fd, 2)
+    os.close(write_fd)
+    forwarder = threading.Thread(target=_forward_output, args=(read_fd, send), daemon=True)
+    forwarder.start()
+    try:
+        return function()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved_fds[0], 1)
+        os.dup2(saved_fds[1], 2)
+        for saved_fd in saved_fds:
+            os.close(saved_fd)
+        forwarder.join()
+        os.close(read_fd)
+
+
+@contextmanager
+def _environment(env):
+    """Run the block with the environment of the client (e.g. its CMake, devkit and compiler cache variables)."""
+    if env is None:
+        yield
+        return
+    saved_env = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+
+def _sources_stamp(source_dir):
+    """Return the modification times of the Python files of the folder."""
+    if source_dir is None:
+        return {}
+    return {path.name: path.stat().st_mtime_ns for path in Path(source_dir).glob("*.py")}
+
+
+def _run_request(handler, request):
+    """Call the handler and return its exit code."""
+    try:
+        return handler(request) or 0
+    except SystemExit as e:
+        if isinstance(e.code, int) or e.code is None:
+            return e.code or 0
+        sys.stdout.write(f"{e.code}\n")
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def _worker(requests, handler):
+    """Run the queued requests one at a time."""
+    while True:
+        request, connection = requests.get()
+        with connection:
+            def send(message):
+                _send_message(connection, message)
+            sys.__stdout__.write(f"Running {' '.join(request.get('argv', []))}\n")
+            with _environment(request.get("env")):
+                exit_code = _run_captured(lambda: _run_request(handler, request), send)
+            try:
+                send({"exit": exit_code})
+            except OSError:
+                pass
+        requests.task_done()
+
+
+def serve(socket_path, handler, source_dir=None, restart_argv=None):
+    """Serve requests on the Unix socket until interrupted.
+
+    `handler` is called with each request dictionary and returns an exit code.
+    When a Python file of `source_dir` changes, the daemon would keep running
+    the old code: the next request is sent back to its client, and the daemon
+    restarts with `restart_argv` (the arguments after the Python executable)
+    once the queued requests are done.
+    """
+    socket_path = Path(socket_path)
+    if send_request(socket_path, {"ping": True}, output=None) is not None:
+        raise RuntimeError(f"A build daemon is already listening on {socket_path}.")
+    if socket_path.exists():
+        socket_path.unlink()
+    # flush every line so the streamed output is not held back in the buffer
+    sys.stdout.reconfigure(line_buffering=True)
+    requests = queue.Queue()
+    threading.Thread(target=_worker, args=(requests, handler), daemon=True).start()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    os.chmod(socket_path, 0o600)
+    server.listen()
+    sys.stdout.write(f"Build daemon listening on {socket_path}. Press Ctrl+C to stop.\n")
+    # clean up the socket when killed, too
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    sources_stamp = _sources_stamp(source_dir)
+    restart = False
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection.makefile("r", encoding="utf-8") as reader:
+                line = reader.readline()
+            try:
+                request = json.loads(line)
+            except ValueError:
+                connection.close()
+                continue
+            if request.get("ping"):
+                with connection:
+                    _send_message(connection, {"exit": 0})
+                continue
+            if restart_argv and _sources_stamp(source_dir) != sources_stamp:
+                with connection:
+                    _send_message(connection, {"restart": True})
+                sys.stdout.write(f"Sources in {source_dir} changed. Restarting the build daemon...\n")
+                requests.join()
+                restart = True
+                break
+            if requests.unfinished_tasks:
+                _send_message(connection, {"output": f"Build daemon is busy. Queued behind {requests.unfinished_tasks} request(s).\n"})
+            requests.put((request, connection))
+    except KeyboardInterrupt:
+        sys.stdout.write("Stopped the build daemon.\n")
+    finally:
+        server.close()
+        socket_path.unlink(missing_ok=True)
+    if restart:
+        sys.stdout.flush()
+        os.execv(sys.executable, [sys.executable, *restart_argv])
+
+
+def send_request(socket_path, request, output=sys.stdout):
+    """Send the request to the daemon and stream its output.
+
+    Returns the exit code of the request, or None if no daemon is listening,
+    or the daemon is restarting to load changed sources or stopped before
+    answering.
+    """
+    if not is_supported() or not Path(socket_path).exists():
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(socket_path))
+    except OSError:
+        client.close()
+        return None
+    answered = False
+    with client, client.makefile("r", encoding="utf-8") as reader:
+        try:
+            client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            for line in reader:
+                answered = True
+                message = json.loads(line)
+                if "output" in message and output:
+                    output.write(message["output"])
+                    output.flush()
+                if message.get("restart"):
+                    if output:
+                        output.write("The build daemon is restarting to load the changed package sources. "
+                                     "Running without it.\n")
+                    return None
+                if "exit" in message:
+                    return message["exit"]
+        except ConnectionResetError:
+            # a daemon shutting down (e.g. to restart) drops the connections it did not accept yet
+            if not answered:
+                return None
+            raise
+    return 1 if answered else None
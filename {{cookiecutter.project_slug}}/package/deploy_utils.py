@@ -0,0 +1,112 @@
+"""Utility module to incrementally deploy files into a folder.
+
+Every deploy folder keeps a manifest of the files it received, with the
+hash, size and modification time of their source. Only new or changed files
+are written, each one through a temporary file and an atomic rename, so a
+Maya session reloading a plugin never sees a half-written binary. Files of
+the manifest which are not deployed anymore are pruned.
+"""
+from pathlib import Path
+import json
+import os
+import shutil
+import sys
+
+try:
+    from . import download_utils
+except ImportError:
+    import download_utils
+
+MANIFEST_NAME = ".deploy_manifest.json"
+
+
+def load_manifest(target_dir):
+    """Return the deploy manifest of the folder, or an empty one."""
+    manifest_path = Path(target_dir) / MANIFEST_NAME
+    if not manifest_path.is_file():
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except ValueError:
+        return {}
+
+
+def _write_atomic(target_path, write):
+    """Call `write` with a temporary path next to target_path and rename it over target_path."""
+    temp_path = target_path.with_name(f".{target_path.name}.tmp")
+    try:
+        write(temp_path)
+        os.replace(temp_path, target_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def save_manifest(target_dir, manifest):
+    """Write the deploy manifest of the folder."""
+    def _write(temp_path):
+        with open(temp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=4, sort_keys=True)
+    _write_atomic(Path(target_dir) / MANIFEST_NAME, _write)
+
+
+def sync_files(sources, target_dir, managed_names=None):
+    """Deploy the `sources` ({file name: source path}) into target_dir.
+
+    A source is skipped without hashing when its size and modification time
+    match the manifest, and skipped after hashing when only its time changed.
+
+    Manifest entries without a source are deleted from target_dir. With
+    `managed_names`, only those names are considered for pruning (e.g. when
+    a single plugin is deployed). Files which were never deployed through
+    the manifest are left alone.
+
+    Returns a dictionary with the lists of copied, unchanged and pruned names.
+    """
+    target_dir = Path(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(target_dir)
+    result = {"copied": [], "unchanged": [], "pruned": []}
+
+    for name, source_path in sorted(sources.items()):
+        source_stat = source_path.stat()
+        target_path = target_dir / name
+        entry = manifest.get(name)
+        if entry and target_path.is_file() and target_path.stat().st_size == entry["size"]:
+            if entry["size"] == source_stat.st_size and entry["mtime_ns"] == source_stat.st_mtime_ns:
+                result["unchanged"].append(name)
+                continue
+            digest = download_utils.hash_file(source_path)
+            if digest == entry["sha256"]:
+                entry["mtime_ns"] = source_stat.st_mtime_ns
+                result["unchanged"].append(name)
+                continue
+        else:
+            digest = download_utils.hash_file(source_path)
+        _write_atomic(target_path, lambda temp_path: shutil.copy2(source_path, temp_path))
+        manifest[name] = {"sha256": digest, "size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns}
+        result["copied"].append(name)
+
+    prunable = set(manifest) if managed_names is None else set(manifest) & set(managed_names)
+    for name in sorted(prunable - set(sources)):
+        stale_path = target_dir / name
+        if stale_path.is_file():
+            stale_path.unlink()
+        del manifest[name]
+        result["pruned"].append(name)
+
+    save_manifest(target_dir, manifest)
+    return result
+
+
+def report(result, target_dir):
+    """Print what a sync_files call did."""
+    for name in result["copied"]:
+        sys.stdout.write(f"Copied {name} to deploy folder.\n")
+    for name in result["pruned"]:
+        sys.stdout.write(f"Removed stale {name} from deploy folder.\n")
+    sys.stdout.write(
+        f"Deployed {len(result['copied'])} changed, {len(result['unchanged'])} unchanged "
+        f"and pruned {len(result['pruned'])} files in {target_dir}.\n"
+    )
@@ -0,0 +1,146 @@
+"""Utility module to download files into a machine-wide, verified cache.
+
+Downloads resume from partial files with HTTP Range requests and are
+verified with SHA-256 checksums. A verified file is never downloaded again,
+not even from another clone of the project on the same machine.
+
+The cache lives in the directory set by the MAYA_DEVKIT_CACHE environment
+variable, or in the user's cache folder by default.
+"""
+from pathlib import Path
+import hashlib
+import os
+import platform
+import sys
+import urllib.parse
+
+CHUNK_SIZE = 1 << 20
+
+
+def get_cache_dir():
+    """Return the machine-wide download cache directory."""
+    if os.getenv("MAYA_DEVKIT_CACHE"):
+        return Path(os.getenv("MAYA_DEVKIT_CACHE"))
+    if platform.system().lower() == "windows":
+        return Path(os.getenv("LOCALAPPDATA", Path.home())) / "maya_devkit_cache"
+    return Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "maya_devkit_cache"
+
+
+def get_cache_path(url, cache_dir=None):
+    """Return the path the given url is cached at."""
+    cache_dir = Path(cache_dir) if cache_dir else get_cache_dir()
+    file_name = Path(urllib.parse.unquote(urllib.parse.urlparse(url).path)).name or "download"
+    url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{url_hash}-{file_name}"
+
+
+def hash_file(file_path):
+    """Return the SHA-256 hex digest of the file."""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as file_data:
+        for chunk in iter(lambda: file_data.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class _TeeReader:
+    """File-like reader which copies everything read from a response into a file and a hasher."""
+
+    def __init__(self, response, target_file, hasher):
+        self._response = response
+        self._target_file = target_file
+        self._hasher = hasher
+        self.received = 0
+
+    def read(self, size=-1):
+        """Read from the response and copy the data."""
+        data = self._response.read(size if size and size > 0 else CHUNK_SIZE)
+        self._target_file.write(data)
+        self._hasher.update(data)
+        self.received += len(data)
+        return data
+
+
+def download(url, dest_path, expected_sha256=None, timeout=60, stream_consumer=None):
+    """Download the url to dest_path and return its SHA-256 hex digest.
+
+    The data is written to `<dest_path>.part` first. If that file exists
+    from an interrupted download, only the missing bytes are requested.
+    The file is moved to dest_path once it is complete and matches
+    `expected_sha256` (if given). A truncated transfer raises an OSError and
+    keeps the partial file for the next attempt. A checksum mismatch raises a
+    ValueError and deletes it.
+
+    If `stream_consumer` is given and the download starts from the first
+    byte, it is called with a file-like reader of the incoming bytes, so the
+    data can be processed (e.g. extracted) while it arrives. It is not
+    called when a partial download is resumed.
+    """
+    dest_path = Path(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = dest_path.with_name(f"{dest_path.name}.part")
+    hasher = hashlib.sha256()
+    offset = 0
+    if part_path.is_file():
+        offset = part_path.stat().st_size
+        with open(part_path, "rb") as part_file:
+            for chunk in iter(lambda: part_file.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+
+    # imported here, urllib.request is slow to import and only needed for downloads
+    import urllib.error
+    import urllib.request
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    try:
+        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout)
+    except urllib.error.HTTPError as e:
+        # 416: the partial file already holds every byte
+        if e.code != 416 or not offset:
+            raise
+        response = None
+
+    if response is not None:
+        with response:
+            if offset and response.status != 206:
+                sys.stdout.write(f"Server does not support resuming {url}. Downloading from scratch.\n")
+                offset = 0
+                hasher = hashlib.sha256()
+            elif offset:
+                sys.stdout.write(f"Resuming download of {url} from byte {offset}.\n")
+            expected_length = response.headers.get("Content-Length")
+            with open(part_path, "ab" if offset else "wb") as part_file:
+                reader = _TeeReader(response, part_file, hasher)
+                if stream_consumer and not offset:
+                    stream_consumer(reader)
+                # read whatever the consumer left (e.g. archive padding)
+                for _ in iter(lambda: reader.read(CHUNK_SIZE), b""):
+                    pass
+                received = reader.received
+        if expected_length is not None and received < int(expected_length):
+            raise OSError(f"Download of {url} was interrupted after {offset + received} bytes. Run again to resume.")
+
+    digest = hasher.hexdigest()
+    if expected_sha256 and digest != expected_sha256.lower():
+        part_path.unlink()
+        raise ValueError(f"Checksum mismatch for {url}. Expected {expected_sha256}, got {digest}.")
+    os.replace(part_path, dest_path)
+    return digest
+
+
+def fetch(url, expected_sha256=None, cache_dir=None, stream_consumer=None):
+    """Return the (path, sha256) of the url in the verified download cache.
+
+    The url is only downloaded when the cache does not hold a verified copy
+    (matching `expected_sha256`, if given). `stream_consumer` is passed on to
+    download(), so it is only called when the url is actually downloaded.
+    """
+    cache_path = get_cache_path(url, cache_dir)
+    stamp_path = cache_path.with_name(f"{cache_path.name}.sha256")
+    if cache_path.is_file() and stamp_path.is_file():
+        digest, size = stamp_path.read_text().split()
+        if int(size) == cache_path.stat().st_size and (not expected_sha256 or digest == expected_sha256.lower()):
+            sys.stdout.write(f"Using verified cached download {cache_path}.\n")
+            return cache_path, digest
+    digest = download(url, cache_path, expected_sha256=expected_sha256, stream_consumer=stream_consumer)
+    stamp_path.write_text(f"{digest} {cache_path.stat().st_size}\n")
+    return cache_path, digest
@@ -1,8 +1,26 @@
-"""Drag & Drop installer for Maya 2022+"""
+"""Drag & Drop installer for Maya 2022+
+
+Only the plugins of the running platform and Maya version are installed,
+together with everything shared by all of them (tools, python plugins,
+docs). Plugins of other Maya versions installed earlier from another Maya
+are kept up to date.
+
+An install manifest in the installed module records the hash of every file.
+Files whose hash did not change are hard linked from the current install
+instead of copied again, the rest is copied into a staging folder next to the
+module which then replaces it with two renames, so Maya never sees a half
+installed module. On Windows the folder of a module whose plugins are loaded
+can not be renamed: the install then stops, keeps the current module and asks
+to unload the plugins or restart Maya first.
+"""
 from pathlib import Path
+import hashlib
+import json
+import os
 import platform
 import sys
 import shutil
+import time
 
 # confirm the maya python interpreter
 CONFIRMED = False
@@ -13,6 +31,15 @@ try:
 except ImportError:
     CONFIRMED = False
 
+MANIFEST_NAME = "install_manifest.json"
+# bumped when the manifest format changes, older manifests are ignored
+MANIFEST_FORMAT = 1
+PLATFORMS = ("windows", "linux", "darwin")
+
+
+class ModuleInUseError(OSError):
+    """The installed module can not be replaced, e.g. Windows locks the files of loaded plugins."""
+
 
 def onMayaDroppedPythonFile(*args, **kwargs):
     if sys.version_info.major < 3:
@@ -23,33 +50,185 @@ def onMayaDroppedPythonFile(*args, **kwargs):
     _add_module()
 
 
+def _file_hash(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _size(path):
+    try:
+        return path.stat().st_size
+    except OSError:
+        return None
+
+
+def _is_platform_folder(name):
+    """Return True for the plugin folders of a platform and Maya version, e.g. windows-2025."""
+    return name.split("-", 1)[0] in PLATFORMS and "-" in name
+
+
+def _load_manifest(module_path):
+    try:
+        manifest = json.loads((module_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("format") == MANIFEST_FORMAT else {}
+
+
+def _collect(source_module, plugin_folders):
+    """Return the folders and the files to install by their path relative to the module."""
+    folders, files = [], {}
+    for path in sorted(source_module.rglob("*")):
+        relative = path.relative_to(source_module)
+        parts = relative.parts
+        # the plugins of the other platforms and Maya versions
+        if len(parts) > 1 and parts[0] == "plugins" and _is_platform_folder(parts[1]) \
+                and parts[1] not in plugin_folders:
+            continue
+        if path.is_dir():
+            folders.append(relative.as_posix())
+        elif relative.as_posix() != MANIFEST_NAME:
+            files[relative.as_posix()] = path
+    return folders, files
+
+
+def _remove_leftovers(destination_module):
+    """Remove the staging and backup folders an interrupted install left behind."""
+    for pattern in (f".{destination_module.name}.staging-*", f".{destination_module.name}.old-*"):
+        for leftover in destination_module.parent.glob(pattern):
+            shutil.rmtree(leftover, ignore_errors=True)
+
+
+def _swap(staging, destination):
+    """Replace the destination folder with the staging folder."""
+    backup = None
+    if destination.exists():
+        backup = destination.with_name(f".{destination.name}.old-{os.getpid()}-{int(time.time())}")
+        try:
+            os.rename(destination, backup)
+        except OSError as e:
+            # nothing was replaced yet, the current install stays as it is
+            raise ModuleInUseError(e.errno, f"{destination} is in use", e.filename) from e
+    try:
+        os.rename(staging, destination)
+    except OSError:
+        if backup is not None:
+            os.rename(backup, destination)
+        raise
+    if backup is not None:
+        # a plugin loaded by this Maya can not be deleted on Windows, the next install removes it
+        shutil.rmtree(backup, ignore_errors=True)
+
+
+def _install_module(source_module, destination_module, plugin_folder, stats):
+    """Install a module folder incrementally. Return the plugin folders it installed."""
+    _remove_leftovers(destination_module)
+    manifest = _load_manifest(destination_module)
+    installed = manifest.get("files", {})
+    source_plugins = source_module / "plugins"
+    available = {path.name for path in source_plugins.iterdir() if path.is_dir()} if source_plugins.is_dir() else set()
+    # keep the plugins installed from another Maya, as long as this package still has them
+    plugin_folders = sorted(({plugin_folder} | set(manifest.get("plugin_folders", []))) & available)
+    folders, files = _collect(source_module, plugin_folders)
+    hashes = {relative: _file_hash(path) for relative, path in files.items()}
+
+    def _unchanged(relative):
+        record = installed.get(relative)
+        return record is not None and record["sha256"] == hashes[relative] \
+            and _size(destination_module / relative) == record["size"]
+
+    if set(installed) == set(files) and manifest.get("plugin_folders") == plugin_folders \
+            and all(_unchanged(relative) for relative in files):
+        stats["unchanged"] += len(files)
+        return plugin_folders
+
+    # stage next to the destination, renames are only atomic on the same file system
+    destination_module.parent.mkdir(parents=True, exist_ok=True)
+    staging = destination_module.with_name(f".{destination_module.name}.staging-{os.getpid()}-{int(time.time())}")
+    staging.mkdir()
+    try:
+        for relative in folders:
+            (staging / relative).mkdir(parents=True, exist_ok=True)
+        for relative, source in files.items():
+            target = staging / relative
+            if _unchanged(relative):
+                try:
+                    os.link(destination_module / relative, target)
+                    stats["unchanged"] += 1
+                    continue
+                except OSError:
+                    # no hard links on this file system, copy it from the package instead
+                    pass
+            shutil.copy2(source, target)
+            stats["copied"] += 1
+            stats["copied_bytes"] += _size(source) or 0
+        (staging / MANIFEST_NAME).write_text(json.dumps({
+            "format": MANIFEST_FORMAT,
+            "plugin_folders": plugin_folders,
+            "files": {relative: {"sha256": hashes[relative], "size": _size(path)} for relative, path in files.items()},
+        }, indent=1, sort_keys=True), encoding="utf-8")
+        _swap(staging, destination_module)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return plugin_folders
+
+
+def _install_file(source, destination, stats):
+    """Replace a file at the top of the modules folder (the .mod file) if it changed."""
+    if _size(destination) == _size(source) and _file_hash(destination) == _file_hash(source):
+        stats["unchanged"] += 1
+        return
+    staging = destination.with_name(f".{destination.name}.staging")
+    shutil.copy2(source, staging)
+    os.replace(staging, destination)
+    stats["copied"] += 1
+    stats["copied_bytes"] += _size(source) or 0
+
+
 def _add_module():
     # Define source and destination paths
     source_modules = Path(__file__).parent / "modules"
     user_maya_dir = Path(cmds.internalVar(uad=True))
     destination_modules = user_maya_dir / "modules"
+    plugin_folder = f"{platform.system().lower()}-{cmds.about(majorVersion=True)}"
+
+    # a package built for other Maya versions only would install without any plugin
+    platform_folders = {path.name for path in source_modules.glob("*/plugins/*")
+                        if path.is_dir() and _is_platform_folder(path.name)}
+    if platform_folders and plugin_folder not in platform_folders:
+        cmds.confirmDialog(title='ERROR:', message=f"This package of {{ cookiecutter.project_name }} has no plugins for {plugin_folder}. \n\nAborting.", button=['OK'],
+                           defaultButton='OK')
+        return
 
     # Ensure the destination 'modules' folder exists
     destination_modules.mkdir(parents=True, exist_ok=True)
 
-    # Copy contents of the source 'modules' folder to the destination
-    for item in source_modules.iterdir():
-        destination_item = destination_modules / item.name
-        if item.is_dir():
-            # Merge directory contents
-            for sub_item in item.rglob("*"):
-                relative_path = sub_item.relative_to(item)
-                target_path = destination_item / relative_path
-                if sub_item.is_dir():
-                    target_path.mkdir(parents=True, exist_ok=True)
-                else:
-                    shutil.copy2(sub_item, target_path)
-        else:
-            # Copy file (overwrite if exists)
-            shutil.copy2(item, destination_item)
+    stats = {"copied": 0, "copied_bytes": 0, "unchanged": 0}
+    start = time.perf_counter()
+    try:
+        for item in source_modules.iterdir():
+            if item.is_dir():
+                _install_module(item, destination_modules / item.name, plugin_folder, stats)
+            else:
+                _install_file(item, destination_modules / item.name, stats)
+    except ModuleInUseError as e:
+        cmds.confirmDialog(title='ERROR:', message=f"{{ cookiecutter.project_name }} could not be updated, its installed files are in use: {e}\n\nThe current install was kept. Unload the {{ cookiecutter.project_name }} plugins in the Plug-in Manager, or restart Maya without loading them, then install again.", button=['OK'],
+                           defaultButton='OK')
+        return
+    except OSError as e:
+        cmds.confirmDialog(title='ERROR:', message=f"{{ cookiecutter.project_name }} could not be installed: {e}\n\nIf its plugins are loaded, restart Maya without loading them and install again.", button=['OK'],
+                           defaultButton='OK')
+        return
+    sys.stdout.write(f"Installed {{ cookiecutter.project_name }} for {plugin_folder} in {time.perf_counter() - start:.1f}s: "
+                     f"copied {stats['copied']} files ({stats['copied_bytes'] / (1024 * 1024):.1f}MB), "
+                     f"{stats['unchanged']} unchanged.\n")
 
     # Confirm installation
     cmds.confirmDialog(
         title="{{ cookiecutter.project_name }} Installed",
         message="{{ cookiecutter.project_name }} installed. Please restart Maya to see the shelf and menu items."
-    )
\ No newline at end of file
+    )
@@ -1,34 +1,99 @@
 """Utility module to inject strings into code and data files."""
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+import os
+import re
 import sys
 import shutil
 
+PLUGIN_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_-]*$")
+PLUGIN_SUBDIRECTORIES_MARKER = "# Plugin Subdirectories"
+_PLUGIN_SUBDIRECTORY_PATTERN = re.compile(r"^\s*add_subdirectory\(src/plugins/cpp/([^)\s]+)\)")
+
 def print_msg(msg):
     """Prints a message to the console."""
     sys.stdout.write(f"{msg}\n")
 
-def add_plugin(plugin_name, main_cmake_file_path, plugin_template_path, src_folder):
-    """Inject the plugin into the main CMakeLists.txt file and create the
-    plugin folder from the plugin template."""
+def _create_plugin_folder(plugin_name, plugin_template_path, src_folder, use_pch=True, unity_build=True):
+    """Create the plugin folder from the plugin template.
 
-    print_msg("Adding plugin to the project...")
+    `use_pch` and `unity_build` set the plugin's own switches for the
+    precompiled devkit headers and unity builds of the project.
+    """
     dest_plugin_path = src_folder / "plugins" / "cpp" / plugin_name
     if dest_plugin_path.is_dir():
         print_msg(f"Plugin folder {dest_plugin_path} already exists. Skipping plugin folder creation.")
-    else:
-        shutil.copytree(plugin_template_path, dest_plugin_path)
-        print_msg(f"Plugin folder created at {dest_plugin_path}.")
+        return
+    shutil.copytree(plugin_template_path, dest_plugin_path)
+    print_msg(f"Plugin folder created at {dest_plugin_path}.")
 
-        plugin_cmake_file_path = dest_plugin_path / "CMakeLists.txt"
-        if not plugin_cmake_file_path.is_file():
-            print_msg(f"Plugin CMakeLists.txt file not found at {plugin_cmake_file_path}. Skipping plugin CMakeLists edit.")
-        else:
-            injector = Injector(plugin_cmake_file_path)
+    plugin_cmake_file_path = dest_plugin_path / "CMakeLists.txt"
+    if not plugin_cmake_file_path.is_file():
+        print_msg(f"Plugin CMakeLists.txt file not found at {plugin_cmake_file_path}. Skipping plugin CMakeLists edit.")
+    else:
+        injector = Injector(plugin_cmake_file_path)
+        with injector.batch():
             injector.replace_string(plugin_name, "--BLUEPRINT--PLUGIN_NAME--")
+            # custom plugin templates may not have the switches
+            injector.replace_string("ON" if use_pch else "OFF", "--BLUEPRINT--USE_PCH--", suppress_warnings=True)
+            injector.replace_string("ON" if unity_build else "OFF", "--BLUEPRINT--UNITY_BUILD--", suppress_warnings=True)
+
+def validate_plugin_names(plugin_names):
+    """Return the plugin names without blanks and duplicates, in their given order.
+
+    Raises a ValueError listing every invalid name, so nothing is created
+    when one of them is wrong. Names with spaces are invalid, CMake would
+    read them as two add_subdirectory arguments.
+    """
+    plugin_names = list(dict.fromkeys(name.strip() for name in plugin_names if name.strip()))
+    invalid_names = [name for name in plugin_names if not PLUGIN_NAME_PATTERN.match(name)]
+    if invalid_names:
+        raise ValueError(
+            f"Invalid plugin names: {', '.join(invalid_names)}. Plugin names must start with a letter or "
+            f"an underscore and contain only letters, digits, underscores and hyphens."
+        )
+    return plugin_names
+
+def add_plugin(plugin_name, main_cmake_file_path, plugin_template_path, src_folder, use_pch=True, unity_build=True):
+    """Inject the plugin into the main CMakeLists.txt file and create the
+    plugin folder from the plugin template."""
+    add_plugins([plugin_name], main_cmake_file_path, plugin_template_path, src_folder,
+                use_pch=use_pch, unity_build=unity_build)
+
+def add_plugins(plugin_names, main_cmake_file_path, plugin_template_path, src_folder, jobs=None,
+                use_pch=True, unity_build=True):
+    """Create the folders of all plugins in parallel and add them to the
+    main CMakeLists.txt file with a single, sorted write.
+
+    Plugins which already have an add_subdirectory line are not added again.
+    Set `use_pch` or `unity_build` to False to opt the new plugins out of the
+    precompiled devkit headers or unity builds of the project.
+    """
+    plugin_names = validate_plugin_names(plugin_names)
+    if not plugin_names:
+        return
+
+    print_msg(f"Adding {len(plugin_names)} plugin(s) to the project...")
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(lambda name: _create_plugin_folder(name, plugin_template_path, src_folder, use_pch, unity_build),
+                          plugin_names))
 
     injector = Injector(main_cmake_file_path)
     injector.match_mode = "contains"
-    injector.inject_after([f"add_subdirectory(src/plugins/cpp/{plugin_name})\n"], "# Plugin Subdirectories")
+    registered = {match.group(1) for match in map(_PLUGIN_SUBDIRECTORY_PATTERN.match, injector.content) if match}
+    new_names = [name for name in plugin_names if name not in registered]
+    for name in plugin_names:
+        if name in registered:
+            print_msg(f"Plugin {name} is already in {main_cmake_file_path}. Skipping.")
+    if not new_names:
+        return
+    injector.merge_block_after(
+        [f"add_subdirectory(src/plugins/cpp/{name})\n" for name in new_names],
+        PLUGIN_SUBDIRECTORIES_MARKER,
+        "add_subdirectory(src/plugins/cpp/"
+    )
 
 def _generate_devkit_content(platform, definitions_data):
     """Get the content to inject for the given platform."""
@@ -46,31 +111,71 @@ def inject_release_ci(ci_file_path, definitions_data):
     injector = Injector(ci_file_path)
     injector.match_mode = "contains"
     injector.force = False
-    injector.inject_between(windows_content, "WINDOWS DEVKITS[START]\n", "WINDOWS DEVKITS[END]\n")
-
-    injector = Injector(ci_file_path)
-    injector.match_mode = "contains"
-    injector.force = False
-    injector.inject_between(linux_content, "LINUX DEVKITS[START]\n", "LINUX DEVKITS[END]\n")
-
-    injector = Injector(ci_file_path)
-    injector.match_mode = "contains"
-    injector.force = False
-    injector.inject_between(linux_content, "LINUX GCC9 DEVKITS[START]\n", "LINUX GCC9 DEVKITS[END]\n")
-
+    with injector.batch():
+        injector.inject_between(windows_content, "WINDOWS DEVKITS[START]\n", "WINDOWS DEVKITS[END]\n")
+        injector.inject_between(linux_content, "LINUX DEVKITS[START]\n", "LINUX DEVKITS[END]\n")
+        injector.inject_between(linux_content, "LINUX GCC9 DEVKITS[START]\n", "LINUX GCC9 DEVKITS[END]\n")
+
+
+
+class _MarkerIndex:
+    """Positions of the lines matching the markers looked up so far.
+
+    A marker is found with a single scan the first time it is looked up.
+    splice() keeps the positions of every known marker up to date, so
+    later lookups and edits never rescan the file.
+    """
+
+    def __init__(self, lines):
+        self.lines = lines
+        self._positions = {}
+
+    @staticmethod
+    def _matches(key, line):
+        match_mode, marker = key
+        return line == marker if match_mode == "equal" else marker in line
+
+    def find(self, marker, match_mode, begin_from=0, backward=False):
+        """Return the first (or last, if backward) matching line index from begin_from on."""
+        key = (match_mode, marker)
+        positions = self._positions.get(key)
+        if positions is None:
+            positions = [idx for idx, line in enumerate(self.lines) if self._matches(key, line)]
+            self._positions[key] = positions
+        if backward:
+            return positions[-1] if positions and positions[-1] >= begin_from else None
+        idx = bisect_left(positions, begin_from)
+        return positions[idx] if idx < len(positions) else None
+
+    def splice(self, start, end, new_lines):
+        """Replace lines[start:end] with new_lines in place and shift the known positions."""
+        self.lines[start:end] = new_lines
+        delta = len(new_lines) - (end - start)
+        for key, positions in self._positions.items():
+            head = bisect_left(positions, start)
+            tail = bisect_left(positions, end)
+            added = [start + offset for offset, line in enumerate(new_lines) if self._matches(key, line)]
+            positions[head:] = added + [position + delta for position in positions[tail:]]
 
 
 class Injector:
-    """Inject contents to ASCII files."""
+    """Inject contents to ASCII files.
+
+    Lookups go through a marker index instead of scanning the content, and
+    edits are spliced into the content list in place, so many edits to a
+    large file stay cheap.
+    """
 
     def __init__(self, file_path):
         self.file_path = None
         self.content = None
-        self.search_list = None  # search content may be reversed or not
+        self._index = None
 
         self._search_direction = "forward"
         self._match_mode = "equal"
         self.force = True
+        self._batch_depth = 0
+        self._batch_dirty = False
         self.set_file_path(file_path)
 
     @property
@@ -84,7 +189,6 @@ class Injector:
         if value not in ["forward", "backward"]:
             raise ValueError("Invalid value")
         self._search_direction = value
-        self.search_list = self.__get_search_list()
 
     @property
     def match_mode(self):
@@ -106,41 +210,43 @@ class Injector:
         else:
             raise ValueError("Invalid value")
         self.content = self.read()
-        self.search_list = self.__get_search_list()
+        self._index = _MarkerIndex(self.content)
+
+    @contextmanager
+    def batch(self):
+        """Apply every edit made inside the block in memory and write the file once at the end.
 
-    def __get_search_list(self):
-        if self.search_direction == "forward":
-            return self.content
-        return self.content[::-1]
+        Each edit sees the result of the edits before it, exactly as if they
+        were written one by one. The file is replaced with a single atomic
+        rename when the block exits. If the block raises, none of its edits
+        are written and the in-memory content is restored.
+        """
+        original_content = list(self.content)
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._batch_dirty = False
+            self.content = original_content
+            self._index = _MarkerIndex(self.content)
+            raise
+        self._batch_depth -= 1
+        if not self._batch_depth and self._batch_dirty:
+            self._batch_dirty = False
+            self._dump_content(self.content)
 
     def __add_content(self, new_content, head_end, tail_start):
-        """Adds the new content to the content list.
+        """Splice the new content into the content list and return it.
 
-        * `head_end` is the exclusive end index for the head slice (i.e. content[:head_end]).
-        * `tail_start` is the start index for the tail slice (i.e. content[tail_start:]).
+        * `head_end` is the exclusive end index of the kept head (i.e. content[:head_end]).
+        * `tail_start` is the start index of the kept tail (i.e. content[tail_start:]).
         """
         if isinstance(new_content, str):
             new_content = [new_content]
-
-        if self.search_direction == "forward":
-            # Keep start line by using head_end = start_idx + 1,
-            # keep end line by using tail_start = end_idx
-            added_content = self.content[
-                                :head_end] + new_content + self.content[
-                                tail_start:]
-        else:
-            # search_list is reversed; convert reversed indices to original indices.
-            length = len(self.content)
-            # original_head_end = length - head_end (because head_end is exclusive in reversed)
-            original_head_end = length - head_end
-            # original_tail_start = (length - 1) - tail_start (tail_start is index in reversed for the tail element)
-            original_tail_start = length - 1 - tail_start
-            added_content = (
-                    self.content[
-                        :original_head_end] + new_content + self.content[
-                        original_tail_start:]
-            )
-        return added_content
+        self._index.splice(head_end, tail_start, list(new_content))
+        return self.content
 
     def inject_between(self, new_content, start_line, end_line,
                        suppress_warnings=False):
@@ -154,26 +260,26 @@ class Injector:
                 print_msg(f"File {self.file_path} not found. Aborting.")
             return False
 
-        start_idx = self._find_index(self.search_list, start_line)
+        start_idx = self._find_index(start_line)
         if start_idx is None:
             if self.force:
                 if not suppress_warnings:
                     print_msg(
                         "Start line not found. Injecting at the end of the file.")
-                self._dump_content(self.content + new_content)
+                self._dump_content(self.__add_content(new_content, len(self.content), len(self.content)))
                 return True
             if not suppress_warnings:
                 print_msg("Start line not found. Aborting.")
             return False
 
         # search for end marker after the start marker
-        end_idx = self._find_index(self.search_list, end_line, begin_from=start_idx)
+        end_idx = self._find_index(end_line, begin_from=start_idx, backward=False)
         if end_idx is None:
             if self.force:
                 if not suppress_warnings:
                     print_msg(
                         "End line not found. Injecting at the end of the file.")
-                self._dump_content(self.content + new_content)
+                self._dump_content(self.__add_content(new_content, len(self.content), len(self.content)))
                 return True
             if not suppress_warnings:
                 print_msg("End line not found. Aborting.")
@@ -232,13 +338,13 @@ class Injector:
                 print_msg(f"File {self.file_path} not found. Aborting.")
             return False
 
-        start_idx = self._find_index(self.search_list, line)
+        start_idx = self._find_index(line)
         if start_idx is None:
             if self.force:
                 if not suppress_warnings:
                     print_msg(
                         "Line not found. Injecting at the end of the file.")
-                self._dump_content(self.content + new_content)
+                self._dump_content(self.__add_content(new_content, len(self.content), len(self.content)))
                 return True
             if not suppress_warnings:
                 print_msg("Line not found. Aborting.")
@@ -274,6 +380,39 @@ class Injector:
     #     self._dump_content(injected_content)
     #     return True
 
+    def merge_block_after(self, new_content, line, block_line, suppress_warnings=False):
+        """Merge the new content into the run of lines containing `block_line`
+        right after the line, keeping the run sorted and without duplicates."""
+        if isinstance(new_content, str):
+            new_content = [new_content]
+        if not self.file_path.is_file():
+            if self.force:
+                self._dump_content(self.content)
+                print_msg(f"File {self.file_path} created with new content.")
+                return True
+            if not suppress_warnings:
+                print_msg(f"File {self.file_path} not found. Aborting.")
+            return False
+
+        start_idx = self._find_index(line)
+        if start_idx is None:
+            if self.force:
+                if not suppress_warnings:
+                    print_msg("Line not found. Injecting at the end of the file.")
+                self._dump_content(self.__add_content(sorted(set(new_content)), len(self.content), len(self.content)))
+                return True
+            if not suppress_warnings:
+                print_msg("Line not found. Aborting.")
+            return False
+
+        end_idx = start_idx + 1
+        while end_idx < len(self.content) and block_line in self.content[end_idx]:
+            end_idx += 1
+        block = {block_entry.rstrip("\n") + "\n" for block_entry in self.content[start_idx + 1:end_idx] + new_content}
+        injected_content = self.__add_content(sorted(block), start_idx + 1, end_idx)
+        self._dump_content(injected_content)
+        return True
+
     def inject_before(self, new_content, line, suppress_warnings=False):
         """Injects the new content before the line."""
         if not self.file_path.is_file():
@@ -284,12 +423,12 @@ class Injector:
             if not suppress_warnings:
                 print_msg(f"File {self.file_path} not found. Aborting.")
             return False
-        start_idx = self._find_index(self.search_list, line)
-        if not start_idx:
+        start_idx = self._find_index(line)
+        if start_idx is None:
             if self.force:
                 if not suppress_warnings:
                     print_msg("Line not found. Injecting at the end of the file.")
-                self._dump_content(self.content + new_content)
+                self._dump_content(self.__add_content(new_content, len(self.content), len(self.content)))
                 return True
             if not suppress_warnings:
                 print_msg("Line not found. Aborting.")
@@ -319,12 +458,12 @@ class Injector:
             if not suppress_warnings:
                 print_msg(f"File {self.file_path} not found. Aborting.")
             return False
-        start_idx = self._find_index(self.search_list, line)
-        if not start_idx:
+        start_idx = self._find_index(line)
+        if start_idx is None:
             if self.force:
                 if not suppress_warnings:
                     print_msg("Line not found. Injecting at the end of the file.")
-                self._dump_content(self.content + new_content)
+                self._dump_content(self.__add_content(new_content, len(self.content), len(self.content)))
                 return True
             if not suppress_warnings:
                 print_msg("Line not found. Aborting.")
@@ -344,17 +483,15 @@ class Injector:
             if not suppress_warnings:
                 print_msg(f"File {self.file_path} not found. Aborting.")
             return False
-        new_content = []
-        for line in self.content:
-            if old_string in line:
-                new_content.append(line.replace(old_string, new_string))
-            else:
-                new_content.append(line)
-        if new_content == self.content:
+        line_idx = self._find_index(old_string, match_mode="contains", backward=False)
+        if line_idx is None:
             if not suppress_warnings:
                 print_msg("String not found. Aborting.")
             return False
-        self._dump_content(new_content)
+        while line_idx is not None:
+            self.__add_content(self.content[line_idx].replace(old_string, new_string), line_idx, line_idx + 1)
+            line_idx = self._find_index(old_string, begin_from=line_idx + 1, match_mode="contains", backward=False)
+        self._dump_content(self.content)
         return True
 
     def read(self):
@@ -369,21 +506,28 @@ class Injector:
         return content_list
 
     def _dump_content(self, list_of_lines):
-        """Write the content to the file."""
+        """Write the content to the file.
+
+        Inside a batch() block, only the in-memory content is updated.
+        """
+        if list_of_lines is not self.content:
+            self.content = list(list_of_lines)
+            self._index = _MarkerIndex(self.content)
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
         temp_file_path = (
             self.file_path.parent / f"{self.file_path.stem}_TMP{self.file_path.suffix}"
         )
         with open(temp_file_path, "w+", encoding="utf-8") as temp_file:
             temp_file.writelines(list_of_lines)
-        shutil.move(temp_file_path, self.file_path)
-
-    def _find_index(self, search_list, line, begin_from=0):
-        """Get the index of a line in a list of lines."""
-        if self.match_mode == "equal" and line in search_list:
-            return search_list.index(line)
-
-        if self.match_mode == "contains":
-            for idx in range(begin_from, len(search_list)):
-                if line in search_list[idx]:
-                    return idx
-        return None
+        os.replace(temp_file_path, self.file_path)
+
+    def _find_index(self, line, begin_from=0, backward=None, match_mode=None):
+        """Get the index of the first line matching `line` from begin_from on.
+
+        With the "backward" search direction, the last matching line is returned.
+        """
+        if backward is None:
+            backward = self.search_direction == "backward"
+        return self._index.find(line, match_mode or self.match_mode, begin_from=begin_from, backward=backward)
@@ -0,0 +1,236 @@
+"""Utility module to profile how the deployed plugins affect the startup of Maya.
+
+Every plugin is loaded on its own in a fresh mayapy, so no plugin pays for,
+or benefits from, the libraries another one loaded. The probe records
+
+- load_seconds: the loadPlugin wall time,
+- initialize_seconds: the time spent in initializePlugin. Binaries are loaded
+  with ctypes first (library_seconds) so the following loadPlugin is mostly
+  initializePlugin. For Python plugins it is measured with a profile hook,
+- rss_delta_mb: the resident memory the plugin added,
+- nodes and commands: what the plugin registered.
+
+The results are compared against a baseline saved per platform and Maya
+version. This file is also the probe script run by mayapy, so it only uses
+the standard library.
+"""
+from pathlib import Path
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+PLUGIN_EXTENSIONS = (".mll", ".so", ".bundle", ".py")
+
+# the stub maya package of the tests, to run the profiler without Maya
+STUB_MAYA_PATH = Path(__file__).resolve().parent.parent / "tests" / "maya_stub"
+
+# changes below these are noise, whatever the tolerance
+MIN_SECONDS_CHANGE = 0.005
+MIN_RSS_CHANGE_MB = 1.0
+
+
+def find_mayapy(maya_version):
+    """Return the mayapy of a Maya version, or None if it is not installed.
+
+    MAYAPY_<version> (e.g. MAYAPY_2025) and MAYAPY override the default install locations.
+    """
+    for variable in (f"MAYAPY_{maya_version}", "MAYAPY"):
+        if os.environ.get(variable):
+            return os.environ[variable]
+    system = platform.system().lower()
+    if system == "windows":
+        candidate = Path(os.environ.get("ProgramFiles", "C:/Program Files")) / "Autodesk" / f"Maya{maya_version}" / "bin" / "mayapy.exe"
+    elif system == "darwin":
+        candidate = Path("/Applications/Autodesk") / f"maya{maya_version}" / "Maya.app" / "Contents" / "bin" / "mayapy"
+    else:
+        candidate = Path("/usr/autodesk") / f"maya{maya_version}" / "bin" / "mayapy"
+    return str(candidate) if candidate.is_file() else None
+
+
+def collect_plugins(*plugin_dirs):
+    """Return the plugin files in the folders, binaries and Python plugins alike."""
+    plugins = []
+    for plugin_dir in plugin_dirs:
+        if Path(plugin_dir).is_dir():
+            plugins.extend(sorted(path for path in Path(plugin_dir).iterdir() if path.suffix in PLUGIN_EXTENSIONS))
+    return plugins
+
+
+def _rss_mb():
+    """Return the resident memory of this process in MB (the peak where the current value is not available)."""
+    system = platform.system().lower()
+    if system == "linux":
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    if system == "windows":
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters),
+                                                 counters.cb)
+        return counters.WorkingSetSize / (1024 * 1024)
+    import resource
+    # bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+
+
+def probe(plugin_path, result_path):
+    """Load one plugin into a fresh Maya and write its measurements to result_path. Runs in mayapy."""
+    plugin_path = Path(plugin_path).resolve()
+    import maya.standalone
+    maya.standalone.initialize()
+    from maya import cmds
+
+    result = {"library_seconds": None, "initialize_seconds": None}
+    rss_before = _rss_mb()
+    initialize_calls = []
+    if plugin_path.suffix == ".py":
+        def _profile(frame, event, arg):
+            code = frame.f_code
+            if code.co_name == "initializePlugin" and Path(code.co_filename).resolve() == plugin_path:
+                initialize_calls.append((event, time.perf_counter()))
+        sys.setprofile(_profile)
+    else:
+        import ctypes
+        start = time.perf_counter()
+        try:
+            ctypes.CDLL(str(plugin_path))
+            result["library_seconds"] = time.perf_counter() - start
+        except OSError:
+            # Maya's loadPlugin reports why the library does not load
+            pass
+    start = time.perf_counter()
+    try:
+        cmds.loadPlugin(str(plugin_path), quiet=True)
+    finally:
+        load_seconds = time.perf_counter() - start
+        sys.setprofile(None)
+    name = plugin_path.stem
+    if plugin_path.suffix == ".py":
+        calls = [timestamp for event, timestamp in initialize_calls if event in ("call", "return")]
+        if len(calls) >= 2:
+            result["initialize_seconds"] = calls[-1] - calls[0]
+            result["library_seconds"] = load_seconds - result["initialize_seconds"]
+    else:
+        result["initialize_seconds"] = load_seconds
+        load_seconds += result["library_seconds"] or 0.0
+    result.update(
+        load_seconds=load_seconds,
+        rss_delta_mb=_rss_mb() - rss_before,
+        nodes=sorted(cmds.pluginInfo(name, query=True, dependNode=True) or []),
+        commands=sorted(cmds.pluginInfo(name, query=True, command=True) or []),
+    )
+    Path(result_path).write_text(json.dumps(result), encoding="utf-8")
+    maya.standalone.uninitialize()
+
+
+def profile_plugin(mayapy, plugin_path, python_paths=(), stub_maya=False):
+    """Run the probe of one plugin in a fresh mayapy and return its measurements, or {"error": message}."""
+    env = dict(os.environ)
+    python_path = [str(path) for path in python_paths]
+    if stub_maya:
+        python_path.insert(0, str(STUB_MAYA_PATH))
+    env["PYTHONPATH"] = os.pathsep.join(python_path + [env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        result_path = Path(temp_dir) / "result.json"
+        process = subprocess.run([mayapy, str(Path(__file__).resolve()), str(plugin_path), str(result_path)],
+                                 env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace")
+        if not result_path.is_file():
+            lines = process.stdout.strip().splitlines()
+            return {"error": lines[-1] if lines else f"mayapy exited with code {process.returncode}"}
+        return json.loads(result_path.read_text(encoding="utf-8"))
+
+
+def profile_plugins(plugins, mayapy, python_paths=(), stub_maya=False):
+    """Profile the plugins one at a time and return their measurements by file name."""
+    results = {}
+    for plugin_path in plugins:
+        sys.stdout.write(f"Profiling {Path(plugin_path).name}...\n")
+        results[Path(plugin_path).name] = profile_plugin(mayapy, plugin_path, python_paths, stub_maya)
+    return results
+
+
+def load_baseline(baseline_file, key):
+    """Return the saved results for the key (e.g. linux-2025), or None."""
+    try:
+        return json.loads(Path(baseline_file).read_text(encoding="utf-8")).get(key)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(baseline_file, key, results):
+    """Save the results without errors as the baseline of the key."""
+    baseline_file = Path(baseline_file)
+    try:
+        baselines = json.loads(baseline_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        baselines = {}
+    baselines[key] = {name: result for name, result in results.items() if "error" not in result}
+    baseline_file.parent.mkdir(parents=True, exist_ok=True)
+    baseline_file.write_text(json.dumps(baselines, indent=4, sort_keys=True), encoding="utf-8")
+
+
+def _percent(value, base):
+    return (value - base) / base * 100 if base else 0.0
+
+
+def compare(results, baseline, tolerance_percent):
+    """Return a message for every plugin which loads slower, or uses more memory, than the baseline allows."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if "error" in result or base is None:
+            continue
+        change = result["load_seconds"] - base["load_seconds"]
+        if change > MIN_SECONDS_CHANGE and _percent(result["load_seconds"], base["load_seconds"]) > tolerance_percent:
+            regressions.append(f"{name} loads in {result['load_seconds'] * 1000:.1f}ms, "
+                               f"{_percent(result['load_seconds'], base['load_seconds']):+.0f}% against the baseline.")
+        change = result["rss_delta_mb"] - base["rss_delta_mb"]
+        if change > MIN_RSS_CHANGE_MB and _percent(result["rss_delta_mb"], base["rss_delta_mb"]) > tolerance_percent:
+            regressions.append(f"{name} adds {result['rss_delta_mb']:.1f}MB, {change:+.1f}MB against the baseline.")
+    return regressions
+
+
+def _milliseconds(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def report(results, baseline=None, title="Plugin load profile"):
+    """Print the measurements, with the change against the baseline."""
+    baseline = baseline or {}
+    sys.stdout.write(f"\n{title}\n")
+    sys.stdout.write(f"{'plugin':<32} {'load ms':>10} {'init ms':>10} {'RSS MB':>8} {'vs baseline':>12} {'nodes':>6} {'cmds':>5}\n")
+    total = 0.0
+    for name, result in sorted(results.items()):
+        if "error" in result:
+            sys.stdout.write(f"{name:<32} failed to load: {result['error']}\n")
+            continue
+        total += result["load_seconds"]
+        base = baseline.get(name)
+        versus = f"{_percent(result['load_seconds'], base['load_seconds']):+.0f}%" if base else "new"
+        sys.stdout.write(f"{name:<32} {_milliseconds(result['load_seconds']):>10} "
+                         f"{_milliseconds(result['initialize_seconds']):>10} {result['rss_delta_mb']:>8.1f} "
+                         f"{versus:>12} {len(result['nodes']):>6} {len(result['commands']):>5}\n")
+        if base:
+            for kind in ("nodes", "commands"):
+                added = sorted(set(result[kind]) - set(base[kind]))
+                removed = sorted(set(base[kind]) - set(result[kind]))
+                if added or removed:
+                    sys.stdout.write(f"    {kind}: " + ", ".join([f"+{item}" for item in added] + [f"-{item}" for item in removed]) + "\n")
+    sys.stdout.write(f"Total load time: {total * 1000:.1f}ms\n")
+
+
+if __name__ == "__main__":
+    # probe: mayapy load_profile_utils.py PLUGIN_PATH RESULT_PATH
+    probe(sys.argv[1], sys.argv[2])
@@ -7,172 +7,685 @@ import os
 import logging
 from pathlib import Path
 import json
+import hashlib
 import shutil
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
+import importlib
 
-import inject_utils
+try:
+    from .project import Project
+    from .trace_utils import TRACER, count_lines
+except ImportError:
+    # run as a script: python package/package.py
+    from project import Project
+    from trace_utils import TRACER, count_lines
 
 LOG = logging.getLogger(__name__)
 
+
+def _import_util(name):
+    """Import a util module of the package on first use, so each command only imports what it runs."""
+    # run as a script: python package/package.py
+    return importlib.import_module(f".{name}", __package__) if __package__ else importlib.import_module(name)
+
+
 PACKAGE_ROOT = Path(__file__).resolve().parent
 REPO_ROOT = PACKAGE_ROOT.parent
-ROOT_CMAKELISTS = REPO_ROOT / "CMakeLists.txt"
-
-DEFINITIONS_FILE = PACKAGE_ROOT / "definitions.json"
-DEFINITIONS = json.load(open(DEFINITIONS_FILE))
 
-BLUEPRINT_PATH = REPO_ROOT / "_blueprint" / "plugin_template"
+# definitions.json, VERSION and the plugin folders are read on first use
+PROJECT = Project(REPO_ROOT)
+ROOT_CMAKELISTS = PROJECT.root_cmakelists
+DEFINITIONS_FILE = PROJECT.definitions_file
+BLUEPRINT_PATH = PROJECT.blueprint_path
+VERSION_FILE = PROJECT.version_file
 
-VERSION_FILE = REPO_ROOT / "VERSION"
-VERSION = ""
+# source hashes of the plugins built successfully, kept in each build directory
+PLUGIN_INPUTS_FILE = ".plugin_inputs.json"
 
-with open(VERSION_FILE.as_posix(), 'r') as version_file:
-    VERSION = version_file.read().strip()
+# plugin load times and memory of --profile-plugins, by platform and Maya version. It is committed,
+# so every checkout and CI run compares against the same baseline
+PLUGIN_LOAD_BASELINE_FILE = PACKAGE_ROOT / "plugin_load_baseline.json"
 
 OS = platform.system().lower()
 
+# the fingerprints of the devkits validated by the build daemon, None outside of it
+_VALIDATED_DEVKITS = None
+
+PLUGIN_EXTENSIONS = {
+    "windows": ".mll",
+    "linux": ".so",
+    "darwin": ".bundle"
+}
+
+def __getattr__(name):
+    """Keep DEFINITIONS and VERSION readable as module attributes without loading them on import."""
+    if name == "DEFINITIONS":
+        return PROJECT.definitions
+    if name == "VERSION":
+        return PROJECT.version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _get_cpp_plugin_names():
+    """Return the names of the C++ plugin folders under src/plugins/cpp."""
+    return PROJECT.cpp_plugin_names
+
+def _as_plugin_list(plugin_filter):
+    """Return the plugin filter as a list of names, or None for all plugins."""
+    if plugin_filter is None or isinstance(plugin_filter, list):
+        return plugin_filter
+    if isinstance(plugin_filter, str):
+        return [plugin_filter]
+    return list(plugin_filter)
+
 def _validate_plugin_name(name):
     if name is None:
         return
-    cpp_plugins_dir = REPO_ROOT / "src" / "plugins" / "cpp"
-    available = {p.name for p in cpp_plugins_dir.iterdir() if p.is_dir()}
-    if name not in available:
-        raise SystemExit(
-            f"Unknown plugin '{name}'. Available C++ plugins: {', '.join(sorted(available))}"
-        )
+    available = set(_get_cpp_plugin_names())
+    for plugin_name in _as_plugin_list(name):
+        if plugin_name not in available:
+            raise SystemExit(
+                f"Unknown plugin '{plugin_name}'. Available C++ plugins: {', '.join(sorted(available))}"
+            )
 
-def add_plugin_to_cmakelists(plugin_name: str):
-    """Add a subdirectory to the root CMakeLists.txt."""
-    inject_utils.add_plugin(plugin_name, ROOT_CMAKELISTS, BLUEPRINT_PATH, REPO_ROOT / "src")
+def _parse_plugin_names(value):
+    """Return the plugin names of a comma separated list, or of a file given as @path.
 
-def _download_devkit_linux(download_link, devkit_path):
-    """Download the devkit for Linux."""
-    try:
-        subprocess.check_call(["curl", "-L", download_link, "-o", f"{devkit_path / 'devkitBase.tar.gz'}"])
-        # Extract the tar.gz file
-        sys.stdout.write("Extracting the file...\n")
-        subprocess.check_call(["tar", "-xzf", f"{devkit_path / 'devkitBase.tar.gz'}", "-C", devkit_path])
-        # Remove the tar.gz file after extraction
-        (devkit_path / "devkitBase.tar.gz").unlink()
-        sys.stdout.write(f"Devkit downloaded and extracted successfully.\n")
-    except subprocess.CalledProcessError as e:
-        sys.stdout.write(f"Failed to download or extract devkit. Error: {e}\n")
+    The file lists the names separated by commas or new lines. Lines starting with # are ignored.
+    """
+    if not value.startswith("@"):
+        return value.split(",")
+    with open(value[1:], "r", encoding="utf-8") as names_file:
+        lines = [line for line in names_file.read().splitlines() if not line.strip().startswith("#")]
+    return ",".join(lines).split(",")
 
-def _download_devkit_mac(download_link, devkit_path):
-    """Download the devkit for Mac."""
-    try:
-        subprocess.check_call(["curl", "-L", download_link, "-o", f"{devkit_path / 'devkitBase.zip'}"])
-        # Unzip the downloaded file
-        sys.stdout.write("Extracting the file...\n")
-        subprocess.check_call(["unzip", f"{(devkit_path / 'devkitBase.zip').resolve()}", "-d", devkit_path])
-        # Remove the zip file after extraction
-        (devkit_path / "devkitBase.zip").unlink()
-        sys.stdout.write(f"Devkit downloaded and extracted successfully.\n")
-    except subprocess.CalledProcessError as e:
-        sys.stdout.write(f"Failed to download or extract devkit. Error: {e}\n")
+def add_plugin_to_cmakelists(plugin_names: str, use_pch=True, unity_build=True):
+    """Create the plugin folders and add their subdirectories to the root CMakeLists.txt.
 
-def _download_devkit_win(download_link, devkit_path):
-    """Download the devkit for Windows."""
+    Set `use_pch` or `unity_build` to False to opt the new plugins out of the
+    precompiled devkit headers or unity builds.
+    """
+    inject_utils = _import_util("inject_utils")
+    plugin_names = _parse_plugin_names(plugin_names)
+    if not any(name.strip() for name in plugin_names):
+        raise SystemExit("No plugin names given.")
     try:
-        subprocess.check_call(["curl", "-L", download_link, "-o", f"{devkit_path / 'devkitBase.zip'}"])
-        # Unzip the downloaded file using PowerShell
-        sys.stdout.write("Extracting the file...\n")
-        subprocess.check_call([
-            "powershell", "-Command",
-            f"Expand-Archive -LiteralPath '{(devkit_path / 'devkitBase.zip').resolve()}' -DestinationPath '{devkit_path.resolve()}' -Force"
-        ])
-        # Remove the zip file after extraction
-        (devkit_path / "devkitBase.zip").unlink()
-        sys.stdout.write(f"Devkit downloaded and extracted successfully.\n")
-    except subprocess.CalledProcessError as e:
-        sys.stdout.write(f"Failed to download or extract devkit. Error: {e}\n")
+        inject_utils.add_plugins(plugin_names, ROOT_CMAKELISTS, BLUEPRINT_PATH, REPO_ROOT / "src",
+                                 use_pch=use_pch, unity_build=unity_build)
+    except ValueError as e:
+        raise SystemExit(str(e)) from e
 
-def validate_local_devkits(maya_version=None):
-    """Validate the local devkits."""
-    target_maya_versions = [maya_version] if maya_version else DEFINITIONS["target_maya_versions"]
-    local_devkits = (REPO_ROOT / DEFINITIONS["local_devkits_relative_path"])
-    # check if the local devkits folder exists
-    local_devkits.mkdir(parents=True, exist_ok=True)
+def _save_definitions():
+    """Write the in-memory definitions back to definitions.json."""
+    PROJECT.save_definitions()
+
+def _extract_devkit_mac(archive_path, devkit_path):
+    """Extract the devkit for Mac."""
+    subprocess.check_call(["unzip", f"{archive_path.resolve()}", "-d", devkit_path])
+
+def _install_devkit(version, download_link, devkit_path, expected_sha256=None, slim=False):
+    """Download (or take from the download cache) and extract the devkit of a Maya version.
+
+    On Linux the tarball is extracted while it downloads, in a single pass.
+    Everything is extracted into a staging folder first and only moved into
+    place once the download is complete and verified. With `slim` only the
+    parts needed to build plugins are extracted (see archive_utils).
+
+    Returns the SHA-256 of the verified archive, or None if the devkit could not be installed.
+    """
+    archive_utils = _import_util("archive_utils")
+    download_utils = _import_util("download_utils")
+    devkit_path.mkdir(parents=True, exist_ok=True)
+    staging_path = devkit_path / ".extracting"
+    if staging_path.exists():
+        shutil.rmtree(staging_path.as_posix())
+    member_filter = archive_utils.is_devkit_build_member if slim else None
+    stats = archive_utils.ExtractionStats()
+    streamed = []
+
+    def _extract_while_downloading(reader):
+        archive_utils.extract_tar_stream(reader, staging_path, member_filter=member_filter, stats=stats)
+        streamed.append(True)
+
+    with TRACER.span("install devkit", version, category="devkit"):
+        try:
+            sys.stdout.write(f"Downloading devkit for Maya {version} from {download_link}...\n")
+            with TRACER.span("download devkit", version, category="devkit"):
+                archive_path, digest = download_utils.fetch(
+                    download_link, expected_sha256=expected_sha256,
+                    stream_consumer=_extract_while_downloading if OS == "linux" else None
+                )
+            if not streamed:
+                sys.stdout.write(f"Extracting the devkit for Maya {version}...\n")
+                with TRACER.span("extract devkit", version, category="devkit"):
+                    if OS == "linux":
+                        with open(archive_path, "rb") as archive_file:
+                            archive_utils.extract_tar_stream(archive_file, staging_path, member_filter=member_filter, stats=stats)
+                    elif OS == "darwin":
+                        _extract_devkit_mac(archive_path, staging_path)
+                    elif OS == "windows":
+                        archive_utils.extract_zip(archive_path, staging_path, member_filter=member_filter, stats=stats)
+            if stats.files:
+                stats.report(f"the Maya {version} devkit")
+            for item in staging_path.iterdir():
+                target_path = devkit_path / item.name
+                if target_path.is_dir():
+                    shutil.rmtree(target_path.as_posix())
+                os.replace(item, target_path)
+            sys.stdout.write(f"Devkit for Maya {version} downloaded and extracted successfully.\n")
+            if PROJECT.definitions.get("use_devkit_store", False):
+                with TRACER.span("add devkit to store", version, category="devkit"):
+                    _add_devkit_to_store(version, devkit_path / "devkitBase")
+            return digest
+        except (OSError, ValueError, subprocess.CalledProcessError) + archive_utils.ARCHIVE_ERRORS as e:
+            sys.stdout.write(f"Failed to download or extract devkit for Maya {version}. Error: {e}\n")
+            return None
+        finally:
+            if staging_path.exists():
+                shutil.rmtree(staging_path.as_posix(), ignore_errors=True)
+
+def _add_devkit_to_store(version, devkit_base_path):
+    """Deduplicate a devkit against the machine-wide devkit store."""
+    store_utils = _import_util("store_utils")
+    stats = store_utils.add_tree(devkit_base_path)
+    sys.stdout.write(
+        f"Devkit for Maya {version} linked into the devkit store: {stats['new_files']} new files "
+        f"({store_utils.format_size(stats['new_bytes'])}), {stats['deduplicated_files']} deduplicated files "
+        f"({store_utils.format_size(stats['deduplicated_bytes'])} saved).\n"
+    )
+
+def manage_devkit_store(command):
+    """Run a devkit store command.
+
+    * "add" links the local devkits of all target versions into the store.
+    * "gc" removes store files which no devkit links to anymore.
+    * "report" prints how much space the store saves.
+    """
+    store_utils = _import_util("store_utils")
+    store_dir = store_utils.get_store_dir()
+    if command == "add":
+        for version in PROJECT.definitions["target_maya_versions"]:
+            devkit_base_path = _get_devkit_path(version)
+            if devkit_base_path.is_dir():
+                _add_devkit_to_store(version, devkit_base_path)
+            else:
+                sys.stdout.write(f"Devkit for Maya {version} not found at {devkit_base_path}. Skipping.\n")
+    elif command == "gc":
+        removed, freed = store_utils.gc(store_dir)
+        sys.stdout.write(f"Removed {removed} unreferenced files ({store_utils.format_size(freed)}) from {store_dir}.\n")
+    elif command == "report":
+        result = store_utils.report(store_dir)
+        sys.stdout.write(
+            f"Devkit store {store_dir}:\n"
+            f"  {result['objects']} files ({result['unreferenced']} unreferenced), {store_utils.format_size(result['stored_bytes'])} on disk\n"
+            f"  {store_utils.format_size(result['linked_bytes'])} linked into devkits\n"
+            f"  {store_utils.format_size(result['saved_bytes'])} saved by deduplication\n"
+        )
+    else:
+        raise ValueError(f"Unknown devkit store command: {command}")
+
+def validate_local_devkits(maya_version=None, slim=None):
+    """Validate the local devkits.
+
+    Missing devkits are downloaded concurrently through the machine-wide
+    download cache (see download_utils). Downloads are verified against the
+    SHA-256 checksums in definitions.json. The checksum of a devkit that has
+    none yet is recorded there after its first download.
+
+    With `slim` (defaults to "slim_devkits" in definitions.json) only the
+    include, lib and cmake files of the devkits are extracted.
+    """
+    with TRACER.span("validate devkits"):
+        _validate_local_devkits(maya_version, slim=slim)
+
+def _validate_local_devkits(maya_version=None, slim=None):
+    """Validate the local devkits (untraced)."""
+    if slim is None:
+        slim = PROJECT.definitions.get("slim_devkits", False)
+    target_maya_versions = [maya_version] if maya_version else PROJECT.definitions["target_maya_versions"]
+    local_devkits = (REPO_ROOT / PROJECT.definitions["local_devkits_relative_path"])
+    missing_devkits = {}
     for version in target_maya_versions:
         devkit_path = local_devkits / version
+        # the build daemon validates each devkit once, and again when it is replaced
+        if _VALIDATED_DEVKITS is not None and _VALIDATED_DEVKITS.get(version) == _devkit_fingerprint(version):
+            continue
         if not (devkit_path / "devkitBase").exists():
             sys.stdout.write(f"Devkit for Maya {version} not found at {devkit_path}. Attempting to download from the definitions.\n")
-            devkit_path.mkdir(parents=True, exist_ok=True)
-            download_link = DEFINITIONS[f"{OS}_devkits"].get(version)
+            download_link = PROJECT.definitions[f"{OS}_devkits"].get(version)
             if download_link:
-                sys.stdout.write(f"Downloading devkit for Maya {version} from {download_link}...\n")
-                if OS == "linux":
-                    _download_devkit_linux(download_link, devkit_path)
-                elif OS == "darwin":
-                    _download_devkit_mac(download_link, devkit_path)
-                elif OS == "windows":
-                    _download_devkit_win(download_link, devkit_path)
+                missing_devkits[version] = download_link
         else:
             sys.stdout.write(f"Devkit for Maya {version} found at {devkit_path.resolve()}.\n")
+            if _VALIDATED_DEVKITS is not None:
+                _VALIDATED_DEVKITS[version] = _devkit_fingerprint(version)
+    if not missing_devkits:
+        return
 
-def build_plugins(maya_version, build_type="Debug", continue_on_error=False, plugin_filter=None):
-    """Build the plugins using CMake."""
+    local_devkits.mkdir(parents=True, exist_ok=True)
+    checksums = PROJECT.definitions.setdefault(f"{OS}_devkit_checksums", {})
+    with ThreadPoolExecutor(max_workers=min(len(missing_devkits), 8)) as executor:
+        futures = {
+            version: executor.submit(_install_devkit, version, download_link, local_devkits / version,
+                                     checksums.get(version), slim=slim)
+            for version, download_link in missing_devkits.items()
+        }
+    digests = {version: future.result() for version, future in futures.items()}
+    recorded = [version for version, digest in digests.items() if digest and checksums.get(version) != digest]
+    if recorded:
+        for version in recorded:
+            checksums[version] = digests[version]
+        _save_definitions()
+        sys.stdout.write(f"Recorded devkit checksums for Maya {', '.join(recorded)} in {DEFINITIONS_FILE}.\n")
+
+def _get_devkit_path(maya_version):
+    """Return the local devkitBase path for the given Maya version."""
+    return REPO_ROOT / PROJECT.definitions["local_devkits_relative_path"] / maya_version / "devkitBase"
+
+def _get_build_dir(maya_version, build_type):
+    """Return the persistent build directory for the given Maya version and build type."""
+    return REPO_ROOT / "build" / f"{OS}-{maya_version}-{build_type}"
+
+def _devkit_fingerprint(maya_version):
+    """Return a string which changes when the devkit of the Maya version is replaced."""
+    devkit_path = _get_devkit_path(maya_version)
+    parts = [str(devkit_path.resolve())]
+    for devkit_item in (devkit_path, devkit_path / "include", devkit_path / "lib"):
+        if devkit_item.exists():
+            parts.append(str(devkit_item.stat().st_mtime_ns))
+    return ":".join(parts)
+
+def _plugin_input_hashes(maya_version, previous=None):
+    """Hash the inputs shared by every plugin and the source tree of each C++ plugin.
+
+    The files of a plugin are only read when their sizes or modification
+    times differ from the ones recorded with its hash in `previous` (see
+    _load_plugin_inputs), otherwise the recorded hash is reused.
+    """
+    shared_hasher = hashlib.sha256(ROOT_CMAKELISTS.read_bytes())
+    shared_hasher.update(_devkit_fingerprint(maya_version).encode("utf-8"))
+    previous = previous or {}
+    plugins = {}
+    stats = {}
+    for plugin_name in _get_cpp_plugin_names():
+        plugin_dir = REPO_ROOT / "src" / "plugins" / "cpp" / plugin_name
+        files = [(path.relative_to(plugin_dir).as_posix(), path) for path in sorted(plugin_dir.rglob("*")) if path.is_file()]
+        stat_hasher = hashlib.sha256()
+        for relative_path, path in files:
+            file_stat = path.stat()
+            stat_hasher.update(f"{relative_path}\0{file_stat.st_size}\0{file_stat.st_mtime_ns}\0".encode("utf-8"))
+        stats[plugin_name] = stat_hasher.hexdigest()
+        if plugin_name in previous.get("plugins", {}) and previous.get("stats", {}).get(plugin_name) == stats[plugin_name]:
+            plugins[plugin_name] = previous["plugins"][plugin_name]
+            continue
+        hasher = hashlib.sha256()
+        for relative_path, path in files:
+            hasher.update(f"{relative_path}\0".encode("utf-8"))
+            hasher.update(path.read_bytes())
+        plugins[plugin_name] = hasher.hexdigest()
+    return {"shared": shared_hasher.hexdigest(), "plugins": plugins, "stats": stats}
+
+def _load_plugin_inputs(build_dir):
+    """Return the plugin input hashes of the last successful builds in the build directory."""
+    try:
+        with open(build_dir / PLUGIN_INPUTS_FILE, "r", encoding="utf-8") as inputs_file:
+            return json.load(inputs_file)
+    except (OSError, ValueError):
+        return {"shared": None, "plugins": {}, "stats": {}}
+
+def _save_plugin_inputs(build_dir, inputs, built_plugins):
+    """Record the input hashes, and the file stats they were made from, of the plugins which were just built successfully."""
+    previous = _load_plugin_inputs(build_dir)
+    same_shared = previous["shared"] == inputs["shared"]
+    plugins = previous["plugins"] if same_shared else {}
+    stats = previous.get("stats", {}) if same_shared else {}
+    for name in built_plugins:
+        if name in inputs["plugins"]:
+            plugins[name] = inputs["plugins"][name]
+            stats[name] = inputs["stats"][name]
+    with open(build_dir / PLUGIN_INPUTS_FILE, "w", encoding="utf-8") as inputs_file:
+        json.dump({"shared": inputs["shared"], "plugins": plugins, "stats": stats}, inputs_file, indent=4, sort_keys=True)
+
+def _get_git_changed_plugins(git_range):
+    """Return the C++ plugins touched by the commits of the git range (e.g. origin/main...HEAD)."""
+    output = subprocess.check_output(["git", "-C", str(REPO_ROOT), "diff", "--name-only", "--relative", git_range],
+                                     text=True)
+    plugin_names = _get_cpp_plugin_names()
+    changed = set()
+    for changed_file in output.splitlines():
+        parts = Path(changed_file).parts
+        if changed_file == ROOT_CMAKELISTS.name:
+            return plugin_names
+        if len(parts) > 3 and parts[:3] == ("src", "plugins", "cpp") and parts[3] in plugin_names:
+            changed.add(parts[3])
+    return sorted(changed)
+
+def get_changed_plugins(maya_version, build_type, git_range=None):
+    """Return the C++ plugins to rebuild for the Maya version.
+
+    Without `git_range`, these are the plugins whose source tree changed
+    since their last successful build in the build directory. Every plugin
+    is returned when the root CMakeLists.txt or the devkit changed.
+    With `git_range`, these are the plugins touched by its commits.
+    """
+    if git_range:
+        return _get_git_changed_plugins(git_range)
+    previous = _load_plugin_inputs(_get_build_dir(maya_version, build_type))
+    current = _plugin_input_hashes(maya_version, previous)
+    if previous["shared"] != current["shared"]:
+        return list(current["plugins"])
+    return [name for name, digest in current["plugins"].items() if previous["plugins"].get(name) != digest]
+
+def _configure_fingerprint(maya_version, build_type, cmake_args=()):
+    """Hash every input which requires a CMake reconfigure when it changes."""
+    hasher = hashlib.sha256()
+    hasher.update(f"{maya_version}:{build_type}:{' '.join(cmake_args)}".encode("utf-8"))
+    cpp_plugins_dir = REPO_ROOT / "src" / "plugins" / "cpp"
+    plugin_cmake_files = sorted(cpp_plugins_dir.glob("*/CMakeLists.txt"))
+    for path in [ROOT_CMAKELISTS, DEFINITIONS_FILE] + plugin_cmake_files:
+        hasher.update(path.relative_to(REPO_ROOT).as_posix().encode("utf-8"))
+        if path.is_file():
+            hasher.update(path.read_bytes())
+    # Plugin CMakeLists files GLOB their sources at configure time.
+    # Adding or removing a source file needs a reconfigure too (editing one does not).
+    for plugin_cmake_file in plugin_cmake_files:
+        for source in sorted(plugin_cmake_file.parent.rglob("*")):
+            if source.suffix in (".cpp", ".h"):
+                hasher.update(source.relative_to(REPO_ROOT).as_posix().encode("utf-8"))
+    hasher.update(_devkit_fingerprint(maya_version).encode("utf-8"))
+    return hasher.hexdigest()
+
+def _configure(maya_version, build_type, build_dir, cmake_args=(), log=None):
+    """Configure the build directory with CMake if any of its inputs changed."""
+    cmake_utils = _import_util("cmake_utils")
+    stamp_file = build_dir / ".configure_stamp"
+    fingerprint = _configure_fingerprint(maya_version, build_type, cmake_args)
+    # the File API reply is used to locate the built plugins
+    cmake_utils.request_codemodel(build_dir)
+    if (build_dir / "CMakeCache.txt").is_file() and stamp_file.is_file() and cmake_utils.has_codemodel_reply(build_dir):
+        if stamp_file.read_text().strip() == fingerprint:
+            sys.stdout.write(f"Build directory {build_dir} is up to date. Skipping CMake configure.\n")
+            return
+    with TRACER.span("cmake configure", maya_version, category="configure"):
+        subprocess.check_call(["cmake", "-S", str(REPO_ROOT), "-B", str(build_dir), f"-DCMAKE_BUILD_TYPE={build_type}", f"-DMAYA_VERSION={maya_version}", *cmake_args],
+                              stdout=log, stderr=subprocess.STDOUT if log else None)
+    stamp_file.write_text(fingerprint)
+
+def _get_cached_generator(build_dir):
+    """Return the CMake generator recorded in the build directory's cache, if any."""
+    cache_file = build_dir / "CMakeCache.txt"
+    if not cache_file.is_file():
+        return None
+    for line in cache_file.read_text(errors="replace").splitlines():
+        if line.startswith("CMAKE_GENERATOR:INTERNAL="):
+            return line.split("=", 1)[1]
+    return None
+
+def _find_compiler_cache(compiler_cache):
+    """Return the compiler cache executable to use as the compiler launcher.
+
+    `compiler_cache` is either "ccache", "sccache" or "auto" to pick the
+    first one available on PATH.
+    """
+    candidates = ["ccache", "sccache"] if compiler_cache == "auto" else [compiler_cache]
+    for candidate in candidates:
+        if shutil.which(candidate):
+            return candidate
+    sys.stdout.write(f"Compiler cache ({', '.join(candidates)}) not found on PATH. Building without a compiler cache.\n")
+    return None
+
+def _get_compiler_cache_stats(launcher):
+    """Return the (hits, misses) counters of the compiler cache or None if unavailable."""
+    try:
+        if launcher == "ccache":
+            output = subprocess.check_output(["ccache", "--print-stats"], text=True)
+            stats = dict(line.split("\t", 1) for line in output.splitlines() if "\t" in line)
+            hits = int(stats.get("direct_cache_hit", 0)) + int(stats.get("preprocessed_cache_hit", 0))
+            return hits, int(stats.get("cache_miss", 0))
+        output = subprocess.check_output([launcher, "--show-stats", "--stats-format", "json"], text=True)
+        stats = json.loads(output)["stats"]
+        return sum(stats["cache_hits"]["counts"].values()), sum(stats["cache_misses"]["counts"].values())
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError):
+        return None
+
+def _report_compiler_cache_stats(maya_version, launcher, stats_before):
+    """Print the compiler cache hits and misses of the build.
+
+    The counters are global to the cache, so with concurrent version builds
+    they include the compilations of the other versions too.
+    """
+    stats_after = _get_compiler_cache_stats(launcher)
+    if stats_before is None or stats_after is None:
+        sys.stdout.write(f"Could not read the {launcher} statistics.\n")
+        return
+    hits = stats_after[0] - stats_before[0]
+    misses = stats_after[1] - stats_before[1]
+    total = hits + misses
+    hit_rate = f"{100.0 * hits / total:.1f}%" if total else "n/a"
+    sys.stdout.write(f"Compiler cache ({launcher}) for Maya {maya_version}: {hits} hits, {misses} misses, hit rate {hit_rate}.\n")
+
+def build_plugins(maya_version, build_type="Debug", continue_on_error=False, plugin_filter=None, clean=False,
+                  jobs=None, log_to_file=False, ninja=False, compiler_cache=None, pch=None, unity_build=None):
+    """Build the plugins using CMake.
+
+    Each Maya version and build type gets its own persistent build directory
+    under build/, so consecutive builds are incremental. CMake is only
+    reconfigured when the CMakeLists files, definitions.json or the devkit
+    change. Use `clean` to wipe the build directory first.
+
+    `jobs` is passed to `cmake --build --parallel`. With `log_to_file` the
+    CMake output goes to build.log inside the build directory instead of
+    the console.
+
+    `ninja` selects the Ninja generator when it is available. `compiler_cache`
+    ("ccache", "sccache" or "auto") sets it as the compiler launcher and
+    prints its hit/miss statistics at the end of the build.
+
+    `pch` precompiles the Maya devkit headers once and shares them between
+    the plugins, `unity_build` compiles the sources of each plugin in unity
+    batches. Both default to "precompiled_headers" and "unity_build" in
+    definitions.json. Plugins can opt out in their own CMakeLists.txt.
+
+    `plugin_filter` is a plugin name or a list of them. An empty list builds
+    nothing. The source hashes of the built plugins are recorded for
+    get_changed_plugins().
+    """
+    plugin_filter = _as_plugin_list(plugin_filter)
     _validate_plugin_name(plugin_filter)
-    build_dir = REPO_ROOT / "build"
-    # return build_dir
-    # delete the build directory if it exists
-    if build_dir.exists():
+    build_dir = _get_build_dir(maya_version, build_type)
+    if plugin_filter == []:
+        sys.stdout.write(f"No plugins to build for Maya {maya_version}.\n")
+        return build_dir
+    cmake_args = []
+    if ninja:
+        if shutil.which("ninja"):
+            cmake_args.extend(["-G", "Ninja"])
+        else:
+            sys.stdout.write("Ninja not found on PATH. Using the default CMake generator.\n")
+    launcher = _find_compiler_cache(compiler_cache) if compiler_cache else None
+    # always pass the launcher so a previously cached one is cleared when disabled
+    cmake_args.append(f"-DCMAKE_CXX_COMPILER_LAUNCHER={launcher or ''}")
+    # same for the speed-ups, so the cached values always follow the command line and definitions.json
+    if pch is None:
+        pch = PROJECT.definitions.get("precompiled_headers", False)
+    if unity_build is None:
+        unity_build = PROJECT.definitions.get("unity_build", False)
+    cmake_args.append(f"-DMAYA_PLUGIN_PCH={'ON' if pch else 'OFF'}")
+    cmake_args.append(f"-DMAYA_PLUGIN_UNITY_BUILD={'ON' if unity_build else 'OFF'}")
+    # CMake refuses to switch generators in an existing build directory
+    cached_generator = _get_cached_generator(build_dir)
+    if cached_generator and (cached_generator == "Ninja") != ("Ninja" in cmake_args):
+        sys.stdout.write(f"Build directory {build_dir} was generated with {cached_generator}. Starting from scratch.\n")
+        clean = True
+    if clean and build_dir.exists():
         shutil.rmtree(build_dir.as_posix())
+    build_dir.mkdir(parents=True, exist_ok=True)
+    log = open(build_dir / "build.log", "w") if log_to_file else None
+    stats_before = _get_compiler_cache_stats(launcher) if launcher else None
     try:
-        subprocess.check_call(["cmake", "-S", str(REPO_ROOT), "-B", str(build_dir), f"-DCMAKE_BUILD_TYPE={build_type}", f"-DMAYA_VERSION={maya_version}"])
+        _configure(maya_version, build_type, build_dir, cmake_args=cmake_args, log=log)
         build_cmd = ["cmake", "--build", str(build_dir), "--config", build_type]
+        if jobs:
+            build_cmd.extend(["--parallel", str(jobs)])
         if plugin_filter:
-            build_cmd.extend(["--target", plugin_filter])
-        subprocess.check_call(build_cmd)
-        sys.stdout.write("Plugins built successfully.\n")
+            build_cmd.extend(["--target", *plugin_filter])
+        # hash before building, so edits made during the build are picked up next time
+        plugin_inputs = _plugin_input_hashes(maya_version, _load_plugin_inputs(build_dir))
+        # per target spans are only available from Ninja's log
+        ninja_log_path = build_dir / ".ninja_log"
+        ninja_log_lines = count_lines(ninja_log_path)
+        with TRACER.span("cmake build", maya_version, category="build", target=",".join(plugin_filter or ["all"])):
+            build_start = time.time_ns() // 1000
+            subprocess.check_call(build_cmd, stdout=log, stderr=subprocess.STDOUT if log else None)
+        _save_plugin_inputs(build_dir, plugin_inputs, plugin_filter or list(plugin_inputs["plugins"]))
+        TRACER.add_ninja_log_spans(ninja_log_path, ninja_log_lines, build_start, maya_version=maya_version)
+        sys.stdout.write(f"Plugins for Maya {maya_version} built successfully.\n")
+        if launcher:
+            _report_compiler_cache_stats(maya_version, launcher, stats_before)
         return build_dir
     except subprocess.CalledProcessError as e:
+        error = f"{e} See {build_dir / 'build.log'} for details." if log else e
         if continue_on_error:
-            sys.stdout.write(f"Failed to build plugins. Error: {e}\n")
+            sys.stdout.write(f"Failed to build plugins. Error: {error}\n")
         else:
-            raise RuntimeError(f"Failed to build plugins. Error: {e}") from e
+            raise RuntimeError(f"Failed to build plugins. Error: {error}") from e
+    finally:
+        if log:
+            log.close()
+
+def collect_plugin_artifacts(build_dir, build_type="Release", plugin_filter=None):
+    """Return {plugin name: binary path} of the plugins built in the build directory.
+
+    The output paths come from the CMake File API codemodel of the last
+    configure, so stray binaries in the build tree are never picked up.
+    Plugins which are not built (yet) are left out.
+    """
+    cmake_utils = _import_util("cmake_utils")
+    if not cmake_utils.has_codemodel_reply(build_dir):
+        return {}
+    plugin_filter = _as_plugin_list(plugin_filter)
+    artifacts = cmake_utils.get_library_artifacts(build_dir, build_type, PLUGIN_EXTENSIONS[OS])
+    if plugin_filter is not None:
+        artifacts = {name: path for name, path in artifacts.items() if name in plugin_filter}
+    return {name: path for name, path in artifacts.items() if path.is_file()}
+
+def _build_plugins_job(trace, *args, **kwargs):
+    """Run build_plugins in a worker process and return its result with the recorded trace events."""
+    if trace:
+        TRACER.enable()
+    # forked workers inherit the events of the main process, only return the new ones
+    TRACER.events = []
+    return build_plugins(*args, **kwargs), TRACER.events
 
-def dev_deploy(version=None, plugin_filter=None):
-    """Deploy the plugin(s) for a specific Maya version. Or if version is None, deploy for all target versions."""
+def build_versions(maya_versions, build_type="Release", plugin_filter=None, clean=False, jobs=None,
+                   max_concurrent_versions=None, ninja=False, compiler_cache=None, pch=None, unity_build=None):
+    """Build the plugins for several Maya versions at once.
+
+    Every version builds in its own build directory and process. The `jobs`
+    core budget (defaults to all cores) is split evenly between the
+    concurrent builds. When more than one version builds at a time, each
+    version's CMake output is kept in its own build.log.
+
+    `plugin_filter` may also be a dictionary of Maya version to the plugins
+    to build for that version.
+
+    Returns a dictionary of Maya version to build directory.
+    """
+    def _version_filter(maya_version):
+        return plugin_filter.get(maya_version) if isinstance(plugin_filter, dict) else plugin_filter
+
+    jobs = jobs or os.cpu_count() or 1
+    concurrent = min(max_concurrent_versions or len(maya_versions), len(maya_versions), jobs)
+    jobs_per_build = max(1, jobs // max(1, concurrent))
+    if concurrent <= 1:
+        return {
+            maya_version: build_plugins(maya_version, build_type=build_type, plugin_filter=_version_filter(maya_version),
+                                        clean=clean, jobs=jobs_per_build, ninja=ninja,
+                                        compiler_cache=compiler_cache, pch=pch, unity_build=unity_build)
+            for maya_version in maya_versions
+        }
+
+    sys.stdout.write(f"Building Maya {', '.join(maya_versions)} with {concurrent} concurrent builds "
+                     f"and {jobs_per_build} jobs each...\n")
+    build_dirs = {}
+    errors = {}
+    # imported here, it is only needed for multi-version builds and slow to import
+    from concurrent.futures import ProcessPoolExecutor
+    # forking the threaded build daemon is not safe, its workers start from scratch
+    mp_context = None
+    if _VALIDATED_DEVKITS is not None:
+        import multiprocessing
+        mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=concurrent, mp_context=mp_context) as executor:
+        futures = {
+            maya_version: executor.submit(_build_plugins_job, TRACER.enabled, maya_version, build_type=build_type,
+                                          plugin_filter=_version_filter(maya_version), clean=clean, jobs=jobs_per_build,
+                                          log_to_file=True, ninja=ninja, compiler_cache=compiler_cache,
+                                          pch=pch, unity_build=unity_build)
+            for maya_version in maya_versions
+        }
+        for maya_version, future in futures.items():
+            try:
+                build_dirs[maya_version], events = future.result()
+                TRACER.merge(events)
+            except RuntimeError as e:
+                errors[maya_version] = e
+    if errors:
+        for maya_version, error in errors.items():
+            sys.stdout.write(f"Maya {maya_version}: {error}\n")
+        raise RuntimeError(f"Failed to build plugins for Maya {', '.join(errors)}.")
+    return build_dirs
+
+def dev_deploy(version=None, plugin_filter=None, clean=False, jobs=None, max_concurrent_versions=None,
+               ninja=False, compiler_cache=None, changed=None, pch=None, unity_build=None):
+    """Deploy the plugin(s) for a specific Maya version. Or if version is None, deploy for all target versions.
+
+    With `changed`, only the plugins which changed since their last build
+    (see get_changed_plugins) are built and deployed. Pass a git range to
+    use the plugins touched by its commits instead of the source hashes.
+    """
+    deploy_utils = _import_util("deploy_utils")
     validate_local_devkits()
-    extensions = {
-        "windows": ".mll",
-        "linux": ".so",
-        "darwin": ".bundle"
-    }
     deploy_root_path = REPO_ROOT / "_dev_deploy"
     plugins_path = deploy_root_path / "plugins"
     plugins_path.mkdir(parents=True, exist_ok=True)
-    deploy_versions = [version] if version else DEFINITIONS["target_maya_versions"]
-    for maya_version in deploy_versions:
-        build_dir = build_plugins(maya_version, build_type="Release", plugin_filter=plugin_filter)
+    deploy_versions = [version] if version else PROJECT.definitions["target_maya_versions"]
+    if changed is not None:
+        git_range = changed or None
+        plugin_filter = {
+            maya_version: get_changed_plugins(maya_version, "Release", git_range=git_range)
+            for maya_version in deploy_versions
+        }
+        for maya_version, changed_plugins in plugin_filter.items():
+            sys.stdout.write(f"Changed plugins for Maya {maya_version}: {', '.join(changed_plugins) or 'none'}.\n")
+    build_dirs = build_versions(deploy_versions, build_type="Release", plugin_filter=plugin_filter, clean=clean,
+                                jobs=jobs, max_concurrent_versions=max_concurrent_versions, ninja=ninja,
+                                compiler_cache=compiler_cache, pch=pch, unity_build=unity_build)
+    for maya_version, build_dir in build_dirs.items():
         plugin_path = plugins_path / f"{OS}-{maya_version}"
-        plugin_path.mkdir(exist_ok=True)
-        # When filtering, remove the targeted plugin's previous binary from the
-        # deploy folder so we don't leave stale .mll/.so/.bundle from a prior full build.
-        if plugin_filter:
-            stale = plugin_path / f"{plugin_filter}{extensions[OS]}"
-            if stale.exists():
-                stale.unlink()
-        # collect the built plugins and copy to the deploy folder
-        collected_plugins = build_dir.rglob(f"*{extensions[OS]}")
-        for item in collected_plugins:
-            shutil.copy(item, plugin_path / item.name)
-            sys.stdout.write(f"Copied {item.name} to deploy folder.\n")
-        if len(deploy_versions) > 1:
-            time.sleep(1.0) # add a small delay between builds to avoid potential file access conflicts
+        # collect the built plugins and deploy the changed ones
+        version_filter = _as_plugin_list(plugin_filter.get(maya_version) if isinstance(plugin_filter, dict) else plugin_filter)
+        with TRACER.span("collect artifacts", maya_version, category="deploy"):
+            artifacts = collect_plugin_artifacts(build_dir, plugin_filter=version_filter)
+            collected_plugins = {item.name: item for item in artifacts.values()}
+        # When filtering, only the targeted plugins are deployed (or pruned if they
+        # were not built) and the binaries of the other plugins are left alone.
+        managed_names = None
+        if version_filter is not None:
+            managed_names = {f"{name}{PLUGIN_EXTENSIONS[OS]}" for name in version_filter}
+        with TRACER.span("deploy plugins", maya_version, category="deploy"):
+            result = deploy_utils.sync_files(collected_plugins, plugin_path, managed_names=managed_names)
+        deploy_utils.report(result, plugin_path)
 
-    # Copy python plugins if they exist (flattened - all .py files in same folder)
+    # Deploy python plugins if they exist (flattened - all .py files in same folder)
     src_python_plugins_path = REPO_ROOT / "src" / "plugins" / "python"
     if src_python_plugins_path.exists():
         dev_python_plugins_path = deploy_root_path / "plugins" / "python"
-        dev_python_plugins_path.mkdir(parents=True, exist_ok=True)
-        # Copy each .py file directly (flatten structure)
-        for py_file in src_python_plugins_path.rglob("*.py"):
-            dest_file = dev_python_plugins_path / py_file.name
-            shutil.copy2(py_file, dest_file)
-        sys.stdout.write(f"Copied python plugins to dev deploy folder.\n")
+        with TRACER.span("deploy python plugins", category="deploy"):
+            python_plugins = {py_file.name: py_file for py_file in src_python_plugins_path.rglob("*.py")}
+            result = deploy_utils.sync_files(python_plugins, dev_python_plugins_path)
+        deploy_utils.report(result, dev_python_plugins_path)
 
     # Maya Modules injections
     if OS == "windows":
@@ -185,67 +698,204 @@ def dev_deploy(version=None, plugin_filter=None):
         raise ValueError(f"Unknown OS: {OS}")
     if not user_maya_folder.exists():
         raise ValueError("No Maya version can be found in the user's documents directory")
-    modules_file_path = user_maya_folder / "modules" / f"{DEFINITIONS['project_slug']}_dev.mod"
+    modules_file_path = user_maya_folder / "modules" / f"{PROJECT.definitions['project_slug']}_dev.mod"
     modules_file_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(modules_file_path, "w") as mod_file:
-        mod_file.writelines(_generate_dev_mod())
+    with TRACER.span("generate .mod", category="deploy"):
+        with open(modules_file_path, "w") as mod_file:
+            mod_file.writelines(_generate_dev_mod())
+
+
+def watch_dev(version=None, clean=False, jobs=None, max_concurrent_versions=None, ninja=False, compiler_cache=None,
+              pch=None, unity_build=None):
+    """Dev deploy, then rebuild and redeploy the changed plugins whenever their sources are saved.
+
+    Only the C++ plugins with changed files are rebuilt. Their binaries and
+    the python plugins are swapped into _dev_deploy with atomic renames.
+    """
+    watch_utils = _import_util("watch_utils")
+    dev_deploy(version, clean=clean, jobs=jobs, max_concurrent_versions=max_concurrent_versions, ninja=ninja,
+               compiler_cache=compiler_cache, pch=pch, unity_build=unity_build)
+    plugins_root = REPO_ROOT / "src" / "plugins"
+
+    def _redeploy(changed_paths):
+        changed_plugins = set()
+        for path in changed_paths:
+            parts = path.relative_to(plugins_root).parts
+            if len(parts) > 1 and parts[0] == "cpp":
+                changed_plugins.add(parts[1])
+            elif parts in ((), ("cpp",)):
+                # the watcher lost track of the individual files
+                changed_plugins.update(_get_cpp_plugin_names())
+        # removed plugin folders can not be built
+        changed_plugins &= set(_get_cpp_plugin_names())
+        sys.stdout.write(f"Changes detected in {', '.join(sorted(changed_plugins)) or 'python plugins'}.\n")
+        try:
+            dev_deploy(version, plugin_filter=sorted(changed_plugins), jobs=jobs,
+                       max_concurrent_versions=max_concurrent_versions, ninja=ninja, compiler_cache=compiler_cache,
+                       pch=pch, unity_build=unity_build)
+        except (RuntimeError, OSError, ValueError) as e:
+            # e.g. a compile error, or a binary locked by a running Maya on Windows
+            sys.stdout.write(f"Failed to redeploy: {e}\n")
+        sys.stdout.write("Waiting for changes...\n")
+
+    watch_utils.watch([plugins_root], _redeploy)
 
 
-def release(version=None):
-    """Make a deployable package."""
+def release(version=None, clean=False, jobs=None, max_concurrent_versions=None, ninja=False, compiler_cache=None,
+            archive_formats=None, pch=None, unity_build=None, zstd_level=None):
+    """Make a deployable package and its reproducible archives.
+
+    The plugin folders of the released Maya versions and the python plugins
+    are emptied first, so binaries of removed or renamed plugins are not
+    shipped again.
+    """
+    release_utils = _import_util("release_utils")
+    if archive_formats is None:
+        archive_formats = release_utils.ARCHIVE_FORMATS
+    release_utils.check_formats(archive_formats)
     validate_local_devkits()
-    extensions = {
-        "windows": ".mll",
-        "linux": ".so",
-        "darwin": ".bundle"
-    }
     deploy_root_path = REPO_ROOT / "release"
     modules_path = deploy_root_path / "modules"
-    deploy_path = modules_path / DEFINITIONS["project_slug"]
+    deploy_path = modules_path / PROJECT.definitions["project_slug"]
     plugins_path = deploy_path / "plugins"
     plugins_path.mkdir(parents=True, exist_ok=True)
-    deploy_versions = [version] if version else DEFINITIONS["target_maya_versions"]
-    for maya_version in deploy_versions:
-        build_dir = build_plugins(maya_version, build_type="Release")
+    deploy_versions = [version] if version else PROJECT.definitions["target_maya_versions"]
+    build_dirs = build_versions(deploy_versions, build_type="Release", clean=clean,
+                                jobs=jobs, max_concurrent_versions=max_concurrent_versions, ninja=ninja,
+                                compiler_cache=compiler_cache, pch=pch, unity_build=unity_build)
+    for maya_version, build_dir in build_dirs.items():
         plugin_path = plugins_path / f"{OS}-{maya_version}"
-        plugin_path.mkdir(exist_ok=True)
+        if plugin_path.exists():
+            shutil.rmtree(plugin_path)
+        plugin_path.mkdir()
         # collect the built plugins and copy to the deploy folder
-        collected_plugins = build_dir.rglob(f"*{extensions[OS]}")
+        with TRACER.span("collect artifacts", maya_version, category="deploy"):
+            collected_plugins = list(collect_plugin_artifacts(build_dir).values())
         for item in collected_plugins:
-            shutil.copy(item, plugin_path / item.name)
+            with TRACER.span(f"copy {item.name}", maya_version, category="deploy"):
+                shutil.copy(item, plugin_path / item.name)
             sys.stdout.write(f"Copied {item.name} to deploy folder.\n")
 
     # if there is a tools folder under the src, copy it under the deploy_path
     src_tools_path = REPO_ROOT / "src" / "tools"
     if src_tools_path.exists():
         deploy_tools_path = deploy_path / "tools"
-        if deploy_tools_path.exists():
-            shutil.rmtree(deploy_tools_path.as_posix())
-        shutil.copytree(src_tools_path, deploy_tools_path)
+        with TRACER.span("copy tools", category="deploy"):
+            if deploy_tools_path.exists():
+                shutil.rmtree(deploy_tools_path.as_posix())
+            shutil.copytree(src_tools_path, deploy_tools_path)
         sys.stdout.write(f"Copied tools to deploy folder.\n")
 
     # Copy python plugins (flattened - all .py files in same folder)
     src_python_plugins_path = REPO_ROOT / "src" / "plugins" / "python"
     if src_python_plugins_path.exists():
         deploy_python_plugins_path = deploy_path / "plugins" / "python"
-        deploy_python_plugins_path.mkdir(parents=True, exist_ok=True)
-        for py_file in src_python_plugins_path.rglob("*.py"):
-            dest_file = deploy_python_plugins_path / py_file.name
-            shutil.copy2(py_file, dest_file)
+        if deploy_python_plugins_path.exists():
+            shutil.rmtree(deploy_python_plugins_path)
+        deploy_python_plugins_path.mkdir(parents=True)
+        with TRACER.span("copy python plugins", category="deploy"):
+            for py_file in src_python_plugins_path.rglob("*.py"):
+                dest_file = deploy_python_plugins_path / py_file.name
+                shutil.copy2(py_file, dest_file)
         sys.stdout.write(f"Copied python plugins to deploy folder.\n")
 
     # create the .mod file
-    mod_file_path = modules_path / f"{DEFINITIONS['project_slug']}.mod"
-    with open(mod_file_path, "w") as mod_file:
-        mod_file.writelines(_generate_release_mod())
+    mod_file_path = modules_path / f"{PROJECT.definitions['project_slug']}.mod"
+    with TRACER.span("generate .mod", category="deploy"):
+        with open(mod_file_path, "w") as mod_file:
+            mod_file.writelines(_generate_release_mod())
     sys.stdout.write(f"Generated .mod file at {mod_file_path.resolve()}.\n")
-    _save_drag_and_drop_me_script(deploy_root_path / "dragAndDropMe.py")
+    with TRACER.span("generate drag and drop script", category="deploy"):
+        _save_drag_and_drop_me_script(deploy_root_path / "dragAndDropMe.py")
+    if archive_formats:
+        create_release_archives(deploy_root_path, archive_formats, jobs=jobs, zstd_level=zstd_level)
+
+
+def profile_deployed_plugins(plugins_path, version=None, python_paths=(), stub_maya=False, save_baseline=False,
+                             fail_percent=None):
+    """Load every deployed plugin on its own in a fresh mayapy and compare it against the baseline.
+
+    `plugins_path` is the plugins folder of _dev_deploy or of the release.
+    The first profile of a Maya version, or any with `save_baseline`,
+    becomes its baseline. With `fail_percent`, plugins loading slower or
+    using more memory than that percent over the baseline fail the command.
+    `stub_maya` uses the stub maya package of the tests and this Python
+    instead of mayapy, so it runs without Maya (e.g. in CI).
+    """
+    load_profile_utils = _import_util("load_profile_utils")
+    profile_versions = [version] if version else PROJECT.definitions["target_maya_versions"]
+    regressions = []
+    for maya_version in profile_versions:
+        mayapy = sys.executable if stub_maya else load_profile_utils.find_mayapy(maya_version)
+        if mayapy is None:
+            sys.stdout.write(f"mayapy of Maya {maya_version} not found. Set MAYAPY_{maya_version} to profile its plugins.\n")
+            continue
+        plugins = load_profile_utils.collect_plugins(plugins_path / f"{OS}-{maya_version}", plugins_path / "python")
+        if not plugins:
+            sys.stdout.write(f"No deployed plugins for Maya {maya_version} in {plugins_path}.\n")
+            continue
+        results = load_profile_utils.profile_plugins(plugins, mayapy, python_paths, stub_maya=stub_maya)
+        # stub timings say nothing about Maya, so they are kept apart
+        key = f"{OS}-{maya_version}{'-stub' if stub_maya else ''}"
+        baseline = load_profile_utils.load_baseline(PLUGIN_LOAD_BASELINE_FILE, key)
+        load_profile_utils.report(results, baseline, f"Plugin load profile for Maya {maya_version}"
+                                                     f"{' (stub maya)' if stub_maya else ''}")
+        if save_baseline or baseline is None:
+            load_profile_utils.save_baseline(PLUGIN_LOAD_BASELINE_FILE, key, results)
+            sys.stdout.write(f"Saved as the baseline of {key} in {PLUGIN_LOAD_BASELINE_FILE}. "
+                             f"Commit it to compare every checkout against it.\n")
+        elif fail_percent is not None:
+            regressions.extend(load_profile_utils.compare(results, baseline, fail_percent))
+        regressions.extend(f"{name} failed to load: {result['error']}" for name, result in results.items()
+                           if "error" in result and fail_percent is not None)
+    if regressions:
+        raise SystemExit("Plugin load regressions:\n" + "\n".join(regressions))
+
+
+def create_release_archives(deploy_root_path, archive_formats=None, jobs=None,
+                            zstd_level=None):
+    """Archive the release folder, the license and the release notes into dist/.
+
+    The archives are reproducible: the same release content gives
+    byte-identical archives. A SHA-256 manifest of every archived file and
+    of the archives is written next to them. tar.zst archives use zstd's
+    default compression level unless `zstd_level` is given.
+    """
+    release_utils = _import_util("release_utils")
+    if archive_formats is None:
+        archive_formats = release_utils.ARCHIVE_FORMATS
+    release_utils.check_formats(archive_formats)
+    files = release_utils.collect_files(deploy_root_path)
+    for extra_file in (REPO_ROOT / "LICENSE", REPO_ROOT / "RELEASE_NOTES.md", REPO_ROOT / "package" / "index.html"):
+        if extra_file.is_file():
+            files.append((extra_file.name, extra_file))
+    files.sort()
+
+    dist_path = REPO_ROOT / "dist"
+    dist_path.mkdir(exist_ok=True)
+    archive_stem = f"{PROJECT.definitions['project_slug']}-{PROJECT.version}-{OS}"
+    writers = {
+        "zip": release_utils.write_zip,
+        "tar.zst": lambda files, path, jobs: release_utils.write_tar_zst(files, path, level=zstd_level, jobs=jobs),
+    }
+    archives = []
+    for archive_format in archive_formats:
+        archive_path = dist_path / f"{archive_stem}.{archive_format}"
+        with TRACER.span(f"archive {archive_path.name}", category="deploy"):
+            if writers[archive_format](files, archive_path, jobs=jobs) is False:
+                continue
+        archives.append(archive_path)
+        sys.stdout.write(f"Created release archive {archive_path.resolve()}.\n")
+    manifest_path = dist_path / f"{archive_stem}.sha256"
+    with TRACER.span("write checksums", category="deploy"):
+        release_utils.write_sha256_manifest(files, manifest_path, extra_files=archives)
+    sys.stdout.write(f"Wrote SHA-256 manifest to {manifest_path.resolve()}.\n")
 
 def generate_release_mod_file(dest_dir: Path):
     """Write the release .mod file to dest_dir/<project_slug>.mod."""
     dest_dir = Path(dest_dir)
     dest_dir.mkdir(parents=True, exist_ok=True)
-    mod_file_path = dest_dir / f"{DEFINITIONS['project_slug']}.mod"
+    mod_file_path = dest_dir / f"{PROJECT.definitions['project_slug']}.mod"
     with open(mod_file_path, "w") as mod_file:
         mod_file.writelines(_generate_release_mod())
     sys.stdout.write(f"Generated .mod file at {mod_file_path.resolve()}.\n")
@@ -259,10 +909,10 @@ def _generate_release_mod():
     Maya will automatically load all plugins under that path.
     Even the folders are empty, it's still good to have them in the .mod file.
     """
-    deploy_versions = DEFINITIONS["target_maya_versions"]
+    deploy_versions = PROJECT.definitions["target_maya_versions"]
     for _platform, _scode in {"windows":"win64", "linux":"linux", "darwin":"mac"}.items():
         for maya_version in deploy_versions:
-            yield f"+ MAYAVERSION:{maya_version} PLATFORM:{_scode} {DEFINITIONS['project_slug']} {VERSION} {DEFINITIONS['project_slug']}\n"
+            yield f"+ MAYAVERSION:{maya_version} PLATFORM:{_scode} {PROJECT.definitions['project_slug']} {PROJECT.version} {PROJECT.definitions['project_slug']}\n"
             yield f"MAYA_PLUG_IN_PATH +:= plugins\\{_platform}-{maya_version}\n"
             yield f"MAYA_PLUG_IN_PATH +:= plugins\\python\n"
             yield f"PYTHONPATH +:= tools\n"
@@ -277,75 +927,18 @@ def _generate_dev_mod():
     Maya will automatically load all plugins under that path.
     Even the folders are empty, it's still good to have them in the .mod file.
     """
-    deploy_versions = DEFINITIONS["target_maya_versions"]
+    deploy_versions = PROJECT.definitions["target_maya_versions"]
     for _platform, _scode in {"windows":"win64", "linux":"linux", "darwin":"mac"}.items():
         for maya_version in deploy_versions:
-            yield f"+ MAYAVERSION:{maya_version} PLATFORM:{_scode} {DEFINITIONS['project_slug']} {VERSION} {REPO_ROOT.as_posix()}\n"
+            yield f"+ MAYAVERSION:{maya_version} PLATFORM:{_scode} {PROJECT.definitions['project_slug']} {PROJECT.version} {REPO_ROOT.as_posix()}\n"
             yield f"MAYA_PLUG_IN_PATH +:= _dev_deploy/plugins/{_platform}-{maya_version}\n"
             yield f"MAYA_PLUG_IN_PATH +:= _dev_deploy/plugins/python\n"
             yield f"PYTHONPATH +:= src/tools\n"
             yield "\n"
 
 def _save_drag_and_drop_me_script(path_to_save):
-    """Generate the drag and drop script for easy installation."""
-    content = f"""
-from pathlib import Path
-import sys
-import shutil
-
-# confirm the maya python interpreter
-CONFIRMED = False
-try:
-    from maya import cmds
-
-    CONFIRMED = True
-except ImportError:
-    CONFIRMED = False
-
-
-def onMayaDroppedPythonFile(*args, **kwargs):
-    if sys.version_info.major < 3:
-        cmds.confirmDialog(title='ERROR:', message="{DEFINITIONS['project_name']} requires Python version 3.6 and higher. Current Maya Python interpreter is not compatible. \\n\\nAborting.", button=['OK'], defaultButton='OK')
-        return
-
-    _add_module()
-
-
-def _add_module():
-    # Define source and destination paths
-    source_modules = Path(__file__).parent / "modules"
-    user_maya_dir = Path(cmds.internalVar(uad=True))
-    destination_modules = user_maya_dir / "modules"
-
-    # Ensure the destination 'modules' folder exists
-    destination_modules.mkdir(parents=True, exist_ok=True)
-
-    # Copy contents of the source 'modules' folder to the destination
-    for item in source_modules.iterdir():
-        destination_item = destination_modules / item.name
-        if item.is_dir():
-            # Merge directory contents
-            for sub_item in item.rglob("*"):
-                relative_path = sub_item.relative_to(item)
-                target_path = destination_item / relative_path
-                if sub_item.is_dir():
-                    target_path.mkdir(parents=True, exist_ok=True)
-                else:
-                    shutil.copy2(sub_item, target_path)
-        else:
-            # Copy file (overwrite if exists)
-            shutil.copy2(item, destination_item)
-
-    # Confirm installation
-    cmds.confirmDialog(
-        title="{DEFINITIONS['project_name']}",
-        message="{DEFINITIONS['project_name']} installed. Please restart Maya to see the shelf and menu items."
-    )
-
-"""
-    # save the content to the specified path
-    with open(path_to_save, "w") as f:
-        f.write(content)
+    """Copy the drag and drop installer script next to the modules folder for easy installation."""
+    shutil.copy2(Path(__file__).resolve().parent / "dragAndDropMe.py", path_to_save)
     sys.stdout.write(f"Generated drag and drop installer script at {path_to_save.resolve()}).\n")
 
 def _get_home_dir():
@@ -356,38 +949,188 @@ def _get_home_dir():
         return os.path.normpath(os.getenv("USERPROFILE"))
     return os.path.normpath(os.getenv("HOME"))
 
-if __name__ == "__main__":
-    # example usage: python package.py --add-plugin my_plugin
+def _run(args):
+    """Run the commands requested on the command line."""
+    if args.add_plugin:
+        add_plugin_to_cmakelists(args.add_plugin, use_pch=args.pch is not False, unity_build=args.unity_build is not False)
+
+    if args.validate_local_devkits:
+        validate_local_devkits(slim=args.slim_devkits)
+
+    if args.devkit_store:
+        manage_devkit_store(args.devkit_store)
+
+    if args.changed is not None and args.plugin:
+        raise SystemExit("--changed and --plugin can not be used together.")
+
+    if args.build:
+        plugin_filter = args.plugin
+        if args.changed is not None:
+            plugin_filter = get_changed_plugins(args.build, "Debug", git_range=args.changed or None)
+            sys.stdout.write(f"Changed plugins for Maya {args.build}: {', '.join(plugin_filter) or 'none'}.\n")
+        build_plugins(args.build, plugin_filter=plugin_filter, clean=args.clean, jobs=args.jobs, ninja=args.ninja,
+                      compiler_cache=args.compiler_cache, pch=args.pch, unity_build=args.unity_build)
+
+    if args.release:
+        release(clean=args.clean, jobs=args.jobs, max_concurrent_versions=args.max_concurrent_versions,
+                ninja=args.ninja, compiler_cache=args.compiler_cache,
+                archive_formats=None if args.archive_formats is None
+                else [fmt for fmt in args.archive_formats.split(",") if fmt],
+                pch=args.pch, unity_build=args.unity_build, zstd_level=args.zstd_level)
+
+    if args.generate_release_mod:
+        generate_release_mod_file(Path(args.generate_release_mod))
+
+    if args.profile_plugins and args.release:
+        release_path = REPO_ROOT / "release" / "modules" / PROJECT.definitions["project_slug"]
+        profile_deployed_plugins(release_path / "plugins", python_paths=[release_path / "tools"],
+                                 stub_maya=args.stub_maya, save_baseline=args.save_plugin_baseline,
+                                 fail_percent=args.plugin_load_fail)
 
+    if hasattr(args, "dev") and args.watch:
+        watch_dev(args.dev, clean=args.clean, jobs=args.jobs, max_concurrent_versions=args.max_concurrent_versions,
+                  ninja=args.ninja, compiler_cache=args.compiler_cache, pch=args.pch, unity_build=args.unity_build)
+    elif hasattr(args, "dev"):
+        dev_deploy(args.dev, plugin_filter=args.plugin, clean=args.clean, jobs=args.jobs,
+                   max_concurrent_versions=args.max_concurrent_versions, ninja=args.ninja,
+                   compiler_cache=args.compiler_cache, changed=args.changed, pch=args.pch,
+                   unity_build=args.unity_build)
+
+    if args.profile_plugins and not args.release:
+        profile_deployed_plugins(REPO_ROOT / "_dev_deploy" / "plugins", getattr(args, "dev", None),
+                                 python_paths=[REPO_ROOT / "src" / "tools"], stub_maya=args.stub_maya,
+                                 save_baseline=args.save_plugin_baseline, fail_percent=args.plugin_load_fail)
+
+def _create_parser():
+    """Return the command line parser."""
     parser = argparse.ArgumentParser(description="Package management script.")
-    parser.add_argument("--add-plugin", type=str, help="Add a plugin to CMakeLists.txt")
+    parser.add_argument("--add-plugin", type=str, metavar="NAMES",
+                        help="Add plugins to CMakeLists.txt. Takes a comma separated list of names (e.g. a,b,c) or @FILE listing one name per line.")
     parser.add_argument("--validate-local-devkits", action="store_true", help="Validate local devkits. If no version is specified, it will attempt to download from the definitions.json.")
+    parser.add_argument("--slim-devkits", action="store_true", default=None,
+                        help="Optional: with --validate-local-devkits, only extract the include, lib and cmake files of downloaded devkits. Set \"slim_devkits\" in definitions.json to make it the default.")
+    parser.add_argument("--devkit-store", type=str, choices=["add", "gc", "report"],
+                        help="Manage the machine-wide deduplicated devkit store: link the local devkits into it (add), remove unreferenced files (gc) or print the space it saves (report). Set \"use_devkit_store\" in definitions.json to add downloaded devkits automatically.")
     parser.add_argument("--build", type=str, help="Build the plugin for given Maya version.")
     parser.add_argument("--plugin", type=str, default=None,
                         help="Optional: build/deploy only this single C++ plugin (must match a folder under src/plugins/cpp/).")
     parser.add_argument("--dev", nargs='?', const=None, type=str,
                         default=argparse.SUPPRESS,
                         help="Build and test deploy the plugin for given Maya version. If no value is provided (just `--dev`), it will be parsed as None; if a version is provided, it will be parsed as that string.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Optional: with --dev, keep watching src/plugins and rebuild and redeploy only the plugins whose files are saved.")
     parser.add_argument("--release", action="store_true", help="Prepare the release package.")
+    parser.add_argument("--archive-formats", type=str, default=None,
+                        help="Optional: comma separated reproducible archive formats --release writes into dist/ (zip, tar.zst, both by default). tar.zst needs zstd on PATH. Pass an empty string to skip the archives.")
+    parser.add_argument("--zstd-level", type=int, choices=range(1, 20), default=None, metavar="1-19",
+                        help="Optional: zstd compression level of the tar.zst archive of --release. Defaults to zstd's default level (3).")
+    parser.add_argument("--changed", nargs='?', const="", default=None, metavar="GIT_RANGE",
+                        help="Optional: with --build or --dev, only build and deploy the C++ plugins whose sources changed since their last successful build. Pass a git range (e.g. origin/main...HEAD) to use the plugins touched by its commits instead.")
+    parser.add_argument("--clean", action="store_true",
+                        help="Optional: wipe the build directory before building instead of building incrementally.")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Optional: total number of parallel compile jobs, split between the concurrent Maya version builds. Defaults to the number of cores.")
+    parser.add_argument("--max-concurrent-versions", type=int, default=None,
+                        help="Optional: maximum number of Maya versions to build at the same time for --dev and --release. Defaults to all of them.")
+    parser.add_argument("--ninja", action="store_true",
+                        help="Optional: use the Ninja generator if it is available on PATH.")
+    parser.add_argument("--compiler-cache", nargs='?', const="auto", default=None, choices=["auto", "ccache", "sccache"],
+                        help="Optional: use ccache or sccache as the compiler launcher and print its statistics after the build. Just `--compiler-cache` picks whichever is available.")
+    parser.add_argument("--pch", action="store_true", default=None,
+                        help="Optional: with --build, --dev or --release, precompile the Maya devkit headers once per Maya version and share them between the plugins. Set \"precompiled_headers\" in definitions.json to make it the default.")
+    parser.add_argument("--no-pch", dest="pch", action="store_false", default=None,
+                        help="Optional: turn the precompiled devkit headers off for this build. With --add-plugin, opt the new plugins out of them.")
+    parser.add_argument("--unity-build", action="store_true", default=None,
+                        help="Optional: with --build, --dev or --release, compile the sources of each plugin in unity batches. Set \"unity_build\" in definitions.json to make it the default.")
+    parser.add_argument("--no-unity-build", dest="unity_build", action="store_false", default=None,
+                        help="Optional: turn unity builds off for this build. With --add-plugin, opt the new plugins out of them.")
+    parser.add_argument("--profile-plugins", action="store_true",
+                        help="Optional: after --dev or --release (or on its own, for the last dev deploy), load every deployed plugin on its own in a fresh mayapy and print its load and initializePlugin time, memory and registered nodes and commands against the saved baseline. Set MAYAPY or MAYAPY_<version> if mayapy is not in the default install location.")
+    parser.add_argument("--save-plugin-baseline", action="store_true",
+                        help="Optional: with --profile-plugins, save this profile as the baseline in package/plugin_load_baseline.json. Commit the file so CI compares against it.")
+    parser.add_argument("--plugin-load-fail", type=float, default=None, metavar="PERCENT",
+                        help="Optional: with --profile-plugins, fail when a plugin loads slower or uses more memory than PERCENT over the baseline, or fails to load.")
+    parser.add_argument("--stub-maya", action="store_true",
+                        help="Optional: with --profile-plugins, use the stub maya package of tests/maya_stub and this Python instead of mayapy, e.g. in CI without Maya.")
     parser.add_argument("--generate-release-mod", type=str, metavar="DEST_DIR", help="Generate the release .mod file into the given directory.")
+    parser.add_argument("--trace", type=str, metavar="TRACE_FILE", default=None,
+                        help="Optional: record the timing of every build and deploy phase into a Chrome trace JSON file. Per target compile spans need --ninja.")
+    parser.add_argument("--profile", nargs='?', const="package.prof", default=None, metavar="PROFILE_FILE",
+                        help="Optional: run the Python side under cProfile, print the top functions and save the stats (default: package.prof).")
+    parser.add_argument("--serve", action="store_true",
+                        help="Optional: start the build daemon. While it runs, --build, --dev and --release are sent to it and run without paying the Python startup and devkit validation again. Stop it with Ctrl+C. Not available on Windows.")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="Optional: run in this process even if the build daemon is running.")
+    return parser
 
-    args = parser.parse_args()
+def _main(args):
+    """Run the parsed command line, with the optional trace and profile."""
+    if args.trace:
+        TRACER.enable()
+        # the daemon runs many requests in the same process
+        TRACER.events = []
+    try:
+        if args.profile:
+            import cProfile
+            import pstats
+            profiler = cProfile.Profile()
+            try:
+                profiler.runcall(_run, args)
+            finally:
+                profiler.dump_stats(args.profile)
+                pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+                sys.stdout.write(f"Saved profile stats to {Path(args.profile).resolve()}.\n")
+        else:
+            _run(args)
+    finally:
+        if args.trace:
+            TRACER.save(args.trace)
+            TRACER.enabled = False
 
-    if args.add_plugin:
-        add_plugin_to_cmakelists(args.add_plugin)
+def _handle_daemon_request(request):
+    """Run a command line sent to the build daemon, in the working directory of its client.
 
-    if args.validate_local_devkits:
-        validate_local_devkits()
+    daemon_utils runs it with the environment of the client.
+    """
+    os.chdir(request["cwd"])
+    _main(_create_parser().parse_args(request["argv"]))
 
-    if args.build:
-        build_plugins(args.build, plugin_filter=args.plugin)
+def serve_daemon():
+    """Run the build daemon of the project until interrupted.
 
-    if args.release:
-        release()
+    The daemon restarts itself when a Python file of the package folder changes.
+    """
+    global _VALIDATED_DEVKITS
+    daemon_utils = _import_util("daemon_utils")
+    if not daemon_utils.is_supported():
+        raise SystemExit("The build daemon needs Unix sockets, which are not available on this platform.")
+    _VALIDATED_DEVKITS = {}
+    package_dir = Path(__file__).resolve().parent
+    try:
+        daemon_utils.serve(daemon_utils.get_socket_path(REPO_ROOT), _handle_daemon_request, source_dir=package_dir,
+                           restart_argv=[str(package_dir / "package.py"), "--serve"])
+    except RuntimeError as e:
+        raise SystemExit(str(e)) from e
 
-    if args.generate_release_mod:
-        generate_release_mod_file(Path(args.generate_release_mod))
+def main(argv=None):
+    """Command line entry point. Returns the exit code."""
+    daemon_utils = _import_util("daemon_utils")
+    args = _create_parser().parse_args(argv)
+    if args.serve:
+        serve_daemon()
+        return 0
 
-    if hasattr(args, "dev"):
-        dev_deploy(args.dev, plugin_filter=args.plugin)
+    # --watch keeps running, so it would block the daemon's queue
+    builds = args.build or args.release or (hasattr(args, "dev") and not args.watch)
+    if builds and not args.no_daemon:
+        exit_code = daemon_utils.send_request(daemon_utils.get_socket_path(REPO_ROOT),
+                                              {"argv": sys.argv[1:] if argv is None else list(argv), "cwd": os.getcwd(),
+                                               "env": dict(os.environ)})
+        if exit_code is not None:
+            return exit_code
+    _main(args)
+    return 0
 
+if __name__ == "__main__":
+    # example usage: python package.py --add-plugin my_plugin
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""The plugin project the package script works on.
+
+Creating a Project does no I/O. definitions.json, the VERSION file and the
+plugin folders are read the first time they are needed and cached. A cached
+value is read again only when the modification time of its file (or folder)
+changes, so a long-running process (the build daemon, the watch loop, a farm
+submitter) can build, deploy and release many times without re-reading files
+that did not change, and still picks up the ones that did.
+"""
+from pathlib import Path
+import json
+import os
+
+
+class Project:
+    """Lazily loaded definitions, version and plugins of a project folder."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.package_root = self.root / "package"
+        self.definitions_file = self.package_root / "definitions.json"
+        self.version_file = self.root / "VERSION"
+        self.root_cmakelists = self.root / "CMakeLists.txt"
+        self.blueprint_path = self.root / "_blueprint" / "plugin_template"
+        self.cpp_plugins_dir = self.root / "src" / "plugins" / "cpp"
+        self._cache = {}
+
+    def _cached(self, path, load):
+        """Return load(), cached until the modification time of path changes."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        cached = self._cache.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, load())
+            self._cache[path] = cached
+        return cached[1]
+
+    def _load_definitions(self):
+        with open(self.definitions_file, "r", encoding="utf-8") as definitions_file:
+            return json.load(definitions_file)
+
+    def _load_version(self):
+        with open(self.version_file, "r", encoding="utf-8") as version_file:
+            return version_file.read().strip()
+
+    def _scan_cpp_plugins(self):
+        if not self.cpp_plugins_dir.is_dir():
+            return []
+        return sorted(entry.name for entry in os.scandir(self.cpp_plugins_dir) if entry.is_dir())
+
+    @property
+    def definitions(self):
+        """The content of definitions.json.
+
+        The same dictionary is returned until the file changes on disk, so
+        in-memory edits are kept until save_definitions() writes them.
+        """
+        return self._cached(self.definitions_file, self._load_definitions)
+
+    @property
+    def version(self):
+        """The project version from the VERSION file."""
+        return self._cached(self.version_file, self._load_version)
+
+    @property
+    def cpp_plugin_names(self):
+        """The sorted names of the C++ plugin folders under src/plugins/cpp.
+
+        Adding or removing a plugin folder changes the modification time of
+        src/plugins/cpp, so the cached list never goes stale.
+        """
+        return list(self._cached(self.cpp_plugins_dir, self._scan_cpp_plugins))
+
+    def save_definitions(self):
+        """Write the in-memory definitions back to definitions.json."""
+        definitions = self.definitions
+        with open(self.definitions_file, "w", encoding="utf-8") as definitions_file:
+            json.dump(definitions, definitions_file, indent=4)
+        # keep the saved dictionary instead of reading it back on the next access
+        self._cache[self.definitions_file] = (os.stat(self.definitions_file).st_mtime_ns, definitions)
+
+    def clear_cache(self):
+        """Forget everything read so far."""
+        self._cache.clear()
@@ -0,0 +1,162 @@
+"""Utility module to write reproducible release archives.
+
+Archives have sorted entries, fixed timestamps (SOURCE_DATE_EPOCH if set,
+1980-01-01 otherwise), fixed ownership and normalized permissions, so the
+same release content always produces byte-identical archives.
+
+Zip members are deflated in parallel threads. tar.zst archives are
+compressed by the multi-threaded `zstd` command line tool, whose output
+does not depend on the number of threads.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import io
+import os
+import shutil
+import stat
+import struct
+import subprocess
+import sys
+import tarfile
+import time
+import zlib
+
+try:
+    from . import download_utils
+except ImportError:
+    import download_utils
+
+# 1980-01-01, the earliest time a zip archive can store
+DEFAULT_TIMESTAMP = 315532800
+
+ARCHIVE_FORMATS = ("zip", "tar.zst")
+
+_ZIP_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_ZIP_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_ZIP_END_RECORD = struct.Struct("<IHHHHIIH")
+_ZIP_UTF8_FLAG = 0x800
+_ZIP_VERSION = 20
+_ZIP_MADE_BY_UNIX = 3 << 8
+
+
+def check_formats(archive_formats):
+    """Raise a ValueError if any of the archive formats is not supported."""
+    unknown_formats = set(archive_formats) - set(ARCHIVE_FORMATS)
+    if unknown_formats:
+        raise ValueError(f"Unknown archive formats: {', '.join(sorted(unknown_formats))}. "
+                         f"Supported formats are {', '.join(ARCHIVE_FORMATS)}.")
+
+
+def collect_files(root_path):
+    """Return the sorted (archive name, path) pairs of every file under root_path."""
+    root_path = Path(root_path)
+    files = []
+    for dir_path, _, file_names in os.walk(root_path):
+        for file_name in file_names:
+            path = Path(dir_path) / file_name
+            files.append((path.relative_to(root_path).as_posix(), path))
+    return sorted(files)
+
+
+def _normalized_mode(path):
+    """Return 0o755 for executable files and 0o644 for all others."""
+    return 0o755 if os.stat(path).st_mode & stat.S_IXUSR else 0o644
+
+
+def _dos_date_time(timestamp):
+    """Return the (date, time) of the timestamp in zip (MS-DOS) format."""
+    value = time.gmtime(max(timestamp, 315532800))
+    dos_date = (value.tm_year - 1980) << 9 | value.tm_mon << 5 | value.tm_mday
+    dos_time = value.tm_hour << 11 | value.tm_min << 5 | value.tm_sec // 2
+    return dos_date, dos_time
+
+
+def _deflate_member(path, level):
+    """Return (method, crc32, raw size, data) of a file to store in a zip archive."""
+    raw = Path(path).read_bytes()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(raw) + compressor.flush()
+    if len(compressed) >= len(raw):
+        return 0, zlib.crc32(raw), len(raw), raw
+    return 8, zlib.crc32(raw), len(raw), compressed
+
+
+def fixed_timestamp():
+    """Return the timestamp of the archive members, read when called so the build daemon sees its client's SOURCE_DATE_EPOCH."""
+    return int(os.getenv("SOURCE_DATE_EPOCH") or DEFAULT_TIMESTAMP)
+
+
+def write_zip(files, archive_path, level=9, jobs=None):
+    """Write a reproducible zip archive of the (archive name, path) pairs.
+
+    Members are compressed in parallel and written in the given order.
+    """
+    dos_date, dos_time = _dos_date_time(fixed_timestamp())
+    central_directory = io.BytesIO()
+    archive_path = Path(archive_path)
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor, \
+            open(archive_path, "wb") as archive:
+        members = executor.map(lambda item: _deflate_member(item[1], level), files)
+        for (name, path), (method, crc, size, data) in zip(files, members):
+            encoded_name = name.encode("utf-8")
+            if archive.tell() > 0xFFFFFFFF or size > 0xFFFFFFFF:
+                raise ValueError(f"{archive_path} is too large for a zip archive without zip64.")
+            offset = archive.tell()
+            archive.write(_ZIP_LOCAL_HEADER.pack(
+                0x04034B50, _ZIP_VERSION, _ZIP_UTF8_FLAG, method, dos_time, dos_date,
+                crc, len(data), size, len(encoded_name), 0
+            ))
+            archive.write(encoded_name)
+            archive.write(data)
+            central_directory.write(_ZIP_CENTRAL_HEADER.pack(
+                0x02014B50, _ZIP_MADE_BY_UNIX | _ZIP_VERSION, _ZIP_VERSION, _ZIP_UTF8_FLAG, method,
+                dos_time, dos_date, crc, len(data), size, len(encoded_name), 0, 0, 0, 0,
+                (stat.S_IFREG | _normalized_mode(path)) << 16, offset
+            ))
+            central_directory.write(encoded_name)
+        central_offset = archive.tell()
+        archive.write(central_directory.getvalue())
+        archive.write(_ZIP_END_RECORD.pack(
+            0x06054B50, 0, 0, len(files), len(files), len(central_directory.getvalue()), central_offset, 0
+        ))
+
+
+def write_tar_zst(files, archive_path, level=None, jobs=None):
+    """Write a reproducible zstd compressed tar archive of the (archive name, path) pairs.
+
+    `level` is the zstd compression level (1-19), zstd's default when None.
+    Returns False if the zstd command line tool is not available.
+    """
+    if not shutil.which("zstd"):
+        sys.stdout.write(f"zstd not found on PATH. Skipping {Path(archive_path).name}.\n")
+        return False
+    timestamp = fixed_timestamp()
+    command = ["zstd"] + ([f"-{level}"] if level else []) + [f"-T{jobs or 0}", "-q", "-f", "-o", str(archive_path)]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    try:
+        with tarfile.open(fileobj=process.stdin, mode="w|", format=tarfile.GNU_FORMAT) as archive:
+            for name, path in files:
+                info = tarfile.TarInfo(name)
+                info.size = os.stat(path).st_size
+                info.mtime = timestamp
+                info.mode = _normalized_mode(path)
+                info.uid = info.gid = 0
+                info.uname = info.gname = ""
+                with open(path, "rb") as file_data:
+                    archive.addfile(info, file_data)
+    finally:
+        process.stdin.close()
+    if process.wait() != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return True
+
+
+def write_sha256_manifest(files, manifest_path, extra_files=()):
+    """Write the SHA-256 of every (archive name, path) pair in sha256sum format.
+
+    `extra_files` (e.g. the archives themselves) are listed by file name.
+    """
+    entries = list(files) + [(Path(path).name, path) for path in extra_files]
+    with open(manifest_path, "w", encoding="utf-8", newline="\n") as manifest_file:
+        for name, path in entries:
+            manifest_file.write(f"{download_utils.hash_file(path)}  {name}\n")
@@ -0,0 +1,146 @@
+"""Utility module for the machine-wide, content-addressed devkit store.
+
+Every file added to the store is kept once under objects/<sha256[:2]>/<sha256>
+and hardlinked back into the devkit it came from. Identical headers, libs and
+cmake files of different Maya versions (and of different project clones on
+the same machine) then share a single copy on disk.
+
+A store object which is no longer linked from any devkit has a link count of
+one and is removed by gc(). Devkits linked into the store must be treated as
+read-only, since editing a file in place changes it for every devkit sharing it.
+
+The store lives in the directory set by the MAYA_DEVKIT_STORE environment
+variable, or next to the download cache by default. It has to be on the same
+file system as the devkits for hardlinks to work.
+"""
+from pathlib import Path
+import errno
+import os
+import sys
+
+try:
+    from . import download_utils
+except ImportError:
+    import download_utils
+
+
+def get_store_dir():
+    """Return the machine-wide devkit store directory."""
+    if os.getenv("MAYA_DEVKIT_STORE"):
+        return Path(os.getenv("MAYA_DEVKIT_STORE"))
+    return download_utils.get_cache_dir().parent / "maya_devkit_store"
+
+
+def _get_object_path(store_dir, digest):
+    """Return the store path of the object with the given digest."""
+    return store_dir / "objects" / digest[:2] / digest
+
+
+def _iter_objects(store_dir):
+    """Yield the paths of every object in the store."""
+    objects_dir = store_dir / "objects"
+    if not objects_dir.is_dir():
+        return
+    for shard in objects_dir.iterdir():
+        if shard.is_dir():
+            yield from (path for path in shard.iterdir() if path.is_file())
+
+
+def _replace_with_link(object_path, file_path):
+    """Atomically replace file_path with a hardlink to object_path."""
+    temp_path = file_path.with_name(f".{file_path.name}.link")
+    if temp_path.exists():
+        temp_path.unlink()
+    os.link(object_path, temp_path)
+    os.replace(temp_path, file_path)
+
+
+def add_tree(tree_path, store_dir=None):
+    """Move every file of tree_path into the store and hardlink it back.
+
+    Files which are already linked to a store object are skipped without
+    being hashed. Returns a dictionary with the number of files and bytes
+    which were new to the store, and deduplicated against an existing object.
+    """
+    store_dir = Path(store_dir) if store_dir else get_store_dir()
+    stats = {"files": 0, "new_files": 0, "new_bytes": 0, "deduplicated_files": 0, "deduplicated_bytes": 0}
+    stored_inodes = {(stat.st_dev, stat.st_ino) for stat in (path.stat() for path in _iter_objects(store_dir))}
+    for dir_path, _, file_names in os.walk(tree_path):
+        for file_name in file_names:
+            file_path = Path(dir_path) / file_name
+            if file_path.is_symlink() or not file_path.is_file():
+                continue
+            stats["files"] += 1
+            file_stat = file_path.stat()
+            if (file_stat.st_dev, file_stat.st_ino) in stored_inodes:
+                continue
+            object_path = _get_object_path(store_dir, download_utils.hash_file(file_path))
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                try:
+                    os.link(file_path, object_path)
+                    stats["new_files"] += 1
+                    stats["new_bytes"] += file_stat.st_size
+                except FileExistsError:
+                    # identical content is already in the store (maybe added by a concurrent install)
+                    _replace_with_link(object_path, file_path)
+                    stats["deduplicated_files"] += 1
+                    stats["deduplicated_bytes"] += file_stat.st_size
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                sys.stdout.write(f"Devkit store {store_dir} is on another file system than {tree_path}. Skipping deduplication.\n")
+                return stats
+            stored_inodes.add((file_stat.st_dev, file_stat.st_ino))
+    return stats
+
+
+def gc(store_dir=None):
+    """Remove the store objects which are no longer linked from any devkit.
+
+    Returns the number of removed objects and freed bytes.
+    """
+    store_dir = Path(store_dir) if store_dir else get_store_dir()
+    removed, freed = 0, 0
+    for object_path in list(_iter_objects(store_dir)):
+        object_stat = object_path.stat()
+        if object_stat.st_nlink <= 1:
+            object_path.unlink()
+            removed += 1
+            freed += object_stat.st_size
+    objects_dir = store_dir / "objects"
+    if objects_dir.is_dir():
+        for shard in objects_dir.iterdir():
+            if shard.is_dir() and not any(shard.iterdir()):
+                shard.rmdir()
+    return removed, freed
+
+
+def report(store_dir=None):
+    """Return a dictionary describing the store and how much space deduplication saved.
+
+    `linked_bytes` is the size all devkits linked into the store would take
+    as plain copies, `stored_bytes` the size they actually take.
+    """
+    store_dir = Path(store_dir) if store_dir else get_store_dir()
+    result = {"objects": 0, "unreferenced": 0, "stored_bytes": 0, "linked_bytes": 0, "saved_bytes": 0}
+    for object_path in _iter_objects(store_dir):
+        object_stat = object_path.stat()
+        # one of the links is the store object itself
+        devkit_links = object_stat.st_nlink - 1
+        result["objects"] += 1
+        result["stored_bytes"] += object_stat.st_size
+        result["linked_bytes"] += object_stat.st_size * devkit_links
+        result["saved_bytes"] += object_stat.st_size * max(0, devkit_links - 1)
+        if devkit_links < 1:
+            result["unreferenced"] += 1
+    return result
+
+
+def format_size(size):
+    """Return a human readable size."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.1f} GB"
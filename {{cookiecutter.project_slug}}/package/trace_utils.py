@@ -0,0 +1,142 @@
+"""Utility module to record build and deploy timings in Chrome trace format.
+
+The saved JSON file can be opened in chrome://tracing, https://ui.perfetto.dev
+or https://www.speedscope.app.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import os
+import sys
+import time
+
+MAIN_TRACK = 0
+
+
+def _now_us():
+    """Return the wall clock time in microseconds.
+
+    Wall clock is used instead of a performance counter so that spans
+    recorded in build worker processes line up with the main process.
+    """
+    return time.time_ns() // 1000
+
+
+def get_track(maya_version=None):
+    """Return the trace track (thread id) for the given Maya version."""
+    if maya_version is None:
+        return MAIN_TRACK
+    try:
+        return int(maya_version)
+    except ValueError:
+        return abs(hash(maya_version)) % 100000
+
+
+class Tracer:
+    """Collect timing spans as Chrome trace events."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self._track_names = {MAIN_TRACK: "package"}
+
+    def enable(self):
+        """Start recording spans."""
+        self.enabled = True
+
+    @contextmanager
+    def span(self, name, maya_version=None, category="package", **args):
+        """Record the duration of the wrapped block as a span."""
+        if not self.enabled:
+            yield
+            return
+        start = _now_us()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, _now_us() - start, maya_version=maya_version, category=category, **args)
+
+    def add_span(self, name, start_us, duration_us, maya_version=None, category="package", **args):
+        """Add a span with an explicit start time and duration (in microseconds)."""
+        if not self.enabled:
+            return
+        track = get_track(maya_version)
+        if track not in self._track_names:
+            self._track_names[track] = f"Maya {maya_version}"
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_us,
+            "dur": max(0, duration_us),
+            "pid": os.getpid(),
+            "tid": track,
+            "args": args,
+        })
+
+    def merge(self, events):
+        """Merge the events recorded by another process (e.g. a build worker)."""
+        for event in events:
+            if event["tid"] not in self._track_names:
+                self._track_names[event["tid"]] = f"Maya {event['tid']}"
+        self.events.extend(events)
+
+    def add_ninja_log_spans(self, ninja_log_path, first_line, build_start_us, maya_version=None):
+        """Add per target and per output spans from the entries of a .ninja_log file.
+
+        Only the lines from `first_line` on are read, so entries from earlier
+        builds are skipped. Ninja records times relative to its own start,
+        which is approximated with `build_start_us`.
+        """
+        if not self.enabled or not ninja_log_path.is_file():
+            return
+        with open(ninja_log_path, "r", encoding="utf-8") as log_file:
+            lines = log_file.readlines()[first_line:]
+        targets = {}
+        for line in lines:
+            if line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 4:
+                continue
+            start_ms, end_ms, output = int(fields[0]), int(fields[1]), fields[3]
+            target = _get_ninja_output_target(output)
+            self.add_span(Path(output).name, build_start_us + start_ms * 1000, (end_ms - start_ms) * 1000,
+                          maya_version=maya_version, category="compile", target=target, output=output)
+            target_start, target_end = targets.get(target, (start_ms, end_ms))
+            targets[target] = (min(target_start, start_ms), max(target_end, end_ms))
+        for target, (start_ms, end_ms) in targets.items():
+            self.add_span(f"target {target}", build_start_us + start_ms * 1000, (end_ms - start_ms) * 1000,
+                          maya_version=maya_version, category="target", target=target)
+
+    def save(self, file_path):
+        """Write the recorded events to a Chrome trace JSON file."""
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": track, "args": {"name": self._track_names[track]}}
+            for pid, track in sorted({(event["pid"], event["tid"]) for event in self.events})
+        ]
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}, trace_file)
+        sys.stdout.write(f"Saved timing trace with {len(self.events)} spans to {file_path.resolve()}.\n")
+
+
+def count_lines(file_path):
+    """Return the number of lines in the file or 0 if it does not exist."""
+    if not file_path.is_file():
+        return 0
+    with open(file_path, "rb") as file_data:
+        return sum(1 for _ in file_data)
+
+
+def _get_ninja_output_target(output):
+    """Return the CMake target name which produced the given ninja output."""
+    parts = Path(output).parts
+    for part in parts:
+        if part.endswith(".dir"):
+            return part[:-len(".dir")]
+    return Path(output).stem
+
+
+TRACER = Tracer()
@@ -0,0 +1,178 @@
+"""Utility module to watch source folders for changes.
+
+On Linux the folders are watched with inotify (through ctypes, so no extra
+dependency is needed). Everywhere else, or when inotify is not available,
+the folders are polled for changed modification times and sizes.
+
+Bursts of changes (e.g. an editor writing several files on save) are
+collected until the folders are quiet for the debounce time and reported
+as one set of paths.
+"""
+from pathlib import Path
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+import struct
+import sys
+import time
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ATTRIB
+_EVENT_HEADER = struct.Struct("iIII")
+
+# editor swap and backup files
+_IGNORED_SUFFIXES = (".swp", ".swx", ".tmp", "~")
+
+
+def is_ignored(path):
+    """Return True for hidden, temporary and backup files."""
+    return Path(path).name.startswith(".") or Path(path).name.endswith(_IGNORED_SUFFIXES)
+
+
+class InotifyWatcher:
+    """Watch folder trees with Linux inotify."""
+
+    def __init__(self, roots):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths = {}
+        for root in roots:
+            self._add_tree(Path(root))
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Could not watch {path}")
+        self._paths[wd] = path
+
+    def _add_tree(self, root):
+        """Watch the folder and every folder under it (inotify is not recursive)."""
+        if not root.is_dir():
+            return
+        self._add_watch(root)
+        for dir_path, dir_names, _ in os.walk(root):
+            for dir_name in dir_names:
+                self._add_watch(Path(dir_path) / dir_name)
+
+    def wait(self, timeout=None):
+        """Return the changed paths, or an empty set if nothing changed within timeout seconds."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # events were lost, report every watched folder
+                changed.update(self._paths.values())
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._paths[wd]
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self):
+        """Stop watching."""
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Watch folder trees by comparing the modification time and size of their files."""
+
+    def __init__(self, roots, interval=0.5):
+        self._roots = [Path(root) for root in roots]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for root in self._roots:
+            for dir_path, _, file_names in os.walk(root):
+                for file_name in file_names:
+                    path = Path(dir_path) / file_name
+                    try:
+                        file_stat = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (file_stat.st_mtime_ns, file_stat.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Return the changed paths, or an empty set if nothing changed within timeout seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is None:
+                time.sleep(self.interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return set()
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        """Stop watching."""
+
+
+def create_watcher(roots):
+    """Return an inotify watcher on Linux, or a polling watcher."""
+    if platform.system().lower() == "linux":
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            sys.stdout.write(f"inotify is not available ({e}). Polling for changes instead.\n")
+    return PollingWatcher(roots)
+
+
+def watch(roots, callback, debounce=0.3):
+    """Call `callback` with the set of changed paths after every burst of changes.
+
+    Runs until interrupted with Ctrl+C.
+    """
+    watcher = create_watcher(roots)
+    sys.stdout.write(f"Watching {', '.join(str(root) for root in roots)} for changes. Press Ctrl+C to stop.\n")
+    try:
+        while True:
+            changed = watcher.wait()
+            while True:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            changed = {path for path in changed if not is_ignored(path)}
+            if changed:
+                callback(changed)
+    except KeyboardInterrupt:
+        sys.stdout.write("Stopped watching.\n")
+    finally:
+        watcher.close()
@@ -1,41 +1,79 @@
 """Pytest configuration for Maya tests."""
+import os
 
 import pytest
 
+import impact
+from scene_isolation import SceneIsolation
+
+SCENE_ISOLATION = SceneIsolation()
+
 # IN_GITHUB_ACTIONS = os.getenv("GITHUB_ACTIONS") == "true"
 
+
+def pytest_addoption(parser):
+    impact.add_options(parser)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "baseline_scene(fixture_name): start the test from an unchanged copy of "
+                                       "the scene snapshot returned by the fixture")
+    config.addinivalue_line("markers", "reset_scene: always reset the scene before and after the test, for tests "
+                                       "changing Maya state without setting the scene's modified flag")
+    impact.configure(config)
+
+
 @pytest.fixture(scope='session', autouse=True)
 def initialize():
     """Initialize Maya standalone session before running tests."""
-    import maya.standalone
-    try:
-        maya.standalone.initialize()
-    except RuntimeError:
-        # Maya is already initialized
-        pass
+    # warm workers of tests/shard_runner.py initialize Maya once, it outlives the test session
+    warm_worker = os.environ.get("MAYA_TEST_WORKER")
+    if not warm_worker:
+        import maya.standalone
+        try:
+            maya.standalone.initialize()
+        except RuntimeError:
+            # Maya is already initialized
+            pass
     # Import tik.maya to ensure all node wrappers and the default factory are registered
     from maya import cmds # noqa: F401
+    # start from a known scene, a warm worker still has the scene of its previous run
+    SCENE_ISOLATION.reset(force=True)
     yield
-    maya.standalone.uninitialize()
+    SCENE_ISOLATION.close()
+    if not warm_worker:
+        maya.standalone.uninitialize()
+
+
+@pytest.fixture(scope="session")
+def scene_isolation():
+    """The SceneIsolation of the session, to reset the scene and take baseline snapshots."""
+    return SCENE_ISOLATION
 
 
 # make sure every test happens on a fresh scene
 @pytest.fixture(scope="function", autouse=True)
-def new_scene():
-    """Reset Maya + tik.maya global state before/after each test.
+def new_scene(request):
+    """Give each test a fresh scene, or a fresh copy of its baseline_scene snapshot.
 
-    Maya's selection, current scene, and tik.maya's registry/default-factory are
-    all process-global. If they leak between tests, you can get order-dependent
-    failures.
+    Maya's selection and current scene are process-global. If they leak
+    between tests, you can get order-dependent failures. The scene is only
+    reset when the previous test changed it, see scene_isolation.py.
     """
-    from maya import cmds
-
-    # Fresh scene and empty selection
-    cmds.file(new=True, force=True)
-    cmds.select(clear=True)
+    force = request.node.get_closest_marker("reset_scene") is not None
+    baseline = request.node.get_closest_marker("baseline_scene")
+    SCENE_ISOLATION.tests += 1
+    if baseline:
+        SCENE_ISOLATION.restore(request.getfixturevalue(baseline.args[0]), force=force)
+    else:
+        SCENE_ISOLATION.reset(force=force)
     yield
+    if force:
+        SCENE_ISOLATION.reset(force=True)
 
-    # Clean up again so the next test always starts from a known state.
-    cmds.file(new=True, force=True)
-    cmds.select(clear=True)
 
+def pytest_terminal_summary(terminalreporter):
+    if SCENE_ISOLATION.tests:
+        terminalreporter.write_sep("-", "scene isolation")
+        for line in SCENE_ISOLATION.summary_lines():
+            terminalreporter.write_line(line)
@@ -0,0 +1,277 @@
+"""Test impact analysis: run only the tests affected by the changed plugins and tools.
+
+--impact-record records, for every test, the files under src it executed
+(one coverage context per test) and the Maya plugins it loaded, together with
+the hashes of every file under src and tests and of the loaded plugin
+binaries, in tests/.test_impact.json.
+
+--impact-affected only runs the tests affected by the changes since that
+recording. A test is affected when
+- a file under src it executed changed,
+- a plugin it loaded changed, i.e. its sources under src/plugins or its binary,
+- its test module changed, or it is a new test.
+Every test runs when there is no recording, when a file under tests other
+than a test module changed (conftest.py, helpers, ...), or when a changed file
+under src only ran while the tests were imported, outside of any test.
+
+Both together run the affected tests and update the recording, which is how
+CI keeps it current.
+"""
+from pathlib import Path
+import hashlib
+import json
+import sys
+
+import pytest
+
+TESTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = TESTS_DIR.parent
+SRC_DIR = REPO_ROOT / "src"
+IMPACT_FILE = TESTS_DIR / ".test_impact.json"
+
+# bumped when the recording format changes, older recordings are ignored
+IMPACT_FORMAT = 1
+
+
+def _relative(path):
+    return Path(path).resolve().relative_to(REPO_ROOT).as_posix()
+
+
+def _file_hash(path):
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def hash_tree(root):
+    """Return the hashes of the files under root by their repo relative path."""
+    return {
+        _relative(path): _file_hash(path)
+        for path in Path(root).rglob("*")
+        if path.is_file() and "__pycache__" not in path.parts and path != IMPACT_FILE
+        and not path.name.startswith(".")
+    }
+
+
+def _is_test_module(path):
+    name = Path(path).name
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def _plugin_sources(plugin):
+    """Return the repo relative path prefixes of the sources of a plugin."""
+    return (f"src/plugins/cpp/{plugin}/", f"src/plugins/python/{plugin}.py", f"src/plugins/python/{plugin}/")
+
+
+def _changed(old, new):
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+def load_recording(path=IMPACT_FILE):
+    """Return the recording, or None if there is none usable."""
+    try:
+        recording = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return recording if recording.get("format") == IMPACT_FORMAT else None
+
+
+def affected_tests(recording, test_ids, source_hashes, test_hashes):
+    """Return the affected ones of test_ids, and the reason when all of them run instead."""
+    if recording is None:
+        return set(test_ids), "there is no recording of the previous run"
+    changed_tests = _changed(recording["test_files"], test_hashes)
+    for path in sorted(changed_tests):
+        if not _is_test_module(path):
+            return set(test_ids), f"{path} changed"
+    changed_sources = _changed(recording["source_files"], source_hashes)
+    import_changes = sorted(changed_sources.intersection(recording["import_files"]))
+    if import_changes:
+        return set(test_ids), f"{import_changes[0]} changed and only ran on import"
+    changed_plugins = {
+        plugin for plugin, binary in recording["plugins"].items()
+        if _file_hash(binary["path"]) != binary["sha256"]
+        or any(path.startswith(_plugin_sources(plugin)) for path in changed_sources)
+    }
+    affected = set()
+    for test_id in test_ids:
+        record = recording["tests"].get(test_id)
+        if record is None or test_id.split("::", 1)[0] in changed_tests \
+                or changed_sources.intersection(record["files"]) or changed_plugins.intersection(record["plugins"]):
+            affected.add(test_id)
+    return affected, None
+
+
+class ImpactPlugin:
+    """Pytest plugin recording the impact of the tests and deselecting the unaffected ones."""
+
+    def __init__(self, config):
+        self.record = config.getoption("impact_record")
+        self.affected = config.getoption("impact_affected")
+        self.impact_file = Path(config.getoption("impact_file"))
+        self.recording = load_recording(self.impact_file)
+        self.source_hashes = hash_tree(SRC_DIR)
+        self.test_hashes = hash_tree(TESTS_DIR)
+        self.message = None
+        self._collected = []
+        self._deselected_all = False
+        self._coverage = None
+        self._own_coverage = False
+        self._plugins = {}
+        self._plugin_paths = {}
+        self._current = None
+        self._patched = False
+        if self.record:
+            self._start_coverage()
+
+    def _start_coverage(self):
+        import coverage
+        # record into the coverage of `coverage run` if there is one, two tracers do not work together
+        self._coverage = getattr(coverage.Coverage, "current", lambda: None)()
+        if self._coverage is None:
+            self._coverage = coverage.Coverage(data_file=None, source=[str(SRC_DIR)])
+            self._coverage.start()
+            self._own_coverage = True
+
+    @staticmethod
+    def test_id(item):
+        """Return the test id relative to the repo, whatever the pytest rootdir is."""
+        path = getattr(item, "path", None) or item.fspath
+        return _relative(path) + item.nodeid[len(item.nodeid.split("::", 1)[0]):]
+
+    def pytest_collection_modifyitems(self, config, items):
+        self._collected = [self.test_id(item) for item in items]
+        if not self.affected:
+            return
+        affected, reason = affected_tests(self.recording, self._collected, self.source_hashes, self.test_hashes)
+        if reason:
+            self.message = f"Running every test, {reason}."
+            return
+        selected = [item for item, test_id in zip(items, self._collected) if test_id in affected]
+        deselected = [item for item, test_id in zip(items, self._collected) if test_id not in affected]
+        self.message = f"{len(selected)} of {len(items)} tests are affected by the changes since the recording."
+        self._deselected_all = bool(items) and not selected
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+    def _loaded_plugins(self):
+        cmds = sys.modules.get("maya.cmds")
+        if cmds is None or not hasattr(cmds, "pluginInfo"):
+            return set()
+        return {Path(plugin).stem for plugin in cmds.pluginInfo(query=True, listPlugins=True) or []}
+
+    def _patch_load_plugin(self):
+        """Record the plugins a test loads, also the ones loaded already by an earlier test."""
+        cmds = sys.modules.get("maya.cmds")
+        if self._patched or cmds is None or not hasattr(cmds, "loadPlugin"):
+            return
+        load_plugin = cmds.loadPlugin
+
+        def _load_plugin(*plugins, **kwargs):
+            if self._current is not None:
+                self._current.update(Path(plugin).stem for plugin in plugins)
+            return load_plugin(*plugins, **kwargs)
+
+        cmds.loadPlugin = _load_plugin
+        self._patched = True
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        if not self.record:
+            yield
+            return
+        test_id = self.test_id(item)
+        self._patch_load_plugin()
+        self._current = self._plugins[test_id] = set()
+        loaded_before = self._loaded_plugins()
+        self._coverage.switch_context(test_id)
+        yield
+        self._coverage.switch_context("")
+        # plugins loaded before loadPlugin could be patched, e.g. while Maya was initialized by the first test
+        self._current.update(self._loaded_plugins() - loaded_before)
+        self._current = None
+        cmds = sys.modules.get("maya.cmds")
+        for plugin in self._plugins[test_id]:
+            if plugin not in self._plugin_paths and cmds is not None and cmds.pluginInfo(plugin, query=True, loaded=True):
+                self._plugin_paths[plugin] = cmds.pluginInfo(plugin, query=True, path=True)
+
+    def _executed_files(self):
+        """Return the files under src executed by each recorded test, and the ones executed outside of the tests."""
+        data = self._coverage.get_data()
+        files = {test_id: set() for test_id in self._plugins}
+        import_files = set()
+        for measured_file in data.measured_files():
+            path = Path(measured_file).resolve()
+            if SRC_DIR not in path.parents:
+                continue
+            for contexts in data.contexts_by_lineno(measured_file).values():
+                for context in contexts:
+                    # "static|dynamic" when coverage run --context is used
+                    test_id = context.rsplit("|", 1)[-1]
+                    if test_id in files:
+                        files[test_id].add(_relative(path))
+                    else:
+                        import_files.add(_relative(path))
+        # files which also ran in a test are covered by that test
+        import_files.difference_update(*files.values())
+        return files, import_files
+
+    def _save_recording(self):
+        if self._own_coverage:
+            self._coverage.stop()
+        files, import_files = self._executed_files()
+        recording = self.recording or {"tests": {}, "plugins": {}, "import_files": []}
+        # keep the tests which did not run (deselected, or in other test folders), unless the changes made
+        # their record out of date or their module is gone
+        not_run = [test_id for test_id in recording["tests"]
+                   if test_id not in self._plugins and test_id.split("::", 1)[0] in self.test_hashes]
+        affected, _ = affected_tests(self.recording, not_run, self.source_hashes, self.test_hashes)
+        tests = {test_id: recording["tests"][test_id] for test_id in not_run
+                 if test_id in recording["tests"] and test_id not in affected}
+        for test_id, plugins in self._plugins.items():
+            tests[test_id] = {"files": sorted(files[test_id]), "plugins": sorted(plugins)}
+        plugins = dict(recording["plugins"])
+        for plugin, path in self._plugin_paths.items():
+            plugins[plugin] = {"path": path, "sha256": _file_hash(path)}
+        used_plugins = {plugin for record in tests.values() for plugin in record["plugins"]}
+        # files of the kept tests are still covered by them
+        import_files.update(path for path in recording["import_files"] if path in self.source_hashes)
+        import_files.difference_update(*(record["files"] for record in tests.values()))
+        self.impact_file.write_text(json.dumps({
+            "format": IMPACT_FORMAT,
+            "import_files": sorted(import_files),
+            "source_files": self.source_hashes,
+            "test_files": self.test_hashes,
+            "plugins": {plugin: binary for plugin, binary in plugins.items() if plugin in used_plugins},
+            "tests": tests,
+        }, indent=1, sort_keys=True), encoding="utf-8")
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        if self.record:
+            self._save_recording()
+        if self._deselected_all and exitstatus == pytest.ExitCode.NO_TESTS_COLLECTED:
+            # nothing is affected, that is a success
+            session.exitstatus = pytest.ExitCode.OK
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.message:
+            terminalreporter.write_sep("-", "test impact")
+            terminalreporter.write_line(self.message)
+
+
+def add_options(parser):
+    group = parser.getgroup("impact", "test impact analysis")
+    group.addoption("--impact-record", action="store_true",
+                    help="record the files under src each test executes and the plugins it loads")
+    group.addoption("--impact-affected", action="store_true",
+                    help="only run the tests affected by the changes since the last --impact-record")
+    group.addoption("--impact-file", default=str(IMPACT_FILE),
+                    help="the recording file, defaults to tests/.test_impact.json")
+
+
+def configure(config):
+    """Register the impact plugin when one of its options is used."""
+    if config.getoption("impact_record") or config.getoption("impact_affected"):
+        config.pluginmanager.register(ImpactPlugin(config), "impact")
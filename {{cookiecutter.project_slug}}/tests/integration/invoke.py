@@ -3,4 +3,4 @@ import sys
 from pytest import main
 if __name__ == '__main__':
     sys.argv[0] = re.sub(r'(-script\.pyw|\.exe)?$', '', sys.argv[0])
-    sys.exit(main(["./tests/integration"]))
\ No newline at end of file
+    sys.exit(main(["./tests/integration"] + sys.argv[1:]))
\ No newline at end of file
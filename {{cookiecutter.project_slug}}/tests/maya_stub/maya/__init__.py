@@ -0,0 +1,6 @@
+"""Minimal stand-in for the maya package, used to run the test tooling without Maya.
+
+Put tests/maya_stub on the PYTHONPATH (tests/shard_runner.py --stub-maya does
+it for its workers). Only the few commands the test fixtures need are
+implemented, on a small in-memory scene.
+"""
@@ -0,0 +1,44 @@
+"""Stand-in for maya.api.OpenMaya, enough for Python plugins to register their nodes and commands.
+
+What MFnPlugin registers is reported by maya.cmds.pluginInfo of the plugin
+being loaded.
+"""
+from maya import cmds
+
+
+class MObject:
+    pass
+
+
+class MTypeId:
+    def __init__(self, value=0):
+        self.value = value
+
+
+class MPxCommand:
+    pass
+
+
+class MPxNode:
+    kDependNode = 0
+
+
+class MFnPlugin:
+    """Records the registrations on the plugin maya.cmds.loadPlugin is loading."""
+
+    def __init__(self, mobject=None, vendor="", version="", apiVersion="Any"):
+        self._registered = cmds._registered.setdefault(cmds._loading[-1] if cmds._loading else "",
+                                                       {"dependNode": [], "command": []})
+
+    def registerCommand(self, name, creator, *args):
+        self._registered["command"].append(name)
+
+    def deregisterCommand(self, name):
+        # maya.cmds.unloadPlugin forgets the registrations of the plugin
+        pass
+
+    def registerNode(self, name, type_id, creator, initializer=None, node_type=MPxNode.kDependNode, *args):
+        self._registered["dependNode"].append(name)
+
+    def deregisterNode(self, type_id):
+        pass
@@ -0,0 +1 @@
+"""Stand-in for maya.api, see maya.api.OpenMaya."""
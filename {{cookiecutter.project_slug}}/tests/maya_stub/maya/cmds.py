@@ -0,0 +1,157 @@
+"""Stand-in for maya.cmds on a small in-memory scene of named nodes.
+
+Scenes are saved as JSON, whatever the file type. Plugins are looked up on
+MAYA_PLUG_IN_PATH like in Maya, Python plugins register their nodes and
+commands through maya.api.OpenMaya.
+"""
+from pathlib import Path
+import ctypes
+import json
+import os
+import runpy
+
+_scene = {}
+_selection = []
+_file = {"name": "", "modified": False}
+
+
+def file(*args, new=False, force=False, query=False, q=False, sceneName=False, sn=False, modified=None,
+         rename=None, save=False, open=False, type=None, **kwargs):
+    if query or q:
+        if sceneName or sn:
+            return _file["name"]
+        if modified:
+            return _file["modified"]
+        return _file["name"] or "untitled"
+    if new or open:
+        if _file["modified"] and not force:
+            raise RuntimeError("Unsaved changes.")
+        _scene.clear()
+        _selection.clear()
+        _file.update(name="", modified=False)
+        if open:
+            _scene.update(json.loads(Path(args[0]).read_text(encoding="utf-8")))
+            _file["name"] = Path(args[0]).as_posix()
+        return _file["name"] or "untitled"
+    if rename:
+        _file["name"] = Path(rename).as_posix()
+        return _file["name"]
+    if save:
+        Path(_file["name"]).write_text(json.dumps(_scene), encoding="utf-8")
+        _file["modified"] = False
+        return _file["name"]
+    if modified is not None:
+        _file["modified"] = bool(modified)
+        return None
+    raise NotImplementedError("The maya stub does not support these file flags.")
+
+
+def createNode(node_type, name=None, **kwargs):
+    base = name or f"{node_type}1"
+    node = base
+    index = 1
+    while node in _scene:
+        index += 1
+        node = f"{base.rstrip('0123456789')}{index}"
+    _scene[node] = node_type
+    _file["modified"] = True
+    return node
+
+
+def objExists(node):
+    return node in _scene
+
+
+def nodeType(node):
+    return _scene[node]
+
+
+def ls(*nodes, type=None, selection=False, sl=False, **kwargs):
+    names = list(_selection) if selection or sl else list(nodes) or list(_scene)
+    return [node for node in names if node in _scene and (type is None or _scene[node] == type)]
+
+
+def delete(*nodes):
+    for node in nodes:
+        if _scene.pop(node, None) is not None:
+            _file["modified"] = True
+        if node in _selection:
+            _selection.remove(node)
+
+
+def select(*nodes, clear=False, add=False, **kwargs):
+    if clear or not add:
+        _selection.clear()
+    _selection.extend(node for node in nodes if node in _scene and node not in _selection)
+
+
+_plugins = {}
+# the plugin being loaded, and the nodes and commands maya.api.OpenMaya.MFnPlugin registered by plugin name
+_loading = []
+_registered = {}
+_PLUGIN_EXTENSIONS = (".so", ".mll", ".bundle", ".py")
+
+
+def _find_plugin(plugin):
+    path = Path(plugin)
+    if path.is_file():
+        return path
+    for folder in os.environ.get("MAYA_PLUG_IN_PATH", "").split(os.pathsep):
+        for extension in ("",) + _PLUGIN_EXTENSIONS:
+            candidate = Path(folder) / f"{plugin}{extension}"
+            if folder and candidate.is_file():
+                return candidate
+    raise RuntimeError(f"Plug-in, \"{plugin}\", was not found on MAYA_PLUG_IN_PATH.")
+
+
+def loadPlugin(*plugins, quiet=False, **kwargs):
+    """Load binaries with ctypes and run initializePlugin of Python plugins.
+
+    Binaries which need Maya's own libraries can not be loaded without Maya,
+    they are read into memory instead.
+    """
+    loaded = []
+    for plugin in plugins:
+        path = _find_plugin(plugin)
+        name = path.stem
+        if name in _plugins:
+            continue
+        if path.suffix == ".py":
+            module = runpy.run_path(str(path))
+            if "initializePlugin" in module:
+                _loading.append(name)
+                try:
+                    module["initializePlugin"](None)
+                finally:
+                    _loading.pop()
+            _plugins[name] = (path, module)
+        else:
+            try:
+                _plugins[name] = (path, ctypes.CDLL(str(path)))
+            except OSError:
+                _plugins[name] = (path, path.read_bytes())
+        loaded.append(name)
+    return loaded
+
+
+def unloadPlugin(*plugins, **kwargs):
+    for plugin in plugins:
+        path, module = _plugins.pop(Path(plugin).stem)
+        if isinstance(module, dict) and "uninitializePlugin" in module:
+            module["uninitializePlugin"](None)
+        _registered.pop(Path(plugin).stem, None)
+
+
+def pluginInfo(plugin=None, query=False, q=False, listPlugins=False, loaded=False, path=False, dependNode=False,
+               command=False, **kwargs):
+    if listPlugins:
+        return list(_plugins)
+    name = Path(plugin).stem
+    if loaded:
+        return name in _plugins
+    if path:
+        return _plugins[name][0].as_posix()
+    if dependNode or command:
+        # Maya returns None when the plugin registered nothing
+        return _registered.get(name, {}).get("dependNode" if dependNode else "command") or None
+    raise NotImplementedError("The maya stub does not support these pluginInfo flags.")
@@ -0,0 +1,22 @@
+"""Stand-in for maya.standalone.
+
+Set MAYA_STUB_INIT_SECONDS to make initialize() as slow as a real Maya
+standalone startup.
+"""
+import os
+import time
+
+_initialized = False
+
+
+def initialize(name="python"):
+    global _initialized
+    if _initialized:
+        raise RuntimeError("maya.standalone is already initialized.")
+    time.sleep(float(os.environ.get("MAYA_STUB_INIT_SECONDS", "0")))
+    _initialized = True
+
+
+def uninitialize():
+    global _initialized
+    _initialized = False
@@ -0,0 +1,71 @@
+"""Pytest configuration for the tests of the package script.
+
+They run without Maya, with any Python 3: the Maya fixtures of
+tests/conftest.py are replaced with ones doing nothing.
+"""
+from pathlib import Path
+import itertools
+import sys
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+STUB_MAYA_PATH = REPO_ROOT / "tests" / "maya_stub"
+# the package script, and the synthetic projects of the benchmarks
+for path in (REPO_ROOT, REPO_ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from package import package as package_script  # noqa: E402
+from package.project import Project  # noqa: E402
+
+import synthetic  # noqa: E402
+
+
+@pytest.fixture(scope='session', autouse=True)
+def initialize():
+    """The package script does not need a Maya session."""
+    yield
+
+
+@pytest.fixture(scope="function", autouse=True)
+def new_scene():
+    """There is no scene to reset."""
+    yield
+
+
+@pytest.fixture
+def maya_stub(monkeypatch):
+    """Import the stub maya package of tests/maya_stub afresh and return its maya.cmds, on a new scene."""
+    monkeypatch.syspath_prepend(str(STUB_MAYA_PATH))
+    for name in [name for name in sys.modules if name == "maya" or name.startswith("maya.")]:
+        monkeypatch.delitem(sys.modules, name)
+    from maya import cmds
+    return cmds
+
+
+@pytest.fixture
+def make_project(tmp_path, monkeypatch):
+    """Return a function creating a synthetic project and pointing the package script at it.
+
+    Devkit validation is skipped. The function returns the project and a
+    `build(names)` function which writes build trees with the binaries of the
+    named plugins, which build_versions then returns instead of building.
+    """
+    def _make_project(cpp_plugin_count=3, versions=("2024", "2025"), **kwargs):
+        root = synthetic.create_project(tmp_path / "project", cpp_plugin_count, versions, **kwargs)
+        project = Project(root)
+        extension = package_script.PLUGIN_EXTENSIONS[package_script.OS]
+        build_dirs = {}
+        builds = itertools.count()
+
+        def _build(names):
+            build_root = tmp_path / "build" / str(next(builds))
+            for version in versions:
+                build_dirs[version] = synthetic.create_build_tree(build_root / version, names, extension)
+            return build_dirs
+
+        synthetic.use_project(package_script, project, build_dirs, tmp_path / "home", monkeypatch)
+        _build(project.cpp_plugin_names)
+        return project, _build
+    return _make_project
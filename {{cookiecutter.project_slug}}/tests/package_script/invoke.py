@@ -0,0 +1,6 @@
+import re
+import sys
+from pytest import main
+if __name__ == '__main__':
+    sys.argv[0] = re.sub(r'(-script\.pyw|\.exe)?$', '', sys.argv[0])
+    sys.exit(main(["./tests/package_script"] + sys.argv[1:]))
\ No newline at end of file
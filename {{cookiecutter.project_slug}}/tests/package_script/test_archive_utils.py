@@ -0,0 +1,136 @@
+"""Tests for the devkit archive extraction: path traversal guard and slim devkit filter."""
+import io
+import stat
+import tarfile
+import zipfile
+
+import pytest
+
+from package import archive_utils
+
+
+@pytest.mark.parametrize("name, safe", [
+    ("devkitBase/include/maya/MFnPlugin.h", True),
+    ("./devkitBase/lib/OpenMaya.lib", True),
+    ("devkitBase/../../evil.txt", False),
+    ("../evil.txt", False),
+    ("/etc/passwd", False),
+    ("C:/Windows/evil.dll", False),
+    ("devkitBase\\..\\..\\evil.txt", False),
+    ("", False),
+])
+def test_is_safe_member(name, safe):
+    assert archive_utils._is_safe_member(name) is safe
+
+
+@pytest.mark.parametrize("name, needed", [
+    ("devkitBase/include/maya/MFnPlugin.h", True),
+    ("devkitBase/lib/OpenMaya.lib", True),
+    ("devkitBase/cmake/pluginEntry.cmake", True),
+    ("devkitBase/devkit/cmake/modules/FindMaya.cmake", True),
+    ("devkitBase/devkit/plug-ins/CMakeLists.txt", True),
+    ("devkitBase\\include\\maya\\MObject.h", True),
+    ("devkitBase/", True),
+    ("devkitBase/devkit/plug-ins/helixCmd/helixCmd.cpp", False),
+    ("devkitBase/docs/index.html", False),
+    ("devkitBase/mkspecs/qt.conf", False),
+])
+def test_is_devkit_build_member(name, needed):
+    assert archive_utils.is_devkit_build_member(name) is needed
+
+
+def _tar_gz(members):
+    """Return a gzip compressed tar archive of (name, content or ("symlink", target) or "fifo") members."""
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode="w:gz") as archive:
+        for name, content in members:
+            info = tarfile.TarInfo(name)
+            if content == "fifo":
+                info.type = tarfile.FIFOTYPE
+                archive.addfile(info)
+            elif isinstance(content, tuple):
+                info.type = tarfile.SYMTYPE
+                info.linkname = content[1]
+                archive.addfile(info)
+            else:
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+    data.seek(0)
+    return data
+
+
+def _extracted(root):
+    return sorted(path.relative_to(root).as_posix() for path in root.rglob("*") if not path.is_dir())
+
+
+def test_tar_stream_skips_members_escaping_the_destination(tmp_path):
+    archive = _tar_gz([
+        ("devkitBase/include/maya/MFnPlugin.h", b"header"),
+        ("devkitBase/lib/libOpenMaya.so.1", b"library"),
+        ("devkitBase/lib/libOpenMaya.so", ("symlink", "libOpenMaya.so.1")),
+        ("../evil.txt", b"evil"),
+        ("/tmp/absolute.txt", b"evil"),
+        ("devkitBase/lib/escape", ("symlink", "../../../outside")),
+        ("devkitBase/lib/absolute", ("symlink", "/etc/passwd")),
+        ("devkitBase/lib/pipe", "fifo"),
+    ])
+    destination = tmp_path / "devkit"
+    stats = archive_utils.extract_tar_stream(archive, destination)
+
+    assert _extracted(destination) == ["devkitBase/include/maya/MFnPlugin.h", "devkitBase/lib/libOpenMaya.so",
+                                       "devkitBase/lib/libOpenMaya.so.1"]
+    link = destination / "devkitBase/lib/libOpenMaya.so"
+    assert link.is_symlink() and link.read_bytes() == b"library"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["devkit"]
+    assert (stats.files, stats.bytes, stats.skipped) == (2, 13, 5)
+    assert stats.compressed_bytes == len(archive.getvalue())
+
+
+def test_tar_stream_applies_the_slim_devkit_filter(tmp_path):
+    archive = _tar_gz([
+        ("devkitBase/include/maya/MFnPlugin.h", b"header"),
+        ("devkitBase/lib/OpenMaya.so", b"library"),
+        ("devkitBase/cmake/pluginEntry.cmake", b"cmake"),
+        ("devkitBase/devkit/plug-ins/helixCmd/helixCmd.cpp", b"example"),
+        ("devkitBase/docs/index.html", b"docs"),
+    ])
+    stats = archive_utils.extract_tar_stream(archive, tmp_path, member_filter=archive_utils.is_devkit_build_member)
+    assert _extracted(tmp_path) == ["devkitBase/cmake/pluginEntry.cmake", "devkitBase/include/maya/MFnPlugin.h",
+                                    "devkitBase/lib/OpenMaya.so"]
+    assert (stats.files, stats.skipped) == (3, 2)
+
+
+def _zip(path, members):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in members:
+            if isinstance(content, tuple):
+                # zip stores symlinks as files with the link mode, whose content is the target
+                info = zipfile.ZipInfo(name)
+                info.external_attr = (stat.S_IFLNK | 0o777) << 16
+                archive.writestr(info, content[1])
+            else:
+                archive.writestr(name, content)
+    return path
+
+
+def test_zip_skips_members_escaping_the_destination(tmp_path):
+    archive_path = _zip(tmp_path / "devkit.zip", [
+        ("devkitBase/include/maya/MFnPlugin.h", b"header"),
+        ("devkitBase/lib/OpenMaya.lib", b"library"),
+        ("devkitBase/lib/escape", ("symlink", "../../../outside")),
+        ("../evil.txt", b"evil"),
+        ("/absolute.txt", b"evil"),
+        ("C:/Windows/evil.dll", b"evil"),
+        ("devkitBase\\..\\..\\evil.txt", b"evil"),
+        ("devkitBase/docs/index.html", b"docs"),
+    ])
+    destination = tmp_path / "devkit"
+    stats = archive_utils.extract_zip(archive_path, destination, member_filter=archive_utils.is_devkit_build_member)
+
+    assert _extracted(destination) == ["devkitBase/include/maya/MFnPlugin.h", "devkitBase/lib/OpenMaya.lib",
+                                       "devkitBase/lib/escape"]
+    # symlinks are never created from a zip, only a file with the target as content
+    escape = destination / "devkitBase/lib/escape"
+    assert not escape.is_symlink() and escape.read_text() == "../../../outside"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["devkit", "devkit.zip"]
+    assert (stats.files, stats.skipped) == (3, 5)
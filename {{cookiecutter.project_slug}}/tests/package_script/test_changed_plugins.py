@@ -0,0 +1,69 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from package import package as package_script
+
+
+@pytest.fixture
+def built_project(make_project):
+    """A project whose plugins were all built successfully for Maya 2025."""
+    project, _ = make_project(cpp_plugin_count=3, versions=("2025",))
+    for name in project.cpp_plugin_names:
+        (project.cpp_plugins_dir / name / f"{name}.cpp").write_text(f"// {name}\n" * 100)
+    build_dir = package_script._get_build_dir("2025", "Debug")
+    build_dir.mkdir(parents=True)
+    package_script._save_plugin_inputs(build_dir, package_script._plugin_input_hashes("2025"), project.cpp_plugin_names)
+    return project
+
+
+@pytest.fixture
+def source_reads(monkeypatch):
+    """Record the plugin source files read from now on."""
+    reads = []
+    read_bytes = Path.read_bytes
+
+    def _read_bytes(path):
+        if "cpp" in path.parts:
+            reads.append(path)
+        return read_bytes(path)
+
+    monkeypatch.setattr(Path, "read_bytes", _read_bytes)
+    return reads
+
+
+def test_unchanged_plugins_are_not_read_again(built_project, source_reads):
+    assert package_script.get_changed_plugins("2025", "Debug") == []
+    assert source_reads == []
+
+
+def test_edited_plugin_is_changed(built_project, source_reads):
+    source = built_project.cpp_plugins_dir / "plugin00001" / "plugin00001.cpp"
+    source.write_text(source.read_text() + "\n// edited\n")
+    assert package_script.get_changed_plugins("2025", "Debug") == ["plugin00001"]
+    # only the edited plugin is read
+    assert {path.relative_to(built_project.cpp_plugins_dir).parts[0] for path in source_reads} == {"plugin00001"}
+
+
+def test_touched_plugin_with_the_same_content_is_not_changed(built_project):
+    source = built_project.cpp_plugins_dir / "plugin00002" / "plugin00002.cpp"
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert package_script.get_changed_plugins("2025", "Debug") == []
+
+
+def test_root_cmakelists_change_rebuilds_every_plugin(built_project):
+    with open(built_project.root_cmakelists, "a") as cmakelists:
+        cmakelists.write("# changed\n")
+    assert package_script.get_changed_plugins("2025", "Debug") == built_project.cpp_plugin_names
+
+
+def test_recording_without_file_stats_hashes_the_sources(built_project, source_reads):
+    inputs_path = package_script._get_build_dir("2025", "Debug") / package_script.PLUGIN_INPUTS_FILE
+    inputs = json.loads(inputs_path.read_text())
+    del inputs["stats"]
+    inputs_path.write_text(json.dumps(inputs))
+    assert package_script.get_changed_plugins("2025", "Debug") == []
+    assert source_reads
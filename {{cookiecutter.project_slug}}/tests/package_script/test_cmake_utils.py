@@ -0,0 +1,77 @@
+"""Tests for the CMake File API reader, on hand-written reply trees."""
+import json
+
+import pytest
+
+from package import cmake_utils
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+@pytest.fixture
+def build_dir(tmp_path):
+    """A multi-config build tree with a module, a shared library and an executable, for Debug and Release."""
+    build_dir = tmp_path / "build"
+    reply_dir = build_dir / cmake_utils.REPLY_DIR
+    configurations = []
+    for config in ("Debug", "Release"):
+        targets = [
+            ("deformer", "MODULE_LIBRARY", [f"src/plugins/cpp/deformer/{config}/deformer.so"]),
+            ("shared", "SHARED_LIBRARY", [f"bin/{config}/shared.so", f"lib/{config}/shared.a"]),
+            ("tool", "EXECUTABLE", [f"bin/{config}/tool.so"]),
+            ("absolute", "MODULE_LIBRARY", [str(tmp_path / "elsewhere" / config / "absolute.so")]),
+            ("headers", "INTERFACE_LIBRARY", []),
+        ]
+        target_files = []
+        for name, target_type, artifacts in targets:
+            target_file = f"target-{name}-{config}-0123456789abcdef.json"
+            target_data = {"name": name, "type": target_type}
+            if artifacts:
+                target_data["artifacts"] = [{"path": path} for path in artifacts]
+            _write(reply_dir / target_file, target_data)
+            target_files.append({"name": name, "jsonFile": target_file})
+        configurations.append({"name": config, "targets": target_files})
+    _write(reply_dir / "codemodel-v2-new.json", {"configurations": configurations})
+    # a reply of an earlier configure, the latest index is the one which sorts last
+    _write(reply_dir / "codemodel-v2-old.json", {"configurations": [{"name": "Release", "targets": []}]})
+    _write(reply_dir / "index-2024-01-01T00-00-00-0000.json",
+           {"reply": {"codemodel-v2": {"jsonFile": "codemodel-v2-old.json"}}})
+    _write(reply_dir / "index-2025-06-01T12-00-00-0000.json",
+           {"reply": {"codemodel-v2": {"jsonFile": "codemodel-v2-new.json"}}})
+    return build_dir
+
+
+def test_library_artifacts_of_the_build_type(build_dir, tmp_path):
+    assert cmake_utils.has_codemodel_reply(build_dir)
+    assert cmake_utils.get_library_artifacts(build_dir, "Release", ".so") == {
+        "deformer": build_dir / "src/plugins/cpp/deformer/Release/deformer.so",
+        "shared": build_dir / "bin/Release/shared.so",
+        "absolute": tmp_path / "elsewhere" / "Release" / "absolute.so",
+    }
+    assert cmake_utils.get_library_artifacts(build_dir, "Debug", ".so")["deformer"] == \
+        build_dir / "src/plugins/cpp/deformer/Debug/deformer.so"
+
+
+def test_only_artifacts_with_the_extension_are_returned(build_dir):
+    assert cmake_utils.get_library_artifacts(build_dir, "Release", ".a") == {
+        "shared": build_dir / "lib/Release/shared.a"}
+    assert cmake_utils.get_library_artifacts(build_dir, "Release", ".mll") == {}
+
+
+def test_unknown_build_type_uses_the_first_configuration(build_dir):
+    assert cmake_utils.get_library_artifacts(build_dir, "RelWithDebInfo", ".so")["deformer"] == \
+        build_dir / "src/plugins/cpp/deformer/Debug/deformer.so"
+
+
+def test_without_reply_nothing_is_returned(tmp_path):
+    build_dir = tmp_path / "build"
+    cmake_utils.request_codemodel(build_dir)
+    assert (build_dir / cmake_utils.CODEMODEL_QUERY).is_file()
+    assert not cmake_utils.has_codemodel_reply(build_dir)
+    assert cmake_utils.get_library_artifacts(build_dir, "Release", ".so") == {}
+    # a reply folder without an index is not a reply either
+    (build_dir / cmake_utils.REPLY_DIR).mkdir(parents=True)
+    assert cmake_utils.get_library_artifacts(build_dir, "Release", ".so") == {}
@@ -0,0 +1,125 @@
+"""Tests for the build daemon: client environment, source change restarts and devkit validation cache."""
+from pathlib import Path
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from package import daemon_utils
+from package import package as package_script
+
+# run with the package folder, the socket path and the source folder as arguments
+DAEMON_SCRIPT = """
+import os
+import sys
+sys.path.insert(0, sys.argv[1])
+import daemon_utils
+
+def handler(request):
+    sys.stdout.write("value=" + str(os.environ.get("DAEMON_TEST_VALUE")) + "\\n")
+    return 3
+
+daemon_utils.serve(sys.argv[2], handler, source_dir=sys.argv[3], restart_argv=sys.argv)
+"""
+
+
+def _wait_for_daemon(socket_path, process, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert process.poll() is None, process.stdout.read()
+        if daemon_utils.send_request(socket_path, {"ping": True}, output=None) == 0:
+            return
+        time.sleep(0.05)
+    raise TimeoutError(f"The daemon did not listen on {socket_path}.")
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """Run a daemon with an echo handler in a subprocess, return its socket path and source folder."""
+    if not daemon_utils.is_supported():
+        pytest.skip("The build daemon needs Unix sockets.")
+    source_dir = tmp_path / "sources"
+    source_dir.mkdir()
+    (source_dir / "module.py").write_text("", encoding="utf-8")
+    # Unix socket paths are limited to ~100 bytes, tmp_path can be longer
+    socket_path = Path(tempfile.mkdtemp()) / "daemon.sock"
+    script = tmp_path / "daemon.py"
+    script.write_text(DAEMON_SCRIPT, encoding="utf-8")
+    process = subprocess.Popen([sys.executable, str(script), str(Path(daemon_utils.__file__).parent),
+                                str(socket_path), str(source_dir)],
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        _wait_for_daemon(socket_path, process)
+        yield socket_path, source_dir, process
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        socket_path.unlink(missing_ok=True)
+        socket_path.parent.rmdir()
+
+
+def _request(socket_path, env):
+    output = io.StringIO()
+    exit_code = daemon_utils.send_request(socket_path, {"argv": ["--build"], "cwd": os.getcwd(), "env": env},
+                                          output=output)
+    return exit_code, output.getvalue()
+
+
+def test_environment_replaces_and_restores(monkeypatch):
+    monkeypatch.setenv("DAEMON_TEST_KEPT", "daemon")
+    with daemon_utils._environment({"DAEMON_TEST_VALUE": "client"}):
+        assert os.environ.get("DAEMON_TEST_VALUE") == "client"
+        assert "DAEMON_TEST_KEPT" not in os.environ
+    assert "DAEMON_TEST_VALUE" not in os.environ
+    assert os.environ["DAEMON_TEST_KEPT"] == "daemon"
+
+
+def test_environment_none_keeps_the_daemon_environment(monkeypatch):
+    monkeypatch.setenv("DAEMON_TEST_KEPT", "daemon")
+    with daemon_utils._environment(None):
+        assert os.environ["DAEMON_TEST_KEPT"] == "daemon"
+
+
+def test_request_runs_with_the_client_environment(daemon):
+    socket_path, _, _ = daemon
+    for value in ("first", "second"):
+        exit_code, output = _request(socket_path, {"DAEMON_TEST_VALUE": value})
+        # the previous request may still be finishing, which the daemon reports first
+        assert (exit_code, output.splitlines()[-1]) == (3, f"value={value}")
+
+
+def test_changed_sources_restart_the_daemon(daemon):
+    socket_path, source_dir, process = daemon
+    assert _request(socket_path, {"DAEMON_TEST_VALUE": "old"})[0] == 3
+    module = source_dir / "module.py"
+    stat = module.stat()
+    os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    exit_code, output = _request(socket_path, {"DAEMON_TEST_VALUE": "changed"})
+    assert exit_code is None
+    assert "restarting" in output
+
+    # the same process comes back with the new sources and serves again
+    _wait_for_daemon(socket_path, process)
+    exit_code, output = _request(socket_path, {"DAEMON_TEST_VALUE": "new"})
+    assert (exit_code, output.splitlines()[-1]) == (3, "value=new")
+
+
+def test_daemon_validates_each_devkit_once(make_project, monkeypatch, capsys):
+    make_project(versions=("2025",))
+    devkit = package_script._get_devkit_path("2025")
+    devkit.mkdir(parents=True)
+    monkeypatch.setattr(package_script, "_VALIDATED_DEVKITS", {})
+
+    package_script._validate_local_devkits("2025")
+    package_script._validate_local_devkits("2025")
+    assert capsys.readouterr().out.count("Devkit for Maya 2025 found") == 1
+
+    # a replaced devkit is validated again
+    os.utime(devkit, ns=(0, devkit.stat().st_mtime_ns + 1_000_000_000))
+    package_script._validate_local_devkits("2025")
+    assert capsys.readouterr().out.count("Devkit for Maya 2025 found") == 1
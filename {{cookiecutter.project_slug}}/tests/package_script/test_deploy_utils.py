@@ -0,0 +1,79 @@
+import os
+
+from package import deploy_utils
+
+
+def _sources(folder, **contents):
+    folder.mkdir(exist_ok=True)
+    sources = {}
+    for name, content in contents.items():
+        sources[f"{name}.so"] = folder / f"{name}.so"
+        sources[f"{name}.so"].write_bytes(content)
+    return sources
+
+
+def test_only_new_and_changed_files_are_copied(tmp_path):
+    target_dir = tmp_path / "deploy"
+    sources = _sources(tmp_path / "build", pluginA=b"a" * 100, pluginB=b"b" * 100)
+    result = deploy_utils.sync_files(sources, target_dir)
+    assert result == {"copied": ["pluginA.so", "pluginB.so"], "unchanged": [], "pruned": []}
+    assert (target_dir / "pluginA.so").read_bytes() == b"a" * 100
+
+    sources["pluginB.so"].write_bytes(b"B" * 100)
+    result = deploy_utils.sync_files(sources, target_dir)
+    assert result == {"copied": ["pluginB.so"], "unchanged": ["pluginA.so"], "pruned": []}
+    assert (target_dir / "pluginB.so").read_bytes() == b"B" * 100
+    assert not list(target_dir.glob(".*.tmp"))
+
+
+def test_touched_file_with_the_same_content_is_not_copied(tmp_path):
+    target_dir = tmp_path / "deploy"
+    sources = _sources(tmp_path / "build", pluginA=b"a" * 100)
+    deploy_utils.sync_files(sources, target_dir)
+    stat = sources["pluginA.so"].stat()
+    os.utime(sources["pluginA.so"], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert deploy_utils.sync_files(sources, target_dir)["unchanged"] == ["pluginA.so"]
+    # the new time is recorded, the next sync does not hash it again
+    assert deploy_utils.load_manifest(target_dir)["pluginA.so"]["mtime_ns"] == stat.st_mtime_ns + 10 ** 9
+
+
+def test_modified_deployed_file_is_copied_again(tmp_path):
+    target_dir = tmp_path / "deploy"
+    sources = _sources(tmp_path / "build", pluginA=b"a" * 100)
+    deploy_utils.sync_files(sources, target_dir)
+    (target_dir / "pluginA.so").write_bytes(b"broken")
+    assert deploy_utils.sync_files(sources, target_dir)["copied"] == ["pluginA.so"]
+    assert (target_dir / "pluginA.so").read_bytes() == b"a" * 100
+
+
+def test_stale_file_is_pruned_from_the_manifest(tmp_path):
+    target_dir = tmp_path / "deploy"
+    sources = _sources(tmp_path / "build", pluginA=b"a", pluginB=b"b")
+    deploy_utils.sync_files(sources, target_dir)
+    (target_dir / "user_file.txt").write_text("not deployed through the manifest")
+
+    del sources["pluginB.so"]
+    result = deploy_utils.sync_files(sources, target_dir)
+    assert result["pruned"] == ["pluginB.so"]
+    assert not (target_dir / "pluginB.so").exists()
+    assert set(deploy_utils.load_manifest(target_dir)) == {"pluginA.so"}
+    assert (target_dir / "user_file.txt").is_file()
+
+
+def test_only_managed_names_are_pruned(tmp_path):
+    target_dir = tmp_path / "deploy"
+    sources = _sources(tmp_path / "build", pluginA=b"a", pluginB=b"b")
+    deploy_utils.sync_files(sources, target_dir)
+    # deploying pluginA alone leaves pluginB in place
+    result = deploy_utils.sync_files({"pluginA.so": sources["pluginA.so"]}, target_dir, managed_names=["pluginA.so"])
+    assert result["pruned"] == []
+    assert (target_dir / "pluginB.so").is_file()
+    assert set(deploy_utils.load_manifest(target_dir)) == {"pluginA.so", "pluginB.so"}
+
+
+def test_broken_manifest_deploys_everything_again(tmp_path):
+    target_dir = tmp_path / "deploy"
+    sources = _sources(tmp_path / "build", pluginA=b"a")
+    deploy_utils.sync_files(sources, target_dir)
+    (target_dir / deploy_utils.MANIFEST_NAME).write_text("{not json")
+    assert deploy_utils.sync_files(sources, target_dir)["copied"] == ["pluginA.so"]
@@ -0,0 +1,125 @@
+import hashlib
+import http.server
+import threading
+
+import pytest
+
+from package import download_utils
+
+DATA = bytes(range(256)) * 4096
+DATA_SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Serve the server's data with HTTP Range support, truncating the response when asked to."""
+
+    def do_GET(self):
+        server = self.server
+        range_header = self.headers.get("Range")
+        server.ranges.append(range_header)
+        start = 0
+        if range_header and server.support_ranges:
+            start = int(range_header.split("=", 1)[1].rstrip("-"))
+            if start >= len(server.data):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(server.data) - 1}/{len(server.data)}")
+        else:
+            self.send_response(200)
+        body = server.data[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if server.truncate_next:
+            # the connection drops halfway through
+            server.truncate_next = False
+            body = body[:len(body) // 2]
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """An HTTP server on a free local port serving DATA at /devkit.tgz."""
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.data = DATA
+    httpd.ranges = []
+    httpd.support_ranges = True
+    httpd.truncate_next = False
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/devkit.tgz"
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+def test_download_verifies_and_moves_the_file(server, tmp_path):
+    dest_path = tmp_path / "devkit.tgz"
+    assert download_utils.download(server.url, dest_path, expected_sha256=DATA_SHA256.upper()) == DATA_SHA256
+    assert dest_path.read_bytes() == DATA
+    assert not (tmp_path / "devkit.tgz.part").exists()
+
+
+def test_interrupted_download_resumes_from_the_partial_file(server, tmp_path):
+    dest_path = tmp_path / "devkit.tgz"
+    server.truncate_next = True
+    with pytest.raises(OSError, match="interrupted"):
+        download_utils.download(server.url, dest_path, expected_sha256=DATA_SHA256)
+    part_size = (tmp_path / "devkit.tgz.part").stat().st_size
+    assert 0 < part_size < len(DATA)
+    assert not dest_path.exists()
+
+    assert download_utils.download(server.url, dest_path, expected_sha256=DATA_SHA256) == DATA_SHA256
+    assert server.ranges == [None, f"bytes={part_size}-"]
+    assert dest_path.read_bytes() == DATA
+
+
+def test_complete_partial_file_is_not_downloaded_again(server, tmp_path):
+    (tmp_path / "devkit.tgz.part").write_bytes(DATA)
+    assert download_utils.download(server.url, tmp_path / "devkit.tgz", expected_sha256=DATA_SHA256) == DATA_SHA256
+    # the server answered 416, the range is beyond the file
+    assert server.ranges == [f"bytes={len(DATA)}-"]
+    assert (tmp_path / "devkit.tgz").read_bytes() == DATA
+
+
+def test_download_restarts_when_the_server_ignores_the_range(server, tmp_path):
+    server.support_ranges = False
+    (tmp_path / "devkit.tgz.part").write_bytes(DATA[:1000])
+    assert download_utils.download(server.url, tmp_path / "devkit.tgz") == DATA_SHA256
+    assert (tmp_path / "devkit.tgz").read_bytes() == DATA
+
+
+def test_checksum_mismatch_deletes_the_partial_file(server, tmp_path):
+    dest_path = tmp_path / "devkit.tgz"
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        download_utils.download(server.url, dest_path, expected_sha256="0" * 64)
+    assert not dest_path.exists()
+    assert not (tmp_path / "devkit.tgz.part").exists()
+
+
+def test_stream_consumer_reads_a_fresh_download(server, tmp_path):
+    consumed = []
+    download_utils.download(server.url, tmp_path / "devkit.tgz",
+                            stream_consumer=lambda reader: consumed.append(reader.read(100)))
+    assert consumed == [DATA[:100]]
+    assert (tmp_path / "devkit.tgz").read_bytes() == DATA
+
+
+def test_fetch_uses_the_verified_cache(server, tmp_path):
+    cache_dir = tmp_path / "cache"
+    path, digest = download_utils.fetch(server.url, expected_sha256=DATA_SHA256, cache_dir=cache_dir)
+    assert digest == DATA_SHA256
+    assert path == download_utils.get_cache_path(server.url, cache_dir)
+    assert download_utils.fetch(server.url, expected_sha256=DATA_SHA256, cache_dir=cache_dir) == (path, DATA_SHA256)
+    assert len(server.ranges) == 1
+
+    # another checksum is not satisfied by the cached copy
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        download_utils.fetch(server.url, expected_sha256="1" * 64, cache_dir=cache_dir)
+    assert len(server.ranges) == 2
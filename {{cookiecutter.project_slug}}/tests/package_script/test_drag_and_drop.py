@@ -0,0 +1,59 @@
+"""Tests for the incremental module install of package/dragAndDropMe.py."""
+import os
+
+import pytest
+
+from package import dragAndDropMe
+
+
+@pytest.fixture
+def module(tmp_path):
+    """Return a packaged module with plugins for two Maya versions, and the folder it installs into."""
+    source = tmp_path / "package" / "modules" / "project"
+    for plugin_folder in ("linux-2024", "linux-2025"):
+        (source / "plugins" / plugin_folder).mkdir(parents=True)
+        (source / "plugins" / plugin_folder / "plugin.so").write_bytes(plugin_folder.encode())
+    (source / "scripts").mkdir()
+    (source / "scripts" / "tool.py").write_text("print('tool')\n", encoding="utf-8")
+    return source, tmp_path / "maya" / "modules" / "project"
+
+
+def _stats():
+    return {"copied": 0, "copied_bytes": 0, "unchanged": 0}
+
+
+def test_install_skips_unchanged_files(module):
+    source, destination = module
+    stats = _stats()
+    assert dragAndDropMe._install_module(source, destination, "linux-2025", stats) == ["linux-2025"]
+    assert (stats["copied"], stats["unchanged"]) == (2, 0)
+    assert not (destination / "plugins" / "linux-2024").exists()
+
+    (source / "scripts" / "tool.py").write_text("print('changed')\n", encoding="utf-8")
+    stats = _stats()
+    dragAndDropMe._install_module(source, destination, "linux-2025", stats)
+    assert (stats["copied"], stats["unchanged"]) == (1, 1)
+    assert (destination / "scripts" / "tool.py").read_text(encoding="utf-8") == "print('changed')\n"
+    assert [path.name for path in destination.parent.iterdir()] == ["project"]
+
+
+def test_module_in_use_keeps_the_current_install(module, monkeypatch):
+    source, destination = module
+    dragAndDropMe._install_module(source, destination, "linux-2025", _stats())
+    (source / "scripts" / "tool.py").write_text("print('changed')\n", encoding="utf-8")
+    rename = os.rename
+
+    def _locked_rename(src, dst):
+        # Windows refuses to rename the folder of loaded plugins
+        if src == destination:
+            raise PermissionError(13, "Access is denied", str(src))
+        rename(src, dst)
+
+    monkeypatch.setattr(dragAndDropMe.os, "rename", _locked_rename)
+    with pytest.raises(dragAndDropMe.ModuleInUseError, match="is in use"):
+        dragAndDropMe._install_module(source, destination, "linux-2025", _stats())
+
+    assert (destination / "scripts" / "tool.py").read_text(encoding="utf-8") == "print('tool')\n"
+    assert (destination / "plugins" / "linux-2025" / "plugin.so").read_bytes() == b"linux-2025"
+    # the staging folder is removed, the next install starts clean
+    assert [path.name for path in destination.parent.iterdir()] == ["project"]
@@ -0,0 +1,217 @@
+"""Tests for the test impact analysis of tests/impact.py, run against the stub maya package."""
+from pathlib import Path
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+import pytest
+
+import impact
+
+TESTS = """
+    import os
+    from maya import cmds
+
+
+    def test_python_plugin():
+        cmds.loadPlugin(os.environ["IMPACT_PYTHON_PLUGIN"])
+
+
+    def test_binary_plugin():
+        cmds.loadPlugin(os.environ["IMPACT_BINARY_PLUGIN"])
+
+
+    def test_without_plugins():
+        pass
+"""
+
+NEW_TEST = """
+
+    def test_new():
+        pass
+"""
+
+PYTHON_PLUGIN = """
+def initializePlugin(mobject):
+    return "initialized"
+"""
+
+
+# --------------------------------------------------
+# affected_tests
+# --------------------------------------------------
+
+def _recording(**kwargs):
+    recording = {
+        "format": impact.IMPACT_FORMAT,
+        "import_files": ["src/tools/registry.py"],
+        "source_files": {"src/tools/registry.py": "r", "src/tools/rig.py": "a", "src/plugins/cpp/deformer/deformer.cpp": "c"},
+        "test_files": {"tests/conftest.py": "c", "tests/unit/test_rig.py": "t"},
+        "plugins": {},
+        "tests": {
+            "tests/unit/test_rig.py::test_rig": {"files": ["src/tools/rig.py"], "plugins": []},
+            "tests/unit/test_rig.py::test_deformer": {"files": [], "plugins": ["deformer"]},
+            "tests/unit/test_rig.py::test_nothing": {"files": [], "plugins": []},
+        },
+    }
+    recording.update(kwargs)
+    return recording
+
+
+TEST_IDS = ["tests/unit/test_rig.py::test_rig", "tests/unit/test_rig.py::test_deformer",
+            "tests/unit/test_rig.py::test_nothing"]
+
+
+def _affected(recording, source_changes=None, test_changes=None, test_ids=TEST_IDS):
+    source_hashes = dict(recording["source_files"], **(source_changes or {}))
+    test_hashes = dict(recording["test_files"], **(test_changes or {}))
+    return impact.affected_tests(recording, test_ids, source_hashes, test_hashes)
+
+
+def test_nothing_changed_affects_nothing():
+    assert _affected(_recording()) == (set(), None)
+
+
+def test_changed_source_affects_the_tests_executing_it():
+    assert _affected(_recording(), {"src/tools/rig.py": "changed"}) == ({TEST_IDS[0]}, None)
+
+
+def test_changed_plugin_source_affects_the_tests_loading_it():
+    recording = _recording(plugins={"deformer": {"path": "/missing/deformer.so", "sha256": None}})
+    assert _affected(recording, {"src/plugins/cpp/deformer/deformer.cpp": "changed"}) == ({TEST_IDS[1]}, None)
+
+
+def test_changed_binary_affects_the_tests_loading_it(tmp_path):
+    binary = tmp_path / "deformer.so"
+    binary.write_bytes(b"old")
+    recording = _recording(plugins={"deformer": {"path": str(binary), "sha256": impact._file_hash(binary)}})
+    assert _affected(recording) == (set(), None)
+    binary.write_bytes(b"new")
+    assert _affected(recording) == ({TEST_IDS[1]}, None)
+
+
+def test_new_and_changed_tests_are_affected():
+    new_test = "tests/unit/test_new.py::test_new"
+    assert _affected(_recording(), test_changes={"tests/unit/test_new.py": "n"},
+                     test_ids=TEST_IDS + [new_test]) == ({new_test}, None)
+    assert _affected(_recording(), test_changes={"tests/unit/test_rig.py": "changed"}) == (set(TEST_IDS), None)
+
+
+@pytest.mark.parametrize("source_changes, test_changes, reason", [
+    (None, {"tests/conftest.py": "changed"}, "tests/conftest.py changed"),
+    ({"src/tools/registry.py": "changed"}, None, "src/tools/registry.py changed and only ran on import"),
+])
+def test_changes_outside_of_the_tests_run_everything(source_changes, test_changes, reason):
+    assert _affected(_recording(), source_changes, test_changes) == (set(TEST_IDS), reason)
+
+
+def test_without_recording_everything_runs():
+    assert impact.affected_tests(None, TEST_IDS, {}, {}) == (set(TEST_IDS), "there is no recording of the previous run")
+
+
+def test_stale_or_missing_recordings_are_ignored(tmp_path):
+    recording_file = tmp_path / ".test_impact.json"
+    assert impact.load_recording(recording_file) is None
+    recording_file.write_text("{", encoding="utf-8")
+    assert impact.load_recording(recording_file) is None
+    recording_file.write_text(json.dumps(_recording(format=impact.IMPACT_FORMAT - 1)), encoding="utf-8")
+    assert impact.load_recording(recording_file) is None
+    recording_file.write_text(json.dumps(_recording()), encoding="utf-8")
+    assert impact.load_recording(recording_file) == _recording()
+
+
+# --------------------------------------------------
+# ImpactPlugin, recording and selecting real runs
+# --------------------------------------------------
+
+@pytest.fixture
+def impact_suite(tmp_path):
+    """Write a test module under tests/ and a Python plugin under src/, and return a function running pytest on them.
+
+    Both folders are temporary, the recording only tracks the files under tests/ and src/.
+    """
+    pytest.importorskip("coverage")
+    with tempfile.TemporaryDirectory(prefix="_impact_fixture_", dir=impact.TESTS_DIR) as suite_dir, \
+            tempfile.TemporaryDirectory(prefix="_impact_fixture_", dir=impact.SRC_DIR) as plugin_dir:
+        suite = Path(suite_dir) / "test_impact_fixture.py"
+        suite.write_text(textwrap.dedent(TESTS), encoding="utf-8")
+        python_plugin = Path(plugin_dir) / "impactPlugin.py"
+        python_plugin.write_text(PYTHON_PLUGIN, encoding="utf-8")
+        # not a loadable library, the stub reads it instead
+        binary_plugin = tmp_path / "binaryPlugin.so"
+        binary_plugin.write_bytes(b"binary")
+        recording_file = tmp_path / ".test_impact.json"
+
+        def _run(*options):
+            env = dict(os.environ, PYTHONPATH=str(impact.TESTS_DIR / "maya_stub"),
+                       IMPACT_PYTHON_PLUGIN=str(python_plugin), IMPACT_BINARY_PLUGIN=str(binary_plugin))
+            env.pop("MAYA_TEST_WORKER", None)
+            process = subprocess.run(
+                [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", "-v", suite_dir,
+                 f"--impact-file={recording_file}", *options],
+                cwd=impact.REPO_ROOT, env=env, capture_output=True, text=True, timeout=120)
+            assert process.returncode == 0, process.stdout + process.stderr
+            return sorted(re.findall(r"::(test_\w+) PASSED", process.stdout)), process.stdout
+
+        yield {"run": _run, "suite": suite, "python_plugin": python_plugin, "binary_plugin": binary_plugin,
+               "recording_file": recording_file}
+
+
+def test_recording_maps_the_tests_to_their_files_and_plugins(impact_suite):
+    passed, _ = impact_suite["run"]("--impact-record")
+    assert passed == ["test_binary_plugin", "test_python_plugin", "test_without_plugins"]
+
+    recording = impact.load_recording(impact_suite["recording_file"])
+    suite_id = impact._relative(impact_suite["suite"])
+    python_plugin = impact._relative(impact_suite["python_plugin"])
+    tests = recording["tests"]
+    assert tests[f"{suite_id}::test_python_plugin"] == {"files": [python_plugin], "plugins": ["impactPlugin"]}
+    assert tests[f"{suite_id}::test_binary_plugin"] == {"files": [], "plugins": ["binaryPlugin"]}
+    assert tests[f"{suite_id}::test_without_plugins"] == {"files": [], "plugins": []}
+    assert recording["plugins"]["binaryPlugin"]["sha256"] == impact._file_hash(impact_suite["binary_plugin"])
+    assert recording["source_files"][python_plugin] == impact._file_hash(impact_suite["python_plugin"])
+    assert suite_id in recording["test_files"]
+
+
+def test_only_the_affected_tests_run(impact_suite):
+    run = impact_suite["run"]
+    run("--impact-record")
+    passed, output = run("--impact-affected")
+    assert passed == []
+    assert "0 of 3 tests are affected by the changes since the recording." in output
+
+    impact_suite["python_plugin"].write_text(PYTHON_PLUGIN + "\n# changed\n", encoding="utf-8")
+    assert run("--impact-affected", "--impact-record")[0] == ["test_python_plugin"]
+
+    impact_suite["binary_plugin"].write_bytes(b"rebuilt binary")
+    assert run("--impact-affected", "--impact-record")[0] == ["test_binary_plugin"]
+
+    # a changed test module runs all of its tests, new ones included
+    with open(impact_suite["suite"], "a", encoding="utf-8") as suite:
+        suite.write(textwrap.dedent(NEW_TEST))
+    passed, output = run("--impact-affected", "--impact-record")
+    assert passed == ["test_binary_plugin", "test_new", "test_python_plugin", "test_without_plugins"]
+    assert "4 of 4 tests are affected" in output
+
+    # the recording kept up to date by the runs above leaves nothing to run
+    assert run("--impact-affected")[0] == []
+
+
+def test_missing_or_stale_recording_runs_every_test(impact_suite):
+    run = impact_suite["run"]
+    passed, output = run("--impact-affected")
+    assert len(passed) == 3
+    assert "Running every test, there is no recording of the previous run." in output
+
+    run("--impact-record")
+    recording_file = impact_suite["recording_file"]
+    recording = json.loads(recording_file.read_text(encoding="utf-8"))
+    recording["format"] = impact.IMPACT_FORMAT + 1
+    recording_file.write_text(json.dumps(recording), encoding="utf-8")
+    passed, output = run("--impact-affected")
+    assert len(passed) == 3
+    assert "there is no recording of the previous run" in output
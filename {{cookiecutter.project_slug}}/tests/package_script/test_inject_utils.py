@@ -0,0 +1,169 @@
+from pathlib import Path
+
+import pytest
+
+from package import inject_utils
+
+MAIN_CMAKELISTS = """cmake_minimum_required(VERSION 3.22)
+project(demo)
+
+# Plugin Subdirectories
+add_subdirectory(src/plugins/cpp/existing)
+
+install(TARGETS existing)
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Return the paths of a project with one plugin and the plugin blueprint."""
+    (tmp_path / "CMakeLists.txt").write_text(MAIN_CMAKELISTS)
+    blueprint = tmp_path / "_blueprint" / "plugin_template"
+    blueprint.mkdir(parents=True)
+    (blueprint / "CMakeLists.txt").write_text("set(PLUGIN_NAME --BLUEPRINT--PLUGIN_NAME--)\n"
+                                              "set(PLUGIN_USE_PCH --BLUEPRINT--USE_PCH--)\n"
+                                              "set(PLUGIN_UNITY_BUILD --BLUEPRINT--UNITY_BUILD--)\n")
+    (tmp_path / "src").mkdir()
+    return tmp_path / "CMakeLists.txt", blueprint, tmp_path / "src"
+
+
+def test_add_plugins_without_names_changes_nothing(project):
+    main_cmakelists, blueprint, src = project
+    inject_utils.add_plugins([], main_cmakelists, blueprint, src)
+    inject_utils.add_plugins([" ", ""], main_cmakelists, blueprint, src)
+    assert main_cmakelists.read_text() == MAIN_CMAKELISTS
+    assert not (src / "plugins").exists()
+
+
+def test_add_plugins_creates_folders_and_sorted_subdirectories(project):
+    main_cmakelists, blueprint, src = project
+    inject_utils.add_plugins(["zeta", "alpha", "alpha", "existing"], main_cmakelists, blueprint, src, use_pch=False)
+    lines = main_cmakelists.read_text().splitlines()
+    start = lines.index("# Plugin Subdirectories") + 1
+    assert lines[start:start + 3] == ["add_subdirectory(src/plugins/cpp/alpha)",
+                                      "add_subdirectory(src/plugins/cpp/existing)",
+                                      "add_subdirectory(src/plugins/cpp/zeta)"]
+    assert (src / "plugins" / "cpp" / "zeta" / "CMakeLists.txt").read_text() == (
+        "set(PLUGIN_NAME zeta)\nset(PLUGIN_USE_PCH OFF)\nset(PLUGIN_UNITY_BUILD ON)\n")
+
+
+@pytest.mark.parametrize("name", ["my plugin", "1plugin", "plugin/sub"])
+def test_add_plugins_rejects_invalid_names_before_creating_anything(project, name):
+    main_cmakelists, blueprint, src = project
+    with pytest.raises(ValueError, match="Invalid plugin names"):
+        inject_utils.add_plugins(["valid", name], main_cmakelists, blueprint, src)
+    assert main_cmakelists.read_text() == MAIN_CMAKELISTS
+    assert not (src / "plugins").exists()
+
+
+def _injector(path, content):
+    path.write_text(content)
+    injector = inject_utils.Injector(path)
+    injector.match_mode = "contains"
+    return injector
+
+
+def test_batch_writes_the_file_once_with_every_edit(tmp_path, monkeypatch):
+    path = tmp_path / "release.yml"
+    injector = _injector(path, "A[START]\nold a\nA[END]\nB[START]\nB[END]\n")
+    writes = []
+    replace = inject_utils.os.replace
+    monkeypatch.setattr(inject_utils.os, "replace", lambda *args: writes.append(args) or replace(*args))
+    with injector.batch():
+        injector.inject_between(["a\n"], "A[START]", "A[END]")
+        injector.inject_between(["b1\n", "b2\n"], "B[START]", "B[END]")
+        # sees the result of the edits before it
+        injector.replace_string("B2", "b2")
+        assert path.read_text() == "A[START]\nold a\nA[END]\nB[START]\nB[END]\n"
+    assert len(writes) == 1
+    assert path.read_text() == "A[START]\na\nA[END]\nB[START]\nb1\nB2\nB[END]\n"
+    assert sorted(item.name for item in tmp_path.iterdir()) == ["release.yml"]
+
+
+def test_batch_without_edits_does_not_write(tmp_path, monkeypatch):
+    injector = _injector(tmp_path / "CMakeLists.txt", "line\n")
+    monkeypatch.setattr(inject_utils.os, "replace", lambda *args: pytest.fail("the file was written"))
+    with injector.batch():
+        assert injector.replace_string("new", "missing", suppress_warnings=True) is False
+
+
+def test_failed_batch_writes_nothing_and_restores_the_content(tmp_path):
+    path = tmp_path / "CMakeLists.txt"
+    injector = _injector(path, "# Plugin Subdirectories\nadd_subdirectory(src/plugins/cpp/a)\n")
+    with pytest.raises(RuntimeError):
+        with injector.batch():
+            injector.inject_after(["add_subdirectory(src/plugins/cpp/b)\n"], "# Plugin Subdirectories")
+            raise RuntimeError("interrupted")
+    assert path.read_text() == "# Plugin Subdirectories\nadd_subdirectory(src/plugins/cpp/a)\n"
+    assert injector.content == ["# Plugin Subdirectories\n", "add_subdirectory(src/plugins/cpp/a)\n"]
+    # the restored content is indexed again
+    injector.inject_after(["add_subdirectory(src/plugins/cpp/c)\n"], "# Plugin Subdirectories")
+    assert path.read_text().splitlines()[1] == "add_subdirectory(src/plugins/cpp/c)"
+
+
+def test_nested_batches_write_once_at_the_outermost_exit(tmp_path):
+    path = tmp_path / "CMakeLists.txt"
+    injector = _injector(path, "x\n")
+    with injector.batch():
+        with injector.batch():
+            injector.replace_string("y", "x")
+        assert path.read_text() == "x\n"
+    assert path.read_text() == "y\n"
+
+
+def test_marker_index_finds_forward_backward_and_from_a_line():
+    index = inject_utils._MarkerIndex(["a\n", "marker 1\n", "b\n", "marker 2\n"])
+    assert index.find("marker", "contains") == 1
+    assert index.find("marker", "contains", begin_from=2) == 3
+    assert index.find("marker", "contains", begin_from=4) is None
+    assert index.find("marker", "contains", backward=True) == 3
+    assert index.find("marker 1\n", "equal") == 1
+    assert index.find("marker", "equal") is None
+
+
+def test_marker_index_splice_keeps_known_positions_current():
+    lines = ["head\n", "# marker\n", "x\n", "# marker\n", "tail\n"]
+    index = inject_utils._MarkerIndex(lines)
+    assert index.find("# marker", "contains", backward=True) == 3
+    # replace "x" with three lines, one of them a new marker
+    index.splice(2, 3, ["y\n", "# marker new\n", "z\n"])
+    assert lines == ["head\n", "# marker\n", "y\n", "# marker new\n", "z\n", "# marker\n", "tail\n"]
+    assert index.find("# marker", "contains", begin_from=2) == 3
+    assert index.find("# marker", "contains", backward=True) == 5
+    # remove the first marker
+    index.splice(1, 2, [])
+    assert index.find("# marker", "contains") == 2
+    assert index.find("tail", "contains") == 5
+
+
+def test_marker_index_matches_a_full_scan_after_random_edits():
+    import random
+    rng = random.Random(12)
+    words = ["# marker\n", "# marker 2\n", "add_subdirectory(a)\n", "other\n"]
+    lines = [rng.choice(words) for _ in range(50)]
+    index = inject_utils._MarkerIndex(lines)
+    keys = [("contains", "# marker"), ("equal", "# marker\n"), ("contains", "add_subdirectory")]
+    for _ in range(200):
+        start = rng.randrange(len(lines) + 1)
+        end = rng.randrange(start, min(len(lines), start + 3) + 1)
+        index.splice(start, end, [rng.choice(words) for _ in range(rng.randrange(4))])
+        match_mode, marker = rng.choice(keys)
+        begin_from = rng.randrange(len(lines) + 1)
+        expected = [idx for idx, line in enumerate(lines)
+                    if (line == marker if match_mode == "equal" else marker in line)]
+        forward = next((idx for idx in expected if idx >= begin_from), None)
+        assert index.find(marker, match_mode, begin_from=begin_from) == forward
+        assert index.find(marker, match_mode, backward=True) == (expected[-1] if expected else None)
+
+
+def test_injector_lookups_see_earlier_edits(tmp_path):
+    path = tmp_path / "CMakeLists.txt"
+    injector = _injector(path, "# Plugin Subdirectories\nadd_subdirectory(src/plugins/cpp/a)\n\ninstall()\n")
+    injector.inject_before(["# Extra\n"], "install()")
+    injector.inject_after(["add_subdirectory(src/plugins/cpp/b)\n"], "# Extra")
+    injector.replace_single_line("install(TARGETS a b)", "install()")
+    assert path.read_text() == ("# Plugin Subdirectories\nadd_subdirectory(src/plugins/cpp/a)\n\n# Extra\n"
+                                "add_subdirectory(src/plugins/cpp/b)\ninstall(TARGETS a b)\n")
+    # re-reading the file gives the same lookups as the spliced index
+    assert inject_utils.Injector(path).content == injector.content
+    assert injector._find_index("add_subdirectory", backward=True) == 4
@@ -0,0 +1,108 @@
+"""Tests for the plugin load profiler, run against the stub maya package instead of mayapy."""
+import sys
+
+import pytest
+
+from package import load_profile_utils
+from package import package as package_script
+
+PYTHON_PLUGIN = """
+import time
+import maya.api.OpenMaya as om
+
+
+def maya_useNewAPI():
+    pass
+
+
+class ProfiledCommand(om.MPxCommand):
+    pass
+
+
+def initializePlugin(mobject):
+    time.sleep(0.01)
+    plugin = om.MFnPlugin(mobject, "Vendor", "1.0")
+    plugin.registerCommand("profiledCommand", ProfiledCommand)
+    plugin.registerNode("profiledNode", om.MTypeId(0x0007F7F7), om.MPxNode)
+
+
+def uninitializePlugin(mobject):
+    om.MFnPlugin(mobject).deregisterCommand("profiledCommand")
+"""
+
+
+@pytest.fixture
+def plugins(tmp_path):
+    """A Python plugin registering a node and a command, and a binary which does not load without Maya."""
+    python_dir = tmp_path / "python"
+    python_dir.mkdir()
+    (python_dir / "profiledPlugin.py").write_text(PYTHON_PLUGIN, encoding="utf-8")
+    binary_dir = tmp_path / "linux-2025"
+    binary_dir.mkdir()
+    (binary_dir / "dummyPlugin.so").write_bytes(b"\0" * 4096)
+    return load_profile_utils.collect_plugins(binary_dir, python_dir)
+
+
+def test_stub_profile_measures_every_plugin(plugins):
+    results = load_profile_utils.profile_plugins(plugins, sys.executable, stub_maya=True)
+
+    python_result = results["profiledPlugin.py"]
+    assert "error" not in python_result, python_result
+    assert python_result["initialize_seconds"] >= 0.01
+    assert python_result["load_seconds"] >= python_result["initialize_seconds"]
+    assert python_result["library_seconds"] == pytest.approx(
+        python_result["load_seconds"] - python_result["initialize_seconds"])
+    assert python_result["nodes"] == ["profiledNode"]
+    assert python_result["commands"] == ["profiledCommand"]
+    assert isinstance(python_result["rss_delta_mb"], float)
+
+    binary_result = results["dummyPlugin.so"]
+    assert "error" not in binary_result, binary_result
+    # not a loadable library, so all of its load time counts as initializePlugin
+    assert binary_result["library_seconds"] is None
+    assert binary_result["initialize_seconds"] == binary_result["load_seconds"]
+    assert binary_result["nodes"] == binary_result["commands"] == []
+
+
+def test_compare_reports_regressions_over_the_tolerance(plugins):
+    results = load_profile_utils.profile_plugins(plugins, sys.executable, stub_maya=True)
+    assert load_profile_utils.compare(results, results, 10) == []
+
+    baseline = {name: dict(result) for name, result in results.items()}
+    baseline["profiledPlugin.py"]["load_seconds"] = results["profiledPlugin.py"]["load_seconds"] / 4
+    results["dummyPlugin.so"]["rss_delta_mb"] = 60.0
+    baseline["dummyPlugin.so"]["rss_delta_mb"] = 10.0
+    regressions = load_profile_utils.compare(results, baseline, 10)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("dummyPlugin.so adds")
+    assert regressions[1].startswith("profiledPlugin.py loads in")
+    # changes under the noise floors never fail, whatever the tolerance
+    baseline["profiledPlugin.py"]["load_seconds"] = results["profiledPlugin.py"]["load_seconds"] - 0.001
+    baseline["dummyPlugin.so"]["rss_delta_mb"] = 59.5
+    assert load_profile_utils.compare(results, baseline, 0) == []
+
+
+def test_failed_loads_are_reported(tmp_path):
+    plugin = tmp_path / "brokenPlugin.py"
+    plugin.write_text("raise ImportError('missing dependency')\n", encoding="utf-8")
+    result = load_profile_utils.profile_plugin(sys.executable, plugin, stub_maya=True)
+    assert result == {"error": "ImportError: missing dependency"}
+
+
+def test_first_profile_becomes_the_baseline(make_project, plugins, tmp_path, monkeypatch, capsys):
+    make_project(versions=("2025",))
+    monkeypatch.setattr(package_script, "OS", "linux")
+    baseline_file = tmp_path / "plugin_load_baseline.json"
+    monkeypatch.setattr(package_script, "PLUGIN_LOAD_BASELINE_FILE", baseline_file)
+
+    package_script.profile_deployed_plugins(tmp_path, "2025", stub_maya=True, fail_percent=10)
+    assert "Saved as the baseline of linux-2025-stub" in capsys.readouterr().out
+    saved = load_profile_utils.load_baseline(baseline_file, "linux-2025-stub")
+    assert sorted(saved) == ["dummyPlugin.so", "profiledPlugin.py"]
+
+    # the next profiles compare against it, and fail on a regression
+    saved["profiledPlugin.py"]["load_seconds"] = 0.0001
+    load_profile_utils.save_baseline(baseline_file, "linux-2025-stub", saved)
+    with pytest.raises(SystemExit, match="profiledPlugin.py loads in"):
+        package_script.profile_deployed_plugins(tmp_path, "2025", stub_maya=True, fail_percent=10)
+    assert load_profile_utils.load_baseline(baseline_file, "linux-2025-stub")["profiledPlugin.py"]["load_seconds"] == 0.0001
@@ -0,0 +1,107 @@
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import tarfile
+import zipfile
+
+import pytest
+
+from package import package as package_script
+from package import release_utils
+
+
+@pytest.fixture
+def release_files(tmp_path):
+    """Return the (archive name, path) pairs of a small release folder."""
+    root = tmp_path / "release"
+    (root / "modules" / "demo" / "plugins").mkdir(parents=True)
+    (root / "modules" / "demo.mod").write_text("+ demo 1.0 demo\n")
+    (root / "modules" / "demo" / "plugins" / "demo.so").write_bytes(os.urandom(4096) + b"\0" * 65536)
+    tool = root / "modules" / "demo" / "tools" / "run.sh"
+    tool.parent.mkdir()
+    tool.write_text("#!/bin/sh\n")
+    tool.chmod(0o755)
+    return release_utils.collect_files(root)
+
+
+def _touch_all(files, timestamp):
+    for _, path in files:
+        os.utime(path, (timestamp, timestamp))
+
+
+def test_collect_files_is_sorted_with_posix_names(release_files):
+    names = [name for name, _ in release_files]
+    assert names == sorted(names)
+    assert "modules/demo/plugins/demo.so" in names
+
+
+def test_zip_is_byte_identical_across_runs(release_files, tmp_path):
+    release_utils.write_zip(release_files, tmp_path / "first.zip", jobs=1)
+    _touch_all(release_files, 2000000000)
+    release_utils.write_zip(release_files, tmp_path / "second.zip", jobs=4)
+    assert (tmp_path / "first.zip").read_bytes() == (tmp_path / "second.zip").read_bytes()
+
+    with zipfile.ZipFile(tmp_path / "first.zip") as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [name for name, _ in release_files]
+        assert archive.read("modules/demo.mod") == b"+ demo 1.0 demo\n"
+        info = archive.getinfo("modules/demo/tools/run.sh")
+        assert info.date_time == (1980, 1, 1, 0, 0, 0)
+        assert info.external_attr >> 16 & 0o777 == 0o755
+
+
+@pytest.mark.skipif(not shutil.which("zstd"), reason="zstd is not on PATH")
+def test_tar_zst_is_byte_identical_across_runs(release_files, tmp_path):
+    assert release_utils.write_tar_zst(release_files, tmp_path / "first.tar.zst", jobs=1)
+    _touch_all(release_files, 2000000000)
+    assert release_utils.write_tar_zst(release_files, tmp_path / "second.tar.zst", jobs=2)
+    assert (tmp_path / "first.tar.zst").read_bytes() == (tmp_path / "second.tar.zst").read_bytes()
+
+    tar_data = subprocess.run(["zstd", "-d", "-c", str(tmp_path / "first.tar.zst")],
+                              stdout=subprocess.PIPE, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(tar_data)) as archive:
+        members = archive.getmembers()
+        assert [member.name for member in members] == [name for name, _ in release_files]
+        assert {(member.mtime, member.uid, member.uname) for member in members} == {(release_utils.fixed_timestamp(), 0, "")}
+        assert archive.getmember("modules/demo/tools/run.sh").mode == 0o755
+
+
+def test_tar_zst_without_zstd_is_skipped(release_files, tmp_path, monkeypatch):
+    monkeypatch.setattr(release_utils.shutil, "which", lambda name: None)
+    assert release_utils.write_tar_zst(release_files, tmp_path / "demo.tar.zst") is False
+    assert not (tmp_path / "demo.tar.zst").exists()
+
+
+def test_sha256_manifest_lists_files_and_archives(release_files, tmp_path):
+    release_utils.write_zip(release_files, tmp_path / "demo.zip")
+    release_utils.write_sha256_manifest(release_files, tmp_path / "demo.sha256", extra_files=[tmp_path / "demo.zip"])
+    lines = (tmp_path / "demo.sha256").read_text().splitlines()
+    expected = [(name, path) for name, path in release_files] + [("demo.zip", tmp_path / "demo.zip")]
+    assert lines == [f"{hashlib.sha256(path.read_bytes()).hexdigest()}  {name}" for name, path in expected]
+
+
+def test_unknown_archive_format_is_rejected():
+    with pytest.raises(ValueError, match="Unknown archive formats: rar"):
+        release_utils.check_formats(["zip", "rar"])
+
+
+def test_release_does_not_ship_binaries_of_removed_plugins(make_project):
+    project, build = make_project(cpp_plugin_count=3, versions=("2025",))
+    package_script.release(archive_formats=["zip"])
+    plugins_path = project.root / "release" / "modules" / "benchmark-project" / "plugins" / f"{package_script.OS}-2025"
+    extension = package_script.PLUGIN_EXTENSIONS[package_script.OS]
+    assert sorted(path.name for path in plugins_path.iterdir()) == [f"plugin{index:05d}{extension}" for index in range(3)]
+
+    # plugin00002 was removed, or renamed
+    build(project.cpp_plugin_names[:2])
+    (project.root / "src" / "plugins" / "python" / "python_plugin_0.py").unlink()
+    package_script.release(archive_formats=["zip"])
+    assert sorted(path.name for path in plugins_path.iterdir()) == [f"plugin{index:05d}{extension}" for index in range(2)]
+    archive_stem = f"benchmark-project-{project.version}-{package_script.OS}"
+    with zipfile.ZipFile(project.root / "dist" / f"{archive_stem}.zip") as archive:
+        names = archive.namelist()
+    assert not [name for name in names if "plugin00002" in name or name.endswith("python_plugin_0.py")]
+    manifest = (project.root / "dist" / f"{archive_stem}.sha256").read_text()
+    assert "plugin00002" not in manifest
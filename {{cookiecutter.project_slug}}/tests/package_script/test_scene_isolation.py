@@ -0,0 +1,127 @@
+"""Tests for tests/scene_isolation.py and its markers, run against the stub maya package."""
+from pathlib import Path
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+import pytest
+
+from scene_isolation import SceneIsolation
+
+TESTS_DIR = Path(__file__).resolve().parent.parent
+
+MARKER_TESTS = """
+    import pytest
+    from maya import cmds
+
+
+    @pytest.fixture(scope="module")
+    def rig_scene(scene_isolation):
+        scene_isolation.reset()
+        cmds.createNode("transform", name="rig")
+        return scene_isolation.snapshot("rig")
+
+
+    def test_starts_untitled():
+        assert cmds.ls() == []
+
+
+    def test_changes_the_scene():
+        cmds.createNode("transform")
+
+
+    def test_gets_a_new_scene():
+        assert cmds.ls() == []
+
+
+    @pytest.mark.baseline_scene("rig_scene")
+    def test_starts_from_the_snapshot():
+        assert cmds.ls() == ["rig"]
+        cmds.delete("rig")
+
+
+    @pytest.mark.baseline_scene("rig_scene")
+    def test_gets_the_snapshot_back():
+        assert cmds.ls() == ["rig"]
+
+
+    @pytest.mark.reset_scene
+    def test_always_resets():
+        assert cmds.ls() == []
+"""
+
+
+@pytest.fixture
+def isolation(maya_stub):
+    isolation = SceneIsolation()
+    yield isolation
+    isolation.close()
+
+
+def test_reset_skips_an_unchanged_scene(isolation, maya_stub):
+    assert isolation.reset() is False
+    maya_stub.createNode("transform")
+    assert isolation.reset() is True
+    assert maya_stub.ls() == []
+    assert isolation.reset(force=True) is True
+    assert (isolation.resets, isolation.skipped) == (2, 1)
+
+
+def test_reset_clears_the_selection(isolation, maya_stub):
+    node = maya_stub.createNode("transform")
+    maya_stub.file(modified=False)
+    maya_stub.select(node)
+    assert isolation.reset() is False
+    assert maya_stub.ls(selection=True) == []
+
+
+def test_restore_reopens_a_changed_snapshot(isolation, maya_stub):
+    maya_stub.createNode("transform", name="rig")
+    snapshot = isolation.snapshot("rig")
+    assert snapshot.path.is_file()
+    # the snapshot stays open, the first test using it needs no restore
+    assert isolation.restore(snapshot) is False
+
+    maya_stub.delete("rig")
+    assert isolation.restore(snapshot) is True
+    assert maya_stub.ls() == ["rig"]
+    # a new scene is not the snapshot either
+    isolation.reset(force=True)
+    assert isolation.restore(snapshot) is True
+    assert (isolation.restores, isolation.skipped) == (2, 1)
+
+    isolation.close()
+    assert not snapshot.path.exists()
+
+
+def test_summary_reports_the_saved_time(isolation):
+    isolation.tests, isolation.resets, isolation.reset_seconds = 10, 2, 0.2
+    lines = isolation.summary_lines()
+    assert lines[0] == "10 tests: 2 scene resets (0.20s), 0 snapshot restores (0.00s), 0 skipped because the scene was unchanged."
+    assert lines[1] == "Saved about 1.80s against resetting the scene before and after every test (20 resets of 100.0ms)."
+
+
+def test_summary_omits_the_saved_time_when_restores_cost_more(isolation):
+    isolation.tests, isolation.resets, isolation.reset_seconds = 2, 1, 0.01
+    isolation.restores, isolation.restore_seconds = 2, 1.0
+    lines = isolation.summary_lines()
+    assert len(lines) == 1
+    assert "Saved" not in lines[0]
+
+
+def test_markers_reset_and_restore_the_scene_only_when_needed():
+    # tests/conftest.py only applies below tests/
+    with tempfile.TemporaryDirectory(prefix="_scene_isolation_fixture_", dir=TESTS_DIR) as suite_dir:
+        (Path(suite_dir) / "test_markers.py").write_text(textwrap.dedent(MARKER_TESTS), encoding="utf-8")
+        env = dict(os.environ, PYTHONPATH=str(TESTS_DIR / "maya_stub"))
+        env.pop("MAYA_TEST_WORKER", None)
+        process = subprocess.run([sys.executable, "-m", "pytest", "-p", "no:cacheprovider", suite_dir],
+                                 cwd=TESTS_DIR.parent, env=env, capture_output=True, text=True, timeout=120)
+    assert process.returncode == 0, process.stdout + process.stderr
+    # the session starts with a forced reset, test_gets_a_new_scene resets after test_changes_the_scene,
+    # test_always_resets resets before and after, the second rig test restores the changed snapshot
+    assert re.search(r"6 tests: 4 scene resets \([\d.]+s\), 1 snapshot restores \([\d.]+s\), "
+                     r"4 skipped because the scene was unchanged\.", process.stdout), process.stdout
@@ -0,0 +1,153 @@
+"""Tests for tests/shard_runner.py, run with the stub maya package instead of Maya."""
+from pathlib import Path
+import importlib.util
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+import pytest
+
+SHARD_RUNNER = Path(__file__).resolve().parent.parent / "shard_runner.py"
+
+_spec = importlib.util.spec_from_file_location("shard_runner", SHARD_RUNNER)
+shard_runner = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(shard_runner)
+
+FIXTURE_TESTS = {
+    "test_first.py": """
+        def test_pass_one():
+            pass
+
+        def test_fail():
+            assert False, "expected failure"
+    """,
+    "test_second.py": """
+        import pytest
+
+        def test_pass_two():
+            pass
+
+        def test_pass_three():
+            pass
+
+        @pytest.mark.skip(reason="fixture")
+        def test_skipped():
+            pass
+    """,
+}
+
+CRASHING_TEST = """
+    import os
+
+    def test_crash():
+        # kills the worker, like a crash of Maya would
+        os._exit(3)
+"""
+
+
+@pytest.fixture
+def suite():
+    """Write the fixture suite into a temporary folder of tests/, the workers collect relative to the repo."""
+    with tempfile.TemporaryDirectory(prefix="_shard_runner_fixture_", dir=shard_runner.TESTS_DIR) as suite_dir:
+        suite_dir = Path(suite_dir)
+        for name, source in FIXTURE_TESTS.items():
+            (suite_dir / name).write_text(textwrap.dedent(source), encoding="utf-8")
+        yield suite_dir
+
+
+def _node_id(path, name):
+    return f"{path.relative_to(shard_runner.REPO_ROOT).as_posix()}::{name}"
+
+
+def _run(suite_dir, durations_file, *args):
+    process = subprocess.run(
+        [sys.executable, str(SHARD_RUNNER), str(suite_dir.relative_to(shard_runner.REPO_ROOT)), "--stub-maya",
+         "--workers", "2", "--durations-file", str(durations_file), *args],
+        cwd=shard_runner.REPO_ROOT, capture_output=True, text=True, timeout=120,
+    )
+    summary = re.search(r"^(.*) in [\d.]+s on (\d+) worker\(s\)$", process.stdout, re.MULTILINE)
+    assert summary, process.stdout + process.stderr
+    return process, summary.group(1), int(summary.group(2))
+
+
+def test_shard_places_the_longest_tests_first():
+    durations = {"a": 8.0, "b": 5.0, "c": 4.0, "d": 3.0, "e": 1.0}
+    shards = shard_runner.shard(["a", "b", "c", "d", "e"], durations, 2)
+    assert shards == [["a", "d"], ["b", "c", "e"]]
+    assert [sum(durations[node_id] for node_id in node_ids) for node_ids in shards] == [11.0, 10.0]
+
+
+def test_shard_keeps_the_collection_order_and_drops_empty_shards():
+    shards = shard_runner.shard(["z", "y", "x"], {"x": 10.0}, 5)
+    assert len(shards) == 3
+    assert sorted(node_id for node_ids in shards for node_id in node_ids) == ["x", "y", "z"]
+    # tests without history count as the median of the known durations, so they get their own shard too
+    assert all(len(node_ids) == 1 for node_ids in shards)
+    assert shard_runner.shard(["c", "b", "a"], {}, 1) == [["c", "b", "a"]]
+
+
+def test_results_of_the_workers_are_merged(suite, tmp_path):
+    durations_file = tmp_path / "durations.json"
+    process, summary, workers = _run(suite, durations_file)
+    assert process.returncode == 1
+    assert summary == "1 failed, 3 passed, 1 skipped"
+    assert workers == 2
+    assert f"FAILED {_node_id(suite / 'test_first.py', 'test_fail')}" in process.stdout
+    assert "expected failure" in process.stdout
+    # the durations of this run shard the next one
+    assert set(json.loads(durations_file.read_text(encoding="utf-8"))) == {
+        _node_id(suite / "test_first.py", "test_pass_one"), _node_id(suite / "test_first.py", "test_fail"),
+        _node_id(suite / "test_second.py", "test_pass_two"), _node_id(suite / "test_second.py", "test_pass_three"),
+        _node_id(suite / "test_second.py", "test_skipped"),
+    }
+
+
+def test_crashed_worker_is_restarted(suite, tmp_path):
+    (suite / "test_crash.py").write_text(textwrap.dedent(CRASHING_TEST), encoding="utf-8")
+    crash_id = _node_id(suite / "test_crash.py", "test_crash")
+    # by their durations, the crashing test gets a worker of its own
+    durations_file = tmp_path / "durations.json"
+    durations = {_node_id(suite / name, test): 1.0 for name, test in (
+        ("test_first.py", "test_pass_one"), ("test_first.py", "test_fail"), ("test_second.py", "test_pass_two"),
+        ("test_second.py", "test_pass_three"), ("test_second.py", "test_skipped"))}
+    durations[crash_id] = 100.0
+    durations_file.write_text(json.dumps(durations), encoding="utf-8")
+
+    process, summary, workers = _run(suite, durations_file)
+    assert process.returncode == 1
+    assert re.search(r"Worker \d exited with code 3\. Restarting it\.", process.stdout)
+    assert f"ERROR {crash_id}" in process.stdout
+    # the other worker's results are kept
+    assert summary == "1 error, 1 failed, 3 passed, 1 skipped"
+    assert workers == 2
+
+
+def test_coverage_of_the_workers_is_combined(tmp_path, monkeypatch, capsys):
+    coverage = pytest.importorskip("coverage")
+    module = tmp_path / "src" / "module.py"
+    module.parent.mkdir()
+    module.write_text("a = 1\nb = 2\nc = 3\nd = 4\n", encoding="utf-8")
+    # each worker saves a parallel data file with the lines its shard ran
+    for worker, lines in enumerate(([1, 2], [2, 3])):
+        data = coverage.CoverageData(basename=str(tmp_path / ".coverage"), suffix=f"worker{worker}")
+        data.add_lines({str(module): lines})
+        data.write()
+    monkeypatch.setattr(shard_runner, "REPO_ROOT", tmp_path)
+
+    shard_runner._combine_coverage()
+
+    combined = coverage.CoverageData(basename=str(tmp_path / ".coverage"))
+    combined.read()
+    assert sorted(combined.lines(str(module))) == [1, 2, 3]
+    assert not list(tmp_path.glob(".coverage.*"))
+    assert "75%" in capsys.readouterr().out
+
+
+def test_coverage_without_data_is_reported(tmp_path, monkeypatch, capsys):
+    pytest.importorskip("coverage")
+    monkeypatch.setattr(shard_runner, "REPO_ROOT", tmp_path)
+    shard_runner._combine_coverage()
+    assert "No coverage data was collected" in capsys.readouterr().out
@@ -0,0 +1,115 @@
+"""Tests for the content-addressed devkit store."""
+import errno
+import os
+import shutil
+
+import pytest
+
+from package import store_utils
+
+
+def _write_devkit(root, files):
+    for relative, content in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return root
+
+
+@pytest.fixture
+def devkits(tmp_path):
+    """Two devkits sharing a header and a cmake file, each with a library of its own."""
+    shared = {"include/maya/MFnPlugin.h": b"shared header", "cmake/Maya.cmake": b"shared cmake"}
+    first = _write_devkit(tmp_path / "2024" / "devkitBase", dict(shared, **{"lib/OpenMaya.so": b"2024 library"}))
+    second = _write_devkit(tmp_path / "2025" / "devkitBase", dict(shared, **{"lib/OpenMaya.so": b"2025 library"}))
+    return first, second, tmp_path / "store"
+
+
+def _objects(store_dir):
+    return sorted(store_utils._iter_objects(store_dir))
+
+
+def test_identical_files_of_two_devkits_share_one_object(devkits):
+    first, second, store_dir = devkits
+    assert store_utils.add_tree(first, store_dir) == {
+        "files": 3, "new_files": 3, "new_bytes": 37, "deduplicated_files": 0, "deduplicated_bytes": 0}
+    assert store_utils.add_tree(second, store_dir) == {
+        "files": 3, "new_files": 1, "new_bytes": 12, "deduplicated_files": 2, "deduplicated_bytes": 25}
+
+    assert len(_objects(store_dir)) == 4
+    header = "include/maya/MFnPlugin.h"
+    assert os.path.samefile(first / header, second / header)
+    assert (first / header).stat().st_nlink == 3
+    assert not os.path.samefile(first / "lib/OpenMaya.so", second / "lib/OpenMaya.so")
+    assert (second / "lib/OpenMaya.so").read_bytes() == b"2025 library"
+    # no temporary links are left behind
+    assert sorted(path.name for path in (second / "include" / "maya").iterdir()) == ["MFnPlugin.h"]
+    report = store_utils.report(store_dir)
+    assert (report["objects"], report["stored_bytes"], report["saved_bytes"]) == (4, 49, 25)
+
+
+def test_files_already_in_the_store_are_not_hashed_again(devkits, monkeypatch):
+    first, _, store_dir = devkits
+    store_utils.add_tree(first, store_dir)
+    monkeypatch.setattr(store_utils.download_utils, "hash_file", lambda path: pytest.fail(f"{path} was hashed"))
+    stats = store_utils.add_tree(first, store_dir)
+    assert (stats["files"], stats["new_files"], stats["deduplicated_files"]) == (3, 0, 0)
+
+
+def test_symlinks_are_not_stored(devkits):
+    first, _, store_dir = devkits
+    (first / "lib" / "libOpenMaya.so").symlink_to("OpenMaya.so")
+    assert store_utils.add_tree(first, store_dir)["files"] == 3
+    assert (first / "lib" / "libOpenMaya.so").is_symlink()
+
+
+def test_store_on_another_file_system_leaves_the_devkit_alone(devkits, monkeypatch, capsys):
+    first, second, store_dir = devkits
+    store_utils.add_tree(first, store_dir)
+
+    def _cross_device_link(source, target):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(store_utils.os, "link", _cross_device_link)
+    stats = store_utils.add_tree(second, store_dir)
+    assert (stats["new_files"], stats["deduplicated_files"]) == (0, 0)
+    assert "Skipping deduplication" in capsys.readouterr().out
+    # the devkit keeps its own copies, unlinked from the store
+    for relative, content in (("include/maya/MFnPlugin.h", b"shared header"), ("lib/OpenMaya.so", b"2025 library")):
+        assert (second / relative).read_bytes() == content
+        assert (second / relative).stat().st_nlink == 1
+    assert not list(second.rglob(".*.link"))
+    assert len(_objects(store_dir)) == 3
+
+
+def test_other_link_errors_are_raised(devkits, monkeypatch):
+    first, _, store_dir = devkits
+
+    def _denied_link(source, target):
+        raise PermissionError(errno.EACCES, "Permission denied")
+
+    monkeypatch.setattr(store_utils.os, "link", _denied_link)
+    with pytest.raises(PermissionError):
+        store_utils.add_tree(first, store_dir)
+
+
+def test_gc_only_removes_objects_no_devkit_links(devkits):
+    first, second, store_dir = devkits
+    store_utils.add_tree(first, store_dir)
+    store_utils.add_tree(second, store_dir)
+
+    # nothing is unreferenced yet
+    assert store_utils.gc(store_dir) == (0, 0)
+    assert len(_objects(store_dir)) == 4
+
+    # the shared files are still linked from the second devkit
+    shutil.rmtree(first)
+    assert store_utils.gc(store_dir) == (1, 12)
+    assert len(_objects(store_dir)) == 3
+    assert (second / "include/maya/MFnPlugin.h").read_bytes() == b"shared header"
+    assert store_utils.report(store_dir)["unreferenced"] == 0
+
+    shutil.rmtree(second)
+    assert store_utils.gc(store_dir) == (3, 37)
+    # the emptied shard folders are removed too
+    assert list((store_dir / "objects").iterdir()) == []
@@ -0,0 +1,90 @@
+"""Tests for the Chrome trace recording of the build and deploy timings."""
+import json
+import os
+
+import pytest
+
+from package import trace_utils
+
+NINJA_LOG = (
+    "# ninja log v5\n"
+    "0\t120\t0\tsrc/plugins/cpp/old/CMakeFiles/old.dir/old.cpp.o\t1a\n"
+    "# ninja log v5\n"
+    "10\t400\t0\tsrc/plugins/cpp/deformer/CMakeFiles/deformer.dir/deformer.cpp.o\t2b\n"
+    "20\t300\t0\tsrc/plugins/cpp/deformer/CMakeFiles/deformer.dir/weights.cpp.o\t3c\n"
+    "400\t450\t0\tsrc/plugins/cpp/deformer/deformer.so\t4d\n"
+    "malformed line\n"
+)
+
+
+@pytest.fixture
+def tracer():
+    tracer = trace_utils.Tracer()
+    tracer.enable()
+    return tracer
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    tracer = trace_utils.Tracer()
+    with tracer.span("build"):
+        pass
+    tracer.add_ninja_log_spans(tmp_path / ".ninja_log", 0, 0)
+    assert tracer.events == []
+
+
+def test_span_records_a_complete_event(tracer):
+    with tracer.span("configure", "2025", category="cmake", cached=False):
+        pass
+    with pytest.raises(RuntimeError):
+        with tracer.span("build"):
+            raise RuntimeError("failed builds are traced too")
+    configure, build = tracer.events
+    assert {key: configure[key] for key in ("name", "cat", "ph", "pid", "tid", "args")} == {
+        "name": "configure", "cat": "cmake", "ph": "X", "pid": os.getpid(), "tid": 2025, "args": {"cached": False}}
+    assert configure["dur"] >= 0 and configure["ts"] <= build["ts"]
+    assert (build["name"], build["tid"]) == ("build", trace_utils.MAIN_TRACK)
+
+
+def test_ninja_log_spans_in_the_chrome_trace(tracer, tmp_path):
+    ninja_log = tmp_path / ".ninja_log"
+    ninja_log.write_text(NINJA_LOG, encoding="utf-8")
+    build_start_us = 1_000_000
+    # the first two lines are from an earlier build
+    tracer.add_ninja_log_spans(ninja_log, 2, build_start_us, maya_version="2025")
+    # spans recorded by a build worker process
+    tracer.merge([{"name": "build", "cat": "package", "ph": "X", "ts": 5, "dur": 7, "pid": 4242, "tid": 2024,
+                   "args": {}}])
+    trace_file = tmp_path / "trace" / "build.json"
+    tracer.save(trace_file)
+
+    trace = json.loads(trace_file.read_text(encoding="utf-8"))
+    assert trace["displayTimeUnit"] == "ms"
+    events = trace["traceEvents"]
+    # the metadata names one track per (pid, tid) in use
+    metadata = [event for event in events if event["ph"] == "M"]
+    assert metadata == sorted(metadata, key=lambda event: (event["pid"], event["tid"]))
+    assert sorted(metadata, key=lambda event: event["tid"]) == [
+        {"name": "thread_name", "ph": "M", "pid": 4242, "tid": 2024, "args": {"name": "Maya 2024"}},
+        {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": 2025, "args": {"name": "Maya 2025"}},
+    ]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    assert sorted(spans) == ["build", "deformer.cpp.o", "deformer.so", "target deformer", "weights.cpp.o"]
+    for name in ("deformer.cpp.o", "weights.cpp.o", "deformer.so", "target deformer"):
+        assert (spans[name]["pid"], spans[name]["tid"]) == (os.getpid(), 2025)
+    # ninja milliseconds become microseconds after the build start
+    assert (spans["deformer.cpp.o"]["ts"], spans["deformer.cpp.o"]["dur"]) == (1_010_000, 390_000)
+    assert spans["deformer.cpp.o"]["cat"] == "compile"
+    assert spans["deformer.cpp.o"]["args"] == {
+        "target": "deformer", "output": "src/plugins/cpp/deformer/CMakeFiles/deformer.dir/deformer.cpp.o"}
+    # outputs outside a .dir folder are attributed to the target of their name
+    assert spans["deformer.so"]["args"]["target"] == "deformer"
+    # the target span covers all of its outputs
+    assert (spans["target deformer"]["ts"], spans["target deformer"]["dur"]) == (1_010_000, 440_000)
+    assert spans["target deformer"]["cat"] == "target"
+    assert spans["build"]["pid"] == 4242
+
+
+def test_count_lines(tmp_path):
+    assert trace_utils.count_lines(tmp_path / "missing") == 0
+    (tmp_path / ".ninja_log").write_text(NINJA_LOG, encoding="utf-8")
+    assert trace_utils.count_lines(tmp_path / ".ninja_log") == 7
@@ -0,0 +1,136 @@
+"""Tests for the source folder watchers and the debounced watch loop."""
+import os
+import platform
+import threading
+import time
+
+import pytest
+
+from package import watch_utils
+
+
+def _watchers():
+    watchers = [pytest.param(lambda roots: watch_utils.PollingWatcher(roots, interval=0.01), id="polling")]
+    if platform.system().lower() == "linux":
+        watchers.append(pytest.param(watch_utils.InotifyWatcher, id="inotify"))
+    return watchers
+
+
+def _changes(watcher):
+    """Return the changes of one burst, waiting until the folder is quiet."""
+    changed = watcher.wait(2)
+    while True:
+        more = watcher.wait(0.1)
+        if not more:
+            return changed
+        changed |= more
+
+
+@pytest.mark.parametrize("create_watcher", _watchers())
+def test_create_modify_and_delete_are_each_reported_once(tmp_path, create_watcher):
+    source = tmp_path / "src" / "plugin.cpp"
+    source.parent.mkdir()
+    watcher = create_watcher([tmp_path])
+    try:
+        source.write_text("// new\n")
+        assert source in _changes(watcher)
+        assert watcher.wait(0.1) == set()
+
+        source.write_text("// changed and longer\n")
+        assert _changes(watcher) == {source}
+        assert watcher.wait(0.1) == set()
+
+        source.unlink()
+        assert _changes(watcher) == {source}
+        assert watcher.wait(0.1) == set()
+    finally:
+        watcher.close()
+
+
+@pytest.mark.parametrize("create_watcher", _watchers())
+def test_new_folders_are_watched(tmp_path, create_watcher):
+    watcher = create_watcher([tmp_path])
+    try:
+        new_dir = tmp_path / "newPlugin"
+        new_dir.mkdir()
+        # inotify reports the folder, polling only reports files
+        while watcher.wait(0.1):
+            pass
+        source = new_dir / "newPlugin.cpp"
+        source.write_text("// new plugin\n")
+        assert source in _changes(watcher)
+    finally:
+        watcher.close()
+
+
+def test_polling_watcher_times_out_without_changes(tmp_path):
+    watcher = watch_utils.PollingWatcher([tmp_path], interval=0.01)
+    start = time.monotonic()
+    assert watcher.wait(0.05) == set()
+    assert time.monotonic() - start >= 0.05
+
+
+@pytest.mark.parametrize("name, ignored", [
+    ("plugin.cpp", False),
+    ("CMakeLists.txt", False),
+    (".plugin.cpp.swp", True),
+    ("plugin.cpp.swx", True),
+    ("plugin.cpp~", True),
+    ("build.tmp", True),
+    (".DS_Store", True),
+])
+def test_is_ignored(name, ignored):
+    assert watch_utils.is_ignored(os.path.join("src", name)) is ignored
+
+
+class _ScriptedWatcher:
+    """Return the scripted changes from wait(), then stop the watch loop like Ctrl+C."""
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+        self.closed = False
+
+    def wait(self, timeout=None):
+        if not self.changes:
+            raise KeyboardInterrupt
+        return self.changes.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+def test_watch_reports_each_burst_once_without_ignored_files(monkeypatch, tmp_path):
+    a, b, c = tmp_path / "a.cpp", tmp_path / "b.cpp", tmp_path / "c.cpp"
+    watcher = _ScriptedWatcher([
+        # a burst, reported once the folders are quiet for the debounce time
+        {a}, {b, tmp_path / ".b.cpp.swp"}, {a}, set(),
+        # only editor files changed, nothing to report
+        {tmp_path / "c.cpp~"}, set(),
+        {c}, set(),
+    ])
+    monkeypatch.setattr(watch_utils, "create_watcher", lambda roots: watcher)
+    calls = []
+    watch_utils.watch([tmp_path], calls.append)
+    assert calls == [{a, b}, {c}]
+    assert watcher.closed
+
+
+def test_watch_debounces_a_burst_of_saves(tmp_path):
+    sources = [tmp_path / f"plugin{index}.cpp" for index in range(3)]
+    calls = []
+
+    def _callback(changed):
+        calls.append(changed)
+        raise KeyboardInterrupt
+
+    def _save_all():
+        time.sleep(0.2)
+        for source in sources:
+            source.write_text("// saved\n")
+            time.sleep(0.02)
+
+    saver = threading.Thread(target=_save_all)
+    saver.start()
+    watch_utils.watch([tmp_path], _callback, debounce=0.3)
+    saver.join()
+    assert calls == [set(sources)]
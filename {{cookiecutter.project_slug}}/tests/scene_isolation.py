@@ -0,0 +1,117 @@
+"""Per-test scene isolation for the Maya tests.
+
+Instead of resetting the scene with cmds.file(new=True) before and after
+every test, the scene is only reset when it is not what the next test
+expects: an empty, untitled scene without changes, or an unchanged copy of
+a baseline snapshot. Whether a test changed the scene is read from Maya's
+modified flag and the scene name.
+
+Tests which share an expensive baseline scene build it once in a fixture
+and return a snapshot of it:
+
+    @pytest.fixture(scope="module")
+    def rig_scene(scene_isolation):
+        scene_isolation.reset()
+        build_rig()
+        return scene_isolation.snapshot("rig")
+
+    @pytest.mark.baseline_scene("rig_scene")
+    def test_rig(): ...
+"""
+from pathlib import Path
+import shutil
+import tempfile
+import time
+
+
+def _normalize(scene_name):
+    return Path(scene_name).resolve().as_posix() if scene_name else ""
+
+
+class SceneSnapshot:
+    """A baseline scene saved to a temporary file."""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = Path(path)
+
+
+class SceneIsolation:
+    """Reset or restore the scene only when a test left it changed, and count what that saved."""
+
+    def __init__(self):
+        self.tests = 0
+        self.resets = 0
+        self.reset_seconds = 0.0
+        self.restores = 0
+        self.restore_seconds = 0.0
+        self.skipped = 0
+        self._snapshot_dir = None
+
+    @staticmethod
+    def is_clean(scene_name=""):
+        """Return True if the open scene is `scene_name` (untitled by default) without changes."""
+        from maya import cmds
+        return not cmds.file(query=True, modified=True) \
+            and _normalize(cmds.file(query=True, sceneName=True)) == _normalize(scene_name)
+
+    def reset(self, force=False):
+        """Open a new scene, unless the scene is already new and unchanged. Return True if it was reset."""
+        from maya import cmds
+        # the selection is not part of the modified flag, clearing it is cheap
+        cmds.select(clear=True)
+        if not force and self.is_clean():
+            self.skipped += 1
+            return False
+        start = time.perf_counter()
+        cmds.file(new=True, force=True)
+        self.resets += 1
+        self.reset_seconds += time.perf_counter() - start
+        return True
+
+    def snapshot(self, name):
+        """Save the open scene as a baseline and return its SceneSnapshot.
+
+        The scene stays open as the unchanged snapshot, so the first test using
+        it does not need to restore it.
+        """
+        from maya import cmds
+        if self._snapshot_dir is None:
+            self._snapshot_dir = Path(tempfile.mkdtemp(prefix="maya-test-scenes-"))
+        path = self._snapshot_dir / f"{name}.mb"
+        cmds.file(rename=path.as_posix())
+        cmds.file(save=True, type="mayaBinary", force=True)
+        return SceneSnapshot(name, path)
+
+    def restore(self, snapshot, force=False):
+        """Open the snapshot, unless it is already open and unchanged. Return True if it was opened."""
+        from maya import cmds
+        cmds.select(clear=True)
+        if not force and self.is_clean(snapshot.path):
+            self.skipped += 1
+            return False
+        start = time.perf_counter()
+        cmds.file(snapshot.path.as_posix(), open=True, force=True)
+        self.restores += 1
+        self.restore_seconds += time.perf_counter() - start
+        return True
+
+    def close(self):
+        """Delete the snapshot files."""
+        if self._snapshot_dir is not None:
+            shutil.rmtree(self._snapshot_dir, ignore_errors=True)
+            self._snapshot_dir = None
+
+    def summary_lines(self):
+        """Return the reset counts and the time saved against resetting before and after every test."""
+        lines = [f"{self.tests} tests: {self.resets} scene resets ({self.reset_seconds:.2f}s), "
+                 f"{self.restores} snapshot restores ({self.restore_seconds:.2f}s), "
+                 f"{self.skipped} skipped because the scene was unchanged."]
+        if self.resets:
+            reset_time = self.reset_seconds / self.resets
+            saved = 2 * self.tests * reset_time - self.reset_seconds - self.restore_seconds
+            # restoring snapshots can cost more than the resets they skipped, nothing was saved then
+            if saved > 0:
+                lines.append(f"Saved about {saved:.2f}s against resetting the scene before and after every test "
+                             f"({2 * self.tests} resets of {reset_time * 1000:.1f}ms).")
+        return lines
@@ -0,0 +1,402 @@
+"""Run the tests sharded across a pool of warm mayapy workers.
+
+Every worker is a mayapy process which initializes maya.standalone once and
+then runs pytest in-process for each shard it is sent, so the standalone
+startup is paid once per worker instead of once per run. Tests are spread
+over the workers by their durations of the previous runs (kept in
+tests/.test_durations.json), the results and coverage of the workers are
+merged into one report.
+
+With --watch the workers stay alive and the tests run again whenever a file
+under tests/ or src/ is saved.
+
+Usage:
+    python tests/shard_runner.py [paths] [--workers N] [--coverage] [--watch]
+    python tests/shard_runner.py --stub-maya    (without Maya, see tests/maya_stub)
+"""
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+import argparse
+import heapq
+import json
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+TESTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = TESTS_DIR.parent
+SRC_DIR = REPO_ROOT / "src"
+STUB_DIR = TESTS_DIR / "maya_stub"
+DURATIONS_FILE = TESTS_DIR / ".test_durations.json"
+DEFAULT_PATHS = ["tests/unit", "tests/integration"]
+
+# set in the workers, tells tests/conftest.py that Maya is initialized and stays initialized
+WORKER_ENV = "MAYA_TEST_WORKER"
+AUTHKEY_ENV = "MAYA_TEST_WORKER_AUTHKEY"
+
+# duration assumed for tests without history when nothing else is known
+DEFAULT_DURATION = 1.0
+
+# the pytest options every worker run uses, the workers must not write to a shared cache or terminal
+PYTEST_OPTIONS = ["-p", "no:cacheprovider", "-p", "no:terminal", f"--rootdir={REPO_ROOT}"]
+
+
+def _send(connection, message):
+    connection.send_bytes(json.dumps(message).encode("utf-8"))
+
+
+def _receive(connection):
+    return json.loads(connection.recv_bytes().decode("utf-8"))
+
+
+# --------------------------------------------------
+# Worker side
+# --------------------------------------------------
+
+class _Collector:
+    """Pytest plugin recording the collected test ids and the collection errors."""
+
+    def __init__(self):
+        self.node_ids = []
+        self.errors = []
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self.errors.append({"node_id": report.nodeid, "longrepr": report.longreprtext})
+
+    def pytest_collection_finish(self, session):
+        # the items left after deselection, e.g. by --impact-affected
+        self.node_ids = [item.nodeid for item in session.items]
+
+
+class _ResultRecorder:
+    """Pytest plugin merging the setup, call and teardown reports of each test into one result."""
+
+    def __init__(self):
+        self.results = {}
+
+    def pytest_runtest_logreport(self, report):
+        result = self.results.setdefault(report.nodeid, {"outcome": "passed", "duration": 0.0, "longrepr": ""})
+        result["duration"] += report.duration
+        if report.failed:
+            result["outcome"] = "failed" if report.when == "call" else "error"
+            result["longrepr"] += report.longreprtext
+        elif report.skipped and result["outcome"] == "passed":
+            result["outcome"] = "skipped"
+
+
+def _forget_project_modules():
+    """Drop the imported test and project modules, so the next run imports the saved files."""
+    for name, module in list(sys.modules.items()):
+        if name == "__main__":
+            continue
+        module_file = getattr(module, "__file__", None)
+        if not module_file:
+            continue
+        path = Path(module_file).resolve()
+        if STUB_DIR in path.parents:
+            continue
+        if TESTS_DIR in path.parents or SRC_DIR in path.parents:
+            del sys.modules[name]
+
+
+def _run_pytest(args, plugin, coverage_file=None):
+    import pytest
+
+    _forget_project_modules()
+    cov = None
+    if coverage_file:
+        import coverage
+        cov = coverage.Coverage(data_file=coverage_file, data_suffix=True, source=[str(SRC_DIR)])
+        cov.start()
+    try:
+        pytest.main(PYTEST_OPTIONS + args, plugins=[plugin])
+    finally:
+        if cov:
+            cov.stop()
+            cov.save()
+
+
+def worker_main(address, index):
+    """Initialize Maya, then run the requests of the controller until it says stop."""
+    host, port = address.rsplit(":", 1)
+    connection = Client((host, int(port)), authkey=bytes.fromhex(os.environ[AUTHKEY_ENV]))
+    os.chdir(REPO_ROOT)
+    # Ctrl+C reaches the whole process group, the controller stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    start = time.perf_counter()
+    import maya.standalone
+    maya.standalone.initialize()
+    from maya import cmds  # noqa: F401
+    _send(connection, {"ready": index, "init_seconds": time.perf_counter() - start})
+    try:
+        while True:
+            try:
+                request = _receive(connection)
+            except EOFError:
+                break
+            if request.get("stop"):
+                break
+            if "collect" in request:
+                collector = _Collector()
+                _run_pytest(["--collect-only"] + request["collect"], collector)
+                _send(connection, {"node_ids": collector.node_ids, "errors": collector.errors})
+            elif "run" in request:
+                recorder = _ResultRecorder()
+                _run_pytest(request["run"], recorder, request.get("coverage_file"))
+                _send(connection, {"results": recorder.results})
+    finally:
+        connection.close()
+        maya.standalone.uninitialize()
+
+
+# --------------------------------------------------
+# Controller side
+# --------------------------------------------------
+
+def load_durations(path=DURATIONS_FILE):
+    """Return the test durations of the previous runs."""
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(durations, path=DURATIONS_FILE):
+    Path(path).write_text(json.dumps(durations, indent=1, sort_keys=True), encoding="utf-8")
+
+
+def shard(node_ids, durations, count):
+    """Split the tests into `count` shards of about the same total duration.
+
+    The longest tests are placed first, each on the least loaded shard. Tests
+    without history count as the median of the known durations. Each shard
+    keeps the collection order of its tests.
+    """
+    known = [durations[node_id] for node_id in node_ids if node_id in durations]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    order = {node_id: position for position, node_id in enumerate(node_ids)}
+    shards = [[] for _ in range(count)]
+    loads = [(0.0, index) for index in range(count)]
+    for node_id in sorted(node_ids, key=lambda node_id: durations.get(node_id, default), reverse=True):
+        load, index = heapq.heappop(loads)
+        shards[index].append(node_id)
+        heapq.heappush(loads, (load + durations.get(node_id, default), index))
+    return [sorted(node_ids, key=order.get) for node_ids in shards if node_ids]
+
+
+class WorkerPool:
+    """A pool of mayapy worker processes with Maya initialized."""
+
+    def __init__(self, size, mayapy, stub_maya=False):
+        self.size = size
+        self.mayapy = mayapy
+        self.stub_maya = stub_maya
+        self._authkey = os.urandom(16)
+        self._listener = Listener(("127.0.0.1", 0), authkey=self._authkey)
+        self._workers = [None] * size
+
+    def _launch(self, index):
+        env = dict(os.environ)
+        env[WORKER_ENV] = "1"
+        env[AUTHKEY_ENV] = self._authkey.hex()
+        python_path = [str(SRC_DIR)]
+        if self.stub_maya:
+            python_path.insert(0, str(STUB_DIR))
+        env["PYTHONPATH"] = os.pathsep.join(python_path + [env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+        host, port = self._listener.address
+        return subprocess.Popen([self.mayapy, str(Path(__file__).resolve()), "--worker", f"{host}:{port}",
+                                 "--worker-index", str(index)], cwd=REPO_ROOT, env=env)
+
+    def _accept(self, processes):
+        """Wait for the launched workers to initialize Maya and connect, return their startup times."""
+        init_seconds = []
+        for _ in processes:
+            connection = self._listener.accept()
+            message = _receive(connection)
+            self._workers[message["ready"]] = (processes[message["ready"]], connection)
+            init_seconds.append(message["init_seconds"])
+        return init_seconds
+
+    def start(self):
+        """Start the workers in parallel and return their Maya startup times."""
+        return self._accept({index: self._launch(index) for index in range(self.size)})
+
+    def request(self, index, message):
+        """Send a request to a worker and return its answer, or None if the worker died (it is restarted)."""
+        process, connection = self._workers[index]
+        try:
+            _send(connection, message)
+            return _receive(connection)
+        except (EOFError, OSError):
+            connection.close()
+            process.wait()
+            sys.stdout.write(f"Worker {index} exited with code {process.returncode}. Restarting it.\n")
+            self._accept({index: self._launch(index)})
+            return None
+
+    def close(self):
+        for worker in self._workers:
+            if worker is None:
+                continue
+            process, connection = worker
+            try:
+                _send(connection, {"stop": True})
+            except OSError:
+                pass
+            connection.close()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._listener.close()
+
+
+def _combine_coverage():
+    import coverage
+    cov = coverage.Coverage(data_file=str(REPO_ROOT / ".coverage"))
+    cov.erase()
+    cov.combine()
+    cov.save()
+    sys.stdout.write("\n")
+    try:
+        cov.report()
+    except coverage.exceptions.NoDataError:
+        sys.stdout.write(f"No coverage data was collected for {SRC_DIR}.\n")
+
+
+def run_tests(pool, paths, coverage=False, durations_file=DURATIONS_FILE, affected=False):
+    """Collect the tests, run them sharded across the pool and print the merged results.
+
+    With `affected`, only the tests affected by the changes since the last
+    --impact-record run are collected, see impact.py.
+
+    Returns 0 when every test passed, else 1.
+    """
+    start = time.perf_counter()
+    collected = pool.request(0, {"collect": paths + (["--impact-affected"] if affected else [])})
+    if collected is None:
+        sys.stdout.write("The tests could not be collected.\n")
+        return 1
+    for error in collected["errors"]:
+        sys.stdout.write(f"\nERROR collecting {error['node_id']}\n{error['longrepr']}\n")
+    node_ids = collected["node_ids"]
+    if not node_ids:
+        sys.stdout.write("No tests collected.\n")
+        return 1 if collected["errors"] else 0
+
+    durations = load_durations(durations_file)
+    shards = shard(node_ids, durations, pool.size)
+    if coverage:
+        for data_file in REPO_ROOT.glob(".coverage.*"):
+            data_file.unlink()
+    coverage_file = str(REPO_ROOT / ".coverage") if coverage else None
+
+    def _run_shard(index):
+        answer = pool.request(index, {"run": shards[index], "coverage_file": coverage_file})
+        if answer is None:
+            return {node_id: {"outcome": "error", "duration": 0.0, "longrepr": f"Worker {index} crashed."}
+                    for node_id in shards[index]}
+        return answer["results"]
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        shard_results = list(executor.map(_run_shard, range(len(shards))))
+
+    results = {}
+    for index, shard_result in enumerate(shard_results):
+        results.update(shard_result)
+        busy = sum(result["duration"] for result in shard_result.values())
+        sys.stdout.write(f"Worker {index}: {len(shards[index])} tests in {busy:.2f}s\n")
+    # tests the workers never reported, e.g. deselected by a plugin, are not counted
+    durations = {node_id: durations[node_id] for node_id in node_ids if node_id in durations}
+    durations.update({node_id: result["duration"] for node_id, result in results.items()})
+    save_durations(durations, durations_file)
+
+    counts = {}
+    for node_id in node_ids:
+        if node_id not in results:
+            continue
+        result = results[node_id]
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+        if result["outcome"] in ("failed", "error"):
+            sys.stdout.write(f"\n{result['outcome'].upper()} {node_id}\n{result['longrepr']}\n")
+    if coverage:
+        _combine_coverage()
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items()))
+    sys.stdout.write(f"\n{summary} in {time.perf_counter() - start:.2f}s on {len(shards)} worker(s)\n")
+    failed = counts.get("failed", 0) or counts.get("error", 0) or collected["errors"]
+    return 1 if failed else 0
+
+
+def _watch(pool, paths, coverage, durations_file, affected):
+    sys.path.insert(0, str(REPO_ROOT))
+    from package import watch_utils
+
+    def _rerun(changed):
+        changed = [path for path in changed if "__pycache__" not in Path(path).parts]
+        if not changed:
+            return
+        sys.stdout.write(f"\n{len(changed)} file(s) changed. Running the tests again.\n")
+        run_tests(pool, paths, coverage=coverage, durations_file=durations_file, affected=affected)
+
+    watch_utils.watch([TESTS_DIR, SRC_DIR], _rerun)
+
+
+def _default_mayapy(stub_maya):
+    if stub_maya:
+        return sys.executable
+    return os.environ.get("MAYAPY") or shutil.which("mayapy") or "mayapy"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the tests sharded across a pool of warm mayapy workers.")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS,
+                        help="Optional: the test folders, files or ids to run. Defaults to tests/unit and tests/integration.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Optional: the number of mayapy workers. Defaults to one per core.")
+    parser.add_argument("--mayapy", default=None,
+                        help="Optional: the mayapy executable of the workers. Defaults to $MAYAPY or mayapy on the PATH.")
+    parser.add_argument("--stub-maya", action="store_true",
+                        help="Optional: run the workers with this Python and the stub maya package of tests/maya_stub instead of Maya.")
+    parser.add_argument("--coverage", action="store_true",
+                        help="Optional: measure the coverage of src in every worker and report the combined coverage.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Optional: keep the workers alive and run the tests again whenever a file under tests or src is saved.")
+    parser.add_argument("--affected", action="store_true",
+                        help="Optional: only run the tests affected by the changes since the last recording of tests/impact.py.")
+    parser.add_argument("--durations-file", type=Path, default=DURATIONS_FILE,
+                        help="Optional: the file keeping the test durations used for sharding.")
+    parser.add_argument("--worker", metavar="ADDRESS", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-index", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker_main(args.worker, args.worker_index)
+        return 0
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1.")
+
+    mayapy = args.mayapy or _default_mayapy(args.stub_maya)
+    if not shutil.which(mayapy) and not Path(mayapy).is_file():
+        raise SystemExit(f"Could not find {mayapy}. Pass --mayapy, set MAYAPY or use --stub-maya.")
+    pool = WorkerPool(args.workers, mayapy, stub_maya=args.stub_maya)
+    try:
+        init_seconds = pool.start()
+        sys.stdout.write(f"Started {args.workers} worker(s), Maya startup took {max(init_seconds):.2f}s "
+                         f"per worker and is reused by every run.\n")
+        exit_code = run_tests(pool, args.paths, coverage=args.coverage, durations_file=args.durations_file,
+                              affected=args.affected)
+        if args.watch:
+            _watch(pool, args.paths, args.coverage, args.durations_file, args.affected)
+        return exit_code
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())